@@ -0,0 +1,604 @@
+import json
+import os
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from db import PokemonDatabase
+from embeddings import EMBEDDING_MODEL, MissingEmbeddingError, load_embeddings
+
+
+# Bump when the file layout changes so old indexes are rebuilt
+INDEX_VERSION = 2
+
+# Rebuild the whole index instead of growing the delta segment past this share
+MAX_DELTA_FRACTION = 0.1
+
+# Rows scored per matrix product when assigning vectors to lists
+ASSIGN_CHUNK_SIZE = 16_384
+
+# The arrays of each segment; every write of a segment is a new generation of files
+MAIN_ARRAYS = ["centroids", "offsets", "vectors", "ids", "hashes"]
+DELTA_ARRAYS = ["delta_vectors", "delta_ids", "delta_hashes", "shadowed"]
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    """
+    Save an array as .npy atomically, so readers never map a partial file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+def _save_generation(index_dir: str, arrays: Dict[str, np.ndarray]) -> str:
+    """
+    Save a segment's arrays under new file names, leaving any live generation alone.
+
+    Returns:
+        The generation, to be recorded in meta.json
+    """
+    generation = uuid.uuid4().hex
+    for name, array in arrays.items():
+        _save_array(os.path.join(index_dir, f"{name}.{generation}.npy"), array)
+
+    return generation
+
+
+def _remove_stale_files(index_dir: str, meta: Dict) -> None:
+    """
+    Remove array files that meta.json no longer points at.
+
+    Readers that mapped them keep their pages; a reader that read the previous
+    meta.json but has not opened its files yet retries with the new one.
+    """
+    live = {f"{name}.{meta['main']}.npy" for name in MAIN_ARRAYS}
+    live |= {f"{name}.{meta['delta']}.npy" for name in DELTA_ARRAYS}
+
+    arrays = set(MAIN_ARRAYS) | set(DELTA_ARRAYS)
+    for filename in os.listdir(index_dir):
+        # Only array files: <name>.<generation>.npy, or <name>.npy from version 1
+        name = filename.split(".", 1)[0]
+        if name not in arrays or not filename.endswith(".npy") or ".tmp." in filename:
+            continue
+
+        if filename not in live:
+            try:
+                os.remove(os.path.join(index_dir, filename))
+            except OSError:
+                # Still mapped on platforms that lock open files; retried next write
+                pass
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Get the positions of the k highest scores, highest first.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+def assign_lists(
+    vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = ASSIGN_CHUNK_SIZE
+) -> np.ndarray:
+    """
+    Assign each vector to its most similar centroid.
+
+    Args:
+        vectors: The normalized vectors, one per row
+        centroids: The normalized centroids, one per row
+        chunk_size: Number of vectors scored per matrix product
+
+    Returns:
+        The list number of each vector
+    """
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        scores = vectors[start : start + chunk_size] @ centroids.T
+        assignments[start : start + chunk_size] = scores.argmax(axis=1)
+
+    return assignments
+
+
+def train_centroids(
+    vectors: np.ndarray,
+    n_lists: int,
+    iterations: int = 10,
+    sample_size: int = 50_000,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Train IVF centroids with spherical k-means.
+
+    Args:
+        vectors: The normalized vectors, one per row
+        n_lists: Number of centroids
+        iterations: Number of k-means iterations
+        sample_size: Maximum number of vectors to train on
+        seed: Random seed, so rebuilds are reproducible
+
+    Returns:
+        A (n_lists, dim) float32 array of normalized centroids
+    """
+    rng = np.random.default_rng(seed)
+
+    sample = vectors
+    if len(vectors) > sample_size:
+        sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+    sample = np.ascontiguousarray(sample, dtype=np.float32)
+
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = assign_lists(sample, centroids)
+
+        # New centroid = normalized sum of its members
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=n_lists)
+
+        # Restart empty lists from random vectors
+        empty = counts == 0
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.where(norms > 0, norms, 1)
+
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """
+    An inverted-file index over normalized vectors, stored as memory-mapped .npy files.
+
+    Vectors are clustered into lists around trained centroids and stored sorted
+    by list, so a query only scores the `nprobe` lists whose centroids are most
+    similar to it. All files are opened with mmap, so processes sharing an index
+    share its pages through the OS cache instead of each loading a copy.
+
+    New or changed vectors go into a small delta segment that is searched
+    exhaustively; delta entries shadow main entries with the same name, and
+    removed entries are shadowed without a replacement. The index directory
+    contains:
+
+    - meta.json: layout version, model, dimensions, counts and the generation
+      of each segment
+    - centroids.<main>.npy: (n_lists, dim) float32
+    - offsets.<main>.npy: (n_lists + 1,) int64 start of each list in vectors
+    - vectors.<main>.npy, ids.<main>.npy, hashes.<main>.npy: the main segment,
+      sorted by list
+    - delta_vectors.<delta>.npy, delta_ids.<delta>.npy, delta_hashes.<delta>.npy:
+      the delta segment
+    - shadowed.<delta>.npy: main rows replaced or removed by the delta segment
+
+    Every write saves a new generation of files and then replaces meta.json,
+    so readers always see one consistent set of arrays.
+    """
+
+    def __init__(self, index_dir: str):
+        """
+        Open an index.
+
+        Args:
+            index_dir: The index directory
+
+        Raises:
+            FileNotFoundError: If there is no index in the directory
+            ValueError: If the index was written by an incompatible version or
+                its arrays do not match meta.json
+        """
+        self.index_dir = index_dir
+        self._open()
+
+    def _read_meta(self) -> Dict:
+        with open(os.path.join(self.index_dir, "meta.json")) as f:
+            return json.load(f)
+
+    def _open(self) -> None:
+        """
+        Read meta.json and map the arrays of the generations it points at.
+        """
+        meta = self._read_meta()
+
+        while True:
+            if meta.get("version") != INDEX_VERSION:
+                raise ValueError(
+                    f"Unsupported index version in {self.index_dir}; rebuild it"
+                )
+
+            try:
+                self._map(meta)
+                break
+            except FileNotFoundError:
+                # A writer replaced the generation between reading meta.json
+                # and opening its files; retry with the new meta.json
+                latest = self._read_meta()
+                if latest == meta:
+                    raise
+                meta = latest
+
+        self.meta = meta
+        self._check()
+
+    def _map(self, meta: Dict) -> None:
+        """
+        Map the arrays of the generations recorded in meta.
+        """
+
+        def load(name: str, generation: str) -> np.ndarray:
+            path = os.path.join(self.index_dir, f"{name}.{generation}.npy")
+            return np.load(path, mmap_mode="r")
+
+        self.centroids = load("centroids", meta["main"])
+        self.offsets = load("offsets", meta["main"])
+        self.vectors = load("vectors", meta["main"])
+        self.ids = load("ids", meta["main"])
+        self.hashes = load("hashes", meta["main"])
+        self.delta_vectors = load("delta_vectors", meta["delta"])
+        self.delta_ids = load("delta_ids", meta["delta"])
+        self.delta_hashes = load("delta_hashes", meta["delta"])
+        self.shadowed = load("shadowed", meta["delta"])
+
+    def _check(self) -> None:
+        """
+        Check that the mapped arrays agree with meta.json.
+
+        Raises:
+            ValueError: If any array has the wrong shape
+        """
+        dim, size = self.meta["dim"], self.meta["size"]
+        delta_size = self.meta["delta_size"]
+
+        consistent = (
+            self.centroids.shape == (self.meta["n_lists"], dim)
+            and self.offsets.shape == (self.meta["n_lists"] + 1,)
+            and int(self.offsets[-1]) == size
+            and self.vectors.shape == (size, dim)
+            and len(self.ids) == len(self.hashes) == size
+            and self.delta_vectors.shape == (delta_size, dim)
+            and len(self.delta_ids) == len(self.delta_hashes) == delta_size
+            and len(self.shadowed) == self.meta["shadowed_size"]
+            and (not len(self.shadowed) or int(self.shadowed.max()) < size)
+        )
+        if not consistent:
+            raise ValueError(f"Corrupt index in {self.index_dir}; rebuild it")
+
+    @property
+    def model(self) -> str:
+        return self.meta["model"]
+
+    def __len__(self) -> int:
+        return len(self.ids) - len(self.shadowed) + len(self.delta_ids)
+
+    def pending(self) -> int:
+        """
+        Get the number of names changed or removed since the index was built.
+        """
+        touched = set(self.delta_ids.tolist())
+        touched.update(self.ids[self.shadowed].tolist())
+        return len(touched)
+
+    @classmethod
+    def build(
+        cls,
+        index_dir: str,
+        names: List[str],
+        hashes: List[str],
+        vectors: np.ndarray,
+        n_lists: Optional[int] = None,
+        model: str = EMBEDDING_MODEL,
+    ) -> "IVFIndex":
+        """
+        Build an index from scratch, replacing any index in the directory.
+
+        Args:
+            index_dir: The index directory
+            names: The name of each vector
+            hashes: The sprite hash each vector was computed from
+            vectors: The normalized vectors, one per row
+            n_lists: Number of lists (defaults to 2 * sqrt(len(vectors)))
+            model: The name of the embedding model
+
+        Returns:
+            The opened index
+        """
+        os.makedirs(index_dir, exist_ok=True)
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        dim = vectors.shape[1]
+
+        if n_lists is None:
+            n_lists = int(2 * np.sqrt(len(vectors)))
+        n_lists = max(1, min(n_lists, len(vectors)))
+
+        if len(vectors):
+            centroids = train_centroids(vectors, n_lists)
+            assignments = assign_lists(vectors, centroids)
+        else:
+            centroids = np.zeros((1, dim), dtype=np.float32)
+            assignments = np.empty(0, dtype=np.int64)
+
+        # Store the vectors grouped by list so each list is one contiguous slice
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=len(centroids))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        main = _save_generation(
+            index_dir,
+            {
+                "centroids": centroids,
+                "offsets": offsets,
+                "vectors": vectors[order],
+                "ids": np.array(names, dtype=str)[order],
+                "hashes": np.array(hashes, dtype="S64")[order],
+            },
+        )
+
+        # Start with an empty delta segment
+        delta = _save_generation(
+            index_dir,
+            {
+                "delta_vectors": np.empty((0, dim), dtype=np.float32),
+                "delta_ids": np.array([], dtype=str),
+                "delta_hashes": np.array([], dtype="S64"),
+                "shadowed": np.empty(0, dtype=np.int64),
+            },
+        )
+
+        cls._write_meta(
+            index_dir,
+            {
+                "model": model,
+                "dim": dim,
+                "n_lists": len(centroids),
+                "size": len(vectors),
+                "delta_size": 0,
+                "shadowed_size": 0,
+                "main": main,
+                "delta": delta,
+            },
+        )
+
+        return cls(index_dir)
+
+    @staticmethod
+    def _write_meta(index_dir: str, meta: Dict) -> None:
+        """
+        Write meta.json atomically, after the arrays it points at, then remove
+        the files of the generations it replaced.
+        """
+        meta = {"version": INDEX_VERSION, **meta}
+
+        tmp_path = os.path.join(index_dir, f"meta.json.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(index_dir, "meta.json"))
+
+        _remove_stale_files(index_dir, meta)
+
+    def entry_hashes(self) -> Dict[str, str]:
+        """
+        Get the sprite hash of every indexed name, with delta entries taking precedence.
+
+        Returns:
+            A dictionary of name to sprite SHA-256
+        """
+        live = np.ones(len(self.ids), dtype=bool)
+        live[self.shadowed] = False
+
+        hashes = dict(
+            zip(self.ids[live].tolist(), self.hashes[live].astype(str).tolist())
+        )
+        hashes.update(zip(self.delta_ids.tolist(), self.delta_hashes.astype(str).tolist()))
+        return hashes
+
+    def add(
+        self,
+        names: List[str],
+        hashes: List[str],
+        vectors: np.ndarray,
+        removed: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Add, replace or remove vectors by writing a new delta segment.
+
+        Args:
+            names: The name of each vector
+            hashes: The sprite hash each vector was computed from
+            vectors: The normalized vectors, one per row
+            removed: Optional names to drop from the index
+        """
+        removed = removed or []
+        if not names and not removed:
+            return
+
+        # Merge with the existing delta, keeping the newest vector for each name
+        replaced = set(names) | set(removed)
+        keep = [i for i, name in enumerate(self.delta_ids.tolist()) if name not in replaced]
+
+        delta_ids = np.concatenate([self.delta_ids[keep], np.array(names, dtype=str)])
+        delta_hashes = np.concatenate(
+            [self.delta_hashes[keep], np.array(hashes, dtype="S64")]
+        )
+        delta_vectors = np.concatenate(
+            [self.delta_vectors[keep], np.asarray(vectors, dtype=np.float32)]
+        )
+
+        # Main rows that were replaced or removed are skipped at search time
+        shadowed = np.union1d(
+            self.shadowed, np.flatnonzero(np.isin(self.ids, list(replaced)))
+        ).astype(np.int64)
+
+        delta = _save_generation(
+            self.index_dir,
+            {
+                "delta_vectors": delta_vectors,
+                "delta_ids": delta_ids,
+                "delta_hashes": delta_hashes,
+                "shadowed": shadowed,
+            },
+        )
+
+        self._write_meta(
+            self.index_dir,
+            {
+                **self.meta,
+                "delta_size": len(delta_ids),
+                "shadowed_size": len(shadowed),
+                "delta": delta,
+            },
+        )
+
+        # Map the new files
+        self._open()
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        nprobe: int = 8,
+        exclude: Optional[str] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the approximate nearest neighbours of a query vector.
+
+        Args:
+            query: The normalized query vector
+            k: Number of results
+            nprobe: Number of lists to scan; higher is slower but more accurate
+            exclude: Optional name to leave out (usually the query itself)
+
+        Returns:
+            (name, cosine similarity) pairs, most similar first
+        """
+        query = np.asarray(query, dtype=np.float32)
+
+        # Pick the lists whose centroids are closest to the query
+        probes = _top(self.centroids @ query, nprobe)
+
+        rows = []
+        scores = []
+        for probe in probes:
+            start, end = int(self.offsets[probe]), int(self.offsets[probe + 1])
+            if start < end:
+                rows.append(np.arange(start, end))
+                scores.append(self.vectors[start:end] @ query)
+
+        if rows:
+            main_rows = np.concatenate(rows)
+            main_scores = np.concatenate(scores)
+            if len(self.shadowed):
+                main_scores[np.isin(main_rows, self.shadowed)] = -np.inf
+        else:
+            main_rows = np.empty(0, dtype=np.int64)
+            main_scores = np.empty(0, dtype=np.float32)
+
+        # The delta segment is small and always scanned in full
+        delta_scores = self.delta_vectors @ query
+
+        names = np.concatenate([self.ids[main_rows], self.delta_ids])
+        all_scores = np.concatenate([main_scores, delta_scores])
+        if exclude is not None:
+            all_scores[names == exclude] = -np.inf
+
+        return [
+            (str(names[i]), float(all_scores[i]))
+            for i in _top(all_scores, k)
+            if np.isfinite(all_scores[i])
+        ]
+
+
+def update_index(
+    db: PokemonDatabase,
+    index_dir: str,
+    n_lists: Optional[int] = None,
+    rebuild: bool = False,
+) -> Tuple[bool, int]:
+    """
+    Bring an index up to date with the embeddings stored in the database.
+
+    New and changed embeddings are added to the delta segment, and deleted
+    ones are removed. The index is rebuilt from scratch if it does not exist,
+    was built for another model, or the delta would grow past
+    MAX_DELTA_FRACTION of the index.
+
+    Args:
+        db: The database instance
+        index_dir: The index directory
+        n_lists: Number of lists when rebuilding (defaults to 2 * sqrt(n))
+        rebuild: Whether to always rebuild
+
+    Returns:
+        Whether the index was rebuilt, and the number of vectors written
+    """
+    stored = db.get_embedding_hashes(EMBEDDING_MODEL)
+
+    index = None
+    if not rebuild:
+        try:
+            index = IVFIndex(index_dir)
+        except (FileNotFoundError, ValueError):
+            index = None
+
+    if index is not None and index.model == EMBEDDING_MODEL:
+        indexed = index.entry_hashes()
+        changed = sorted(
+            name for name, sha256 in stored.items() if indexed.get(name) != sha256
+        )
+        removed = sorted(name for name in indexed if name not in stored)
+
+        pending = index.pending() + len(changed) + len(removed)
+        if pending <= MAX_DELTA_FRACTION * max(len(index), 1):
+            names, vectors = load_embeddings(db, pokemon_names=changed)
+            index.add(names, [stored[name] for name in names], vectors, removed)
+            return False, len(names)
+
+    names, vectors = load_embeddings(db)
+    IVFIndex.build(
+        index_dir, names, [stored[name] for name in names], vectors, n_lists
+    )
+
+    return True, len(names)
+
+
+def find_similar_ann(
+    db: PokemonDatabase,
+    index_dir: str,
+    pokemon_name: str,
+    k: int = 10,
+    nprobe: int = 8,
+) -> List[Tuple[str, float]]:
+    """
+    Find the Pokémon whose sprites are most similar using the on-disk index.
+
+    Only the query's own vector is read from the database; the candidates are
+    scored from the memory-mapped index.
+
+    Args:
+        db: The database instance
+        index_dir: The index directory
+        pokemon_name: The name of the Pokémon
+        k: Number of results
+        nprobe: Number of lists to scan
+
+    Returns:
+        (pokemon_name, cosine similarity) pairs, most similar first
+
+    Raises:
+        FileNotFoundError: If there is no index in the directory
+        ValueError: If the index is from an incompatible version or corrupt
+        MissingEmbeddingError: If the Pokémon has no stored embedding
+    """
+    index = IVFIndex(index_dir)
+
+    pokemon_name = pokemon_name.lower()
+    names, vectors = load_embeddings(db, index.model, pokemon_names=[pokemon_name])
+    if not names:
+        raise MissingEmbeddingError(f"No embedding found for Pokémon: {pokemon_name}")
+
+    return index.search(vectors[0], k, nprobe=nprobe, exclude=pokemon_name)
@@ -0,0 +1,160 @@
+import json
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from cache import SpritePayloadCache, sprite_path
+from db import PokemonDatabase
+from nickname_generator import Nicknames, build_chat_request
+
+
+def write_batch_requests(
+    pokemon_names: Iterable[str],
+    output_path: str,
+    sprite_cache: SpritePayloadCache,
+    model: str = "gpt-4o",
+    temperature: float = 0.5,
+) -> int:
+    """
+    Write one chat completion request per Pokémon to a batch JSONL file.
+
+    Each line follows the OpenAI Batch API input format, with the Pokémon name
+    as the `custom_id`.
+
+    Args:
+        pokemon_names: The names of the Pokémon to include
+        output_path: Path to the output JSONL file
+        sprite_cache: The sprite payload cache used to encode sprites
+        model: The name of the chat model
+        temperature: Sampling temperature
+
+    Returns:
+        The number of requests written
+    """
+    count = 0
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        for pokemon_name in pokemon_names:
+            payload = sprite_cache.get(sprite_path(pokemon_name))
+            request = {
+                "custom_id": pokemon_name,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": build_chat_request(payload.data_url, model, temperature),
+            }
+            f.write(json.dumps(request) + "\n")
+            count += 1
+
+    return count
+
+
+def parse_batch_result(line: str) -> Tuple[str, Optional[List[str]], Optional[str]]:
+    """
+    Parse one line of a batch results file.
+
+    Args:
+        line: A JSON line from the results file
+
+    Returns:
+        A (pokemon_name, nicknames, error) tuple; nicknames is None when the
+        request failed, and error describes the failure
+    """
+    result = json.loads(line)
+    if not isinstance(result, dict):
+        return "", None, "Result is not a JSON object"
+
+    pokemon_name = result.get("custom_id")
+    if not isinstance(pokemon_name, str) or not pokemon_name.strip():
+        return "", None, "Missing custom_id"
+
+    # The error is usually an object with a message, but may be a plain string
+    error = result.get("error")
+    if error:
+        if isinstance(error, dict):
+            error = error.get("message", error)
+        return pokemon_name, None, str(error)
+
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        return pokemon_name, None, f"HTTP status {response.get('status_code')}"
+
+    try:
+        message = response["body"]["choices"][0]["message"]
+    except (KeyError, IndexError, TypeError):
+        return pokemon_name, None, "Malformed response body"
+
+    if message.get("refusal"):
+        return pokemon_name, None, f"Refused: {message['refusal']}"
+
+    try:
+        nicknames = Nicknames.model_validate_json(message.get("content") or "")
+    except ValidationError as e:
+        return pokemon_name, None, f"Invalid structured output: {e.errors()[0]['msg']}"
+
+    return pokemon_name, nicknames.nicknames, None
+
+
+def iter_batch_results(
+    results_path: str,
+) -> Iterator[Tuple[str, Optional[List[str]], Optional[str]]]:
+    """
+    Stream the parsed results of a batch results file, one line at a time.
+
+    Args:
+        results_path: Path to the results JSONL file
+
+    Yields:
+        (pokemon_name, nicknames, error) tuples
+    """
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                pokemon_name, nicknames, error = parse_batch_result(line)
+            except json.JSONDecodeError:
+                pokemon_name, nicknames, error = "", None, "invalid JSON"
+
+            # Without a Pokémon name, the line number is all that locates an error
+            if error and not pokemon_name:
+                error = f"Line {line_number}: {error}"
+
+            yield pokemon_name, nicknames, error
+
+
+def ingest_batch_results(
+    results_path: str, db: PokemonDatabase, chunk_size: int = 1000
+) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    Load the nicknames from a batch results file into the database.
+
+    The file is streamed and written in chunks; existing nicknames are replaced,
+    so ingesting the same file twice gives the same result.
+
+    Args:
+        results_path: Path to the results JSONL file
+        db: The database instance
+        chunk_size: Number of records written per transaction
+
+    Returns:
+        The number of Pokémon loaded and a list of (pokemon_name, error) pairs
+    """
+    loaded = 0
+    errors = []
+    chunk = []
+
+    for pokemon_name, nicknames, error in iter_batch_results(results_path):
+        if error:
+            errors.append((pokemon_name, error))
+            continue
+
+        chunk.append({"name": pokemon_name, "nicknames": nicknames})
+        if len(chunk) >= chunk_size:
+            loaded += db.add_many(chunk)
+            chunk = []
+
+    if chunk:
+        loaded += db.add_many(chunk)
+
+    return loaded, errors
@@ -0,0 +1,852 @@
+import csv
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from db import DETAILED_EXPORT_COLUMNS, PokemonDatabase
+
+if TYPE_CHECKING:
+    import numpy as np
+
+app = typer.Typer()
+console = Console()
+
+TYPES = [
+    "normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison",
+    "ground", "flying", "psychic", "bug", "rock", "ghost", "dragon",
+]  # fmt: skip
+
+
+def build_synthetic_database(db_path: str, rows: int, seed: int = 0) -> None:
+    """
+    Fill a database with synthetic Pokémon, details and nicknames.
+
+    Args:
+        db_path: Path to the SQLite database file
+        rows: Number of Pokémon to create
+        seed: Random seed, so runs are comparable
+    """
+    rng = random.Random(seed)
+    move_pool = [f"move-{i}" for i in range(500)]
+
+    records = []
+    for i in range(rows):
+        records.append(
+            {
+                "name": f"pokemon-{i:06d}",
+                "details": {
+                    "pokedex_id": i + 1,
+                    "height": rng.randint(1, 200),
+                    "weight": rng.randint(1, 9999),
+                    "types": ",".join(rng.sample(TYPES, rng.randint(1, 2))),
+                    "color": rng.choice(["red", "blue", "green", "yellow"]),
+                    "habitat": rng.choice(["forest", "cave", "sea", None]),
+                    "moves": rng.sample(move_pool, 20),
+                },
+                "nicknames": [f"Nick{i}-{j}" for j in range(5)],
+            }
+        )
+
+    with PokemonDatabase(db_path) as db:
+        db.add_many(records)
+
+
+def legacy_detailed_export(db: PokemonDatabase, csv_path: str) -> int:
+    """
+    The previous detailed export: one query for the list, then an id, moves and
+    nicknames lookup per Pokémon, buffered before writing.
+    """
+    cursor = db._connect().cursor()
+    cursor.execute("""
+    SELECT p.name, p.pokedex_id, d.height, d.weight,
+        (
+            SELECT GROUP_CONCAT(name, ',') FROM (
+                SELECT t.name FROM pokemon_types pt
+                JOIN types t ON t.id = pt.type_id
+                WHERE pt.pokemon_id = p.id ORDER BY pt.slot
+            )
+        ),
+        d.color, d.habitat
+    FROM pokemon p
+    LEFT JOIN pokemon_details d ON p.id = d.pokemon_id
+    ORDER BY p.name
+    """)
+
+    export_data = []
+    for row in cursor.fetchall():
+        cursor.execute("SELECT id FROM pokemon WHERE name = ?", (row[0],))
+        pokemon_id = cursor.fetchone()[0]
+
+        cursor.execute(
+            """
+        SELECT m.name FROM pokemon_moves pm
+        JOIN moves m ON m.id = pm.move_id
+        WHERE pm.pokemon_id = ? ORDER BY m.name
+        """,
+            (pokemon_id,),
+        )
+        moves_str = ",".join(r[0] for r in cursor.fetchall())
+
+        cursor.execute(
+            """
+        SELECT nickname1, nickname2, nickname3, nickname4, nickname5
+        FROM nicknames WHERE pokemon_id = ?
+        """,
+            (pokemon_id,),
+        )
+        nickname_row = cursor.fetchone()
+        nicknames = list(nickname_row) if nickname_row else [None] * 5
+
+        export_data.append(row + (moves_str,) + tuple(nicknames))
+
+    with open(csv_path, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(DETAILED_EXPORT_COLUMNS)
+        writer.writerows(export_data)
+
+    return len(export_data)
+
+
+def measure(func: Callable[[], int]) -> Dict[str, float]:
+    """
+    Run a function once and record its wall time and peak Python memory.
+
+    Args:
+        func: The function to run, returning a row count
+
+    Returns:
+        A dictionary with the row count, seconds and peak memory in MiB
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"rows": rows, "seconds": elapsed, "peak_mib": peak / (1024 * 1024)}
+
+
+@app.callback()
+def main():
+    """Benchmarks for the Pokémon nickname tools."""
+
+
+@app.command()
+def export(
+    sizes: List[int] = typer.Option(
+        [151, 10_000, 50_000], "--rows", "-n", help="Catalog sizes to benchmark"
+    ),
+    skip_legacy: bool = typer.Option(
+        False, "--skip-legacy", help="Only run the current export"
+    ),
+):
+    """Compare the detailed CSV export against the previous N+1 implementation."""
+    table = Table(title="Detailed CSV export")
+    table.add_column("Rows", justify="right")
+    table.add_column("Implementation")
+    table.add_column("Time (s)", justify="right")
+    table.add_column("Rows/s", justify="right")
+    table.add_column("Peak memory (MiB)", justify="right")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            db_path = os.path.join(tmp_dir, f"bench_{size}.db")
+            csv_path = os.path.join(tmp_dir, f"bench_{size}.csv")
+
+            console.print(f"[bold]Building synthetic database with {size} rows...[/bold]")
+            build_synthetic_database(db_path, size)
+
+            with PokemonDatabase(db_path) as db:
+                implementations = [
+                    ("streaming", lambda: db.export_detailed_csv(csv_path))
+                ]
+                if not skip_legacy:
+                    implementations.append(
+                        ("legacy N+1", lambda: legacy_detailed_export(db, csv_path))
+                    )
+
+                for label, func in implementations:
+                    result = measure(func)
+                    table.add_row(
+                        str(size),
+                        label,
+                        f"{result['seconds']:.3f}",
+                        f"{result['rows'] / result['seconds']:,.0f}",
+                        f"{result['peak_mib']:.1f}",
+                    )
+
+    console.print(table)
+
+
+@app.command()
+def load(
+    rows: int = typer.Option(50_000, "--rows", "-n", help="Catalog size to benchmark"),
+    repeat: int = typer.Option(3, "--repeat", "-r", help="Loads per format"),
+):
+    """Compare how fast the detailed export loads back into pandas per format."""
+    import pandas as pd
+    import pyarrow as pa
+
+    def load_csv(path: str) -> int:
+        frame = pd.read_csv(path)
+        for column in ("types", "moves"):
+            frame[column] = frame[column].str.split(",")
+        return len(frame)
+
+    loaders = {
+        "csv": load_csv,
+        "parquet": lambda path: len(pd.read_parquet(path)),
+        "feather": lambda path: len(pd.read_feather(path)),
+        "arrow": lambda path: len(pa.ipc.open_stream(path).read_all().to_pandas()),
+    }
+
+    table = Table(title=f"Loading a detailed export of {rows} rows")
+    table.add_column("Format")
+    table.add_column("Export (s)", justify="right")
+    table.add_column("File size (MiB)", justify="right")
+    table.add_column("Load (s)", justify="right")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        console.print(f"[bold]Building synthetic database with {rows} rows...[/bold]")
+        build_synthetic_database(db_path, rows)
+
+        with PokemonDatabase(db_path) as db:
+            for fmt, loader in loaders.items():
+                path = os.path.join(tmp_dir, f"bench.{fmt}")
+
+                start = time.perf_counter()
+                if fmt == "csv":
+                    db.export_detailed_csv(path)
+                else:
+                    db.export_columnar(path, fmt, detailed=True)
+                export_seconds = time.perf_counter() - start
+
+                # Keep the best of several loads to smooth out noise
+                load_seconds = float("inf")
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    loader(path)
+                    load_seconds = min(load_seconds, time.perf_counter() - start)
+
+                table.add_row(
+                    fmt,
+                    f"{export_seconds:.3f}",
+                    f"{os.path.getsize(path) / (1024 * 1024):.1f}",
+                    f"{load_seconds:.3f}",
+                )
+
+    console.print(table)
+
+
+def synthetic_embeddings(
+    rows: int, dim: int = 192, clusters: int = 1000, seed: int = 0
+) -> "np.ndarray":
+    """
+    Generate normalized vectors grouped around random centres, like sprite
+    embeddings of related Pokémon and their forms.
+
+    Args:
+        rows: Number of vectors
+        dim: Number of dimensions
+        clusters: Number of centres
+        seed: Random seed, so runs are comparable
+
+    Returns:
+        A (rows, dim) float32 array of normalized vectors
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(clusters, size=rows)]
+    vectors += rng.normal(scale=1.5, size=(rows, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return vectors
+
+
+@app.command()
+def ann(
+    rows: int = typer.Option(100_000, "--rows", "-n", help="Number of vectors"),
+    queries: int = typer.Option(200, "--queries", "-q", help="Number of queries"),
+    k: int = typer.Option(10, "--k", "-k", help="Neighbours per query"),
+    nprobes: List[int] = typer.Option(
+        [1, 4, 8, 16, 32], "--nprobe", help="nprobe values to benchmark"
+    ),
+):
+    """Compare recall and latency of the IVF index against exact search."""
+    import numpy as np
+
+    from ann_index import IVFIndex
+    from embeddings import top_k
+
+    console.print(f"[bold]Generating {rows} synthetic vectors...[/bold]")
+    vectors = synthetic_embeddings(rows)
+    names = [f"sprite-{i:07d}" for i in range(rows)]
+    query_rows = np.random.default_rng(1).choice(rows, queries, replace=False)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index_dir = os.path.join(tmp_dir, "ann")
+
+        start = time.perf_counter()
+        index = IVFIndex.build(index_dir, names, ["0" * 64] * rows, vectors)
+        build_seconds = time.perf_counter() - start
+        index_mib = sum(
+            os.path.getsize(os.path.join(index_dir, name))
+            for name in os.listdir(index_dir)
+        ) / (1024 * 1024)
+
+        console.print(
+            f"Built {index.meta['n_lists']} lists in {build_seconds:.2f}s "
+            f"({index_mib:.1f} MiB on disk)"
+        )
+
+        table = Table(title=f"Top-{k} search over {rows} vectors ({queries} queries)")
+        table.add_column("Method")
+        table.add_column("Recall", justify="right")
+        table.add_column("p50 (ms)", justify="right")
+        table.add_column("p95 (ms)", justify="right")
+
+        def report(label: str, timings: List[float], recall: float) -> None:
+            timings = sorted(timings)
+            table.add_row(
+                label,
+                f"{recall:.3f}",
+                f"{statistics.median(timings) * 1000:.2f}",
+                f"{timings[int(0.95 * (len(timings) - 1))] * 1000:.2f}",
+            )
+
+        # Exact search is the ground truth
+        truth = []
+        timings = []
+        for row in query_rows:
+            start = time.perf_counter()
+            result = top_k(vectors, vectors[row], k, exclude=int(row))
+            timings.append(time.perf_counter() - start)
+            truth.append({names[i] for i, _ in result})
+        report("exact", timings, 1.0)
+
+        for nprobe in nprobes:
+            hits = 0
+            timings = []
+            for row, expected in zip(query_rows, truth):
+                start = time.perf_counter()
+                result = index.search(vectors[row], k, nprobe=nprobe, exclude=names[row])
+                timings.append(time.perf_counter() - start)
+                hits += len(expected & {name for name, _ in result})
+            report(f"ivf nprobe={nprobe}", timings, hits / (len(truth) * k))
+
+    console.print(table)
+
+
+# CLI invocations timed by the startup benchmark
+STARTUP_COMMANDS = [
+    ["--help"],
+    ["list-pokemon"],
+    ["view", "pikachu"],
+    ["details", "pikachu"],
+    ["export", "--help"],
+]
+
+
+def module_import_times(module: str) -> Dict[str, float]:
+    """
+    Get the cumulative import time of a module and its direct imports.
+
+    Args:
+        module: The module to import
+
+    Returns:
+        A dictionary of module name to cumulative import time in milliseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # Lines look like "import time:   self |  cumulative |   name"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            times[name.strip()] = int(cumulative) / 1000
+
+    return times
+
+
+@app.command()
+def startup(
+    repeat: int = typer.Option(5, "--repeat", "-r", help="Runs per command"),
+):
+    """Measure how long main.py takes to import and to run quick commands."""
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+    def wall_time(args: List[str]) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(args, capture_output=True, check=False)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
+
+    # Interpreter startup on its own, to subtract from the command timings
+    baseline = wall_time([sys.executable, "-c", "pass"])
+
+    imports = module_import_times("main")
+    table = Table(title="Import time of main.py (cumulative, ms)")
+    table.add_column("Module")
+    table.add_column("Time (ms)", justify="right")
+    for name, elapsed in sorted(imports.items(), key=lambda item: -item[1])[:10]:
+        table.add_row(name, f"{elapsed:.1f}")
+    console.print(table)
+
+    table = Table(title=f"Command wall time (median of {repeat} runs)")
+    table.add_column("Command")
+    table.add_column("Total (ms)", justify="right")
+    table.add_column("Over interpreter startup (ms)", justify="right")
+    table.add_row("python -c pass", f"{baseline:.0f}", "0")
+
+    for command in STARTUP_COMMANDS:
+        elapsed = wall_time([sys.executable, main_path, *command])
+        table.add_row(
+            f"main.py {' '.join(command)}", f"{elapsed:.0f}", f"{elapsed - baseline:.0f}"
+        )
+
+    console.print(table)
+
+
+SUITE_SIZES = [151, 10_000, 100_000]
+SUITE_SCENARIOS = ["generate", "details", "export", "database"]
+
+
+def tiny_png(index: int) -> bytes:
+    """
+    Encode a unique 2x2 PNG, so every synthetic sprite has its own contents.
+
+    Args:
+        index: The sprite number, turned into the pixel colours
+
+    Returns:
+        The PNG file contents
+    """
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    pixel = index.to_bytes(4, "big")[1:]
+    rows = b"".join(b"\x00" + pixel * 2 for _ in range(2))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", 2, 2, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+def write_synthetic_sprites(sprites_dir: str, count: int) -> List[str]:
+    """
+    Write a directory of synthetic sprites in the layout of `sprites/`.
+
+    Args:
+        sprites_dir: The directory to create
+        count: Number of sprites
+
+    Returns:
+        The names of the synthetic Pokémon
+    """
+    os.makedirs(sprites_dir, exist_ok=True)
+
+    names = [f"synthetic-{i:06d}" for i in range(count)]
+    for i, name in enumerate(names):
+        with open(os.path.join(sprites_dir, f"{name}_combined.png"), "wb") as f:
+            f.write(tiny_png(i))
+
+    return names
+
+
+def run_measured(args: List[str], cwd: str) -> Dict[str, float]:
+    """
+    Run a command and measure its wall time and peak resident memory.
+
+    Args:
+        args: The command line
+        cwd: The working directory of the command
+
+    Returns:
+        A dictionary with the seconds and the peak RSS in MiB
+
+    Raises:
+        RuntimeError: If the command fails
+    """
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            args, cwd=cwd, stdout=subprocess.DEVNULL, stderr=stderr
+        )
+        # wait4 reports the resource usage of this child alone
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        if process.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(
+                f"{' '.join(args[1:3])} exited with {process.returncode}: "
+                + stderr.read().decode(errors="replace")[-2000:]
+            )
+
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+    return {"seconds": elapsed, "peak_rss_mib": peak}
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    """
+    Summarize durations as millisecond percentiles.
+
+    Args:
+        seconds: The durations in seconds
+
+    Returns:
+        A dictionary with the count and the p50, p95, p99 and max in milliseconds
+    """
+    from metrics import percentile
+
+    values = sorted(seconds)
+    summary = {"count": len(values)}
+    for q in (50, 95, 99):
+        summary[f"p{q}_ms"] = percentile(values, q) * 1000
+    summary["max_ms"] = values[-1] * 1000 if values else float("nan")
+
+    return summary
+
+
+def run_stage_latencies(db_path: str, command: str) -> Dict[str, Any]:
+    """
+    Get the per-stage latencies of the newest recorded run of a command.
+
+    Args:
+        db_path: Path to the SQLite database file
+        command: The command of the run
+
+    Returns:
+        A dictionary with the run's totals and a latency summary per stage
+    """
+    with PokemonDatabase(db_path) as db:
+        run = next(run for run in db.get_runs(limit=50) if run["command"] == command)
+        stages = db.get_stage_durations([run["id"]])
+
+    return {
+        "retries": run["retries"],
+        "prompt_tokens": run["prompt_tokens"],
+        "completion_tokens": run["completion_tokens"],
+        "stages": {
+            stage: dict(latency_summary(entry["seconds"]), errors=entry["errors"])
+            for stage, entry in stages.items()
+        },
+    }
+
+
+def database_workload(db_path: str, rows: int, lookups: int) -> Dict[str, Any]:
+    """
+    Run a PokemonDatabase workload: a bulk load, point lookups, searches and a
+    full DataFrame load.
+
+    Args:
+        db_path: Path of a new SQLite database file
+        rows: Number of Pokémon to load
+        lookups: Number of lookups and searches
+
+    Returns:
+        A dictionary of timings per operation
+    """
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    build_synthetic_database(db_path, rows)
+    load_seconds = time.perf_counter() - start
+
+    names = [f"pokemon-{rng.randrange(rows):06d}" for _ in range(lookups)]
+    operations = {
+        "get_nicknames": lambda db, name: db.get_nicknames(name),
+        "get_pokemon_details": lambda db, name: db.get_pokemon_details(name),
+        "search_nicknames": lambda db, name: db.search_nicknames(
+            f"Nick{name[-4:].lstrip('0') or '0'}"
+        ),
+    }
+
+    results: Dict[str, Any] = {
+        "add_many": {"seconds": load_seconds, "rows_per_second": rows / load_seconds}
+    }
+    with PokemonDatabase(db_path) as db:
+        for operation, func in operations.items():
+            timings = []
+            for name in names:
+                start = time.perf_counter()
+                func(db, name)
+                timings.append(time.perf_counter() - start)
+            results[operation] = latency_summary(timings)
+
+        start = time.perf_counter()
+        frame = db.to_dataframe()
+        elapsed = time.perf_counter() - start
+        results["to_dataframe"] = {
+            "seconds": elapsed,
+            "rows_per_second": len(frame) / elapsed,
+        }
+
+    return results
+
+
+@app.command(hidden=True)
+def database(
+    db_path: str = typer.Option(..., "--db", help="Path of a new SQLite database file"),
+    rows: int = typer.Option(10_000, "--rows", "-n", help="Number of Pokémon"),
+    lookups: int = typer.Option(1000, "--lookups", help="Number of lookups"),
+    output: str = typer.Option(..., "--output", "-o", help="JSON file for the results"),
+):
+    """Run the PokemonDatabase workload of the suite (in its own process)."""
+    with open(output, "w") as f:
+        json.dump(database_workload(db_path, rows, lookups), f)
+
+
+def run_suite_size(
+    workspace: str,
+    size: int,
+    scenarios: List[str],
+    openai_url: str,
+    pokeapi_url: str,
+    concurrency: int,
+    pack: int,
+    details_runs: int,
+) -> List[Dict[str, Any]]:
+    """
+    Run the suite's scenarios against one synthetic catalog.
+
+    Args:
+        workspace: An empty directory to run in, which becomes the working
+            directory of the commands
+        size: Number of synthetic Pokémon
+        scenarios: The scenarios to run
+        openai_url: Base URL of the fake OpenAI API
+        pokeapi_url: Base URL of the fake PokéAPI
+        concurrency: Number of nickname requests in flight
+        pack: Number of sprites per request
+        details_runs: Number of `details` commands to time
+
+    Returns:
+        One result dictionary per scenario step
+    """
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    db_path = os.path.join(workspace, "pokemon_nicknames.db")
+
+    def main_py(*args: str) -> Dict[str, float]:
+        args = [sys.executable, main_path, *args, "--db", db_path]
+        return run_measured(args, workspace)
+
+    start = time.perf_counter()
+    names = write_synthetic_sprites(os.path.join(workspace, "sprites"), size)
+    elapsed = time.perf_counter() - start
+    console.print(f"[dim]{size} synthetic sprites written in {elapsed:.1f}s[/dim]")
+
+    results = []
+
+    def add(
+        scenario: str, measured: Dict[str, float], items: int, **extra: Any
+    ) -> None:
+        result = {
+            "size": size,
+            "scenario": scenario,
+            "items": items,
+            "seconds": measured["seconds"],
+            "items_per_second": items / measured["seconds"],
+            "peak_rss_mib": measured["peak_rss_mib"],
+        }
+        result.update(extra)
+        results.append(result)
+        console.print(
+            f"{size:>7} {scenario:<20} {result['seconds']:8.2f}s "
+            f"{result['items_per_second']:10.1f}/s {result['peak_rss_mib']:7.0f} MiB"
+        )
+
+    if "generate" in scenarios:
+        measured = main_py(
+            "generate",
+            "--backend", "local",
+            "--base-url", openai_url,
+            "--pokeapi-url", pokeapi_url,
+            "--concurrency", str(concurrency),
+            "--pack", str(pack),
+            "--no-cache",
+        )  # fmt: skip
+        add("generate", measured, size, **run_stage_latencies(db_path, "generate"))
+
+    if "details" in scenarios:
+        rng = random.Random(size)
+        runs = [main_py("details", rng.choice(names)) for _ in range(details_runs)]
+        add(
+            "details",
+            {
+                "seconds": sum(run["seconds"] for run in runs),
+                "peak_rss_mib": max(run["peak_rss_mib"] for run in runs),
+            },
+            details_runs,
+            latency=latency_summary([run["seconds"] for run in runs]),
+        )
+
+    if "export" in scenarios:
+        for fmt in ("csv", "parquet"):
+            output = os.path.join(workspace, f"export.{fmt}")
+            measured = main_py("export", output, "--detailed", "--format", fmt)
+            add(f"export-{fmt}", measured, size, bytes=os.path.getsize(output))
+
+    if "database" in scenarios:
+        output = os.path.join(workspace, "database.json")
+        measured = run_measured(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "database",
+                "--db", os.path.join(workspace, "workload.db"),
+                "--rows", str(size),
+                "--output", output,
+            ],  # fmt: skip
+            workspace,
+        )
+        with open(output) as f:
+            add("database", measured, size, operations=json.load(f))
+
+    return results
+
+
+@app.command()
+def suite(
+    sizes: List[int] = typer.Option(
+        SUITE_SIZES, "--size", "-n", help="Catalog sizes to run (repeatable)"
+    ),
+    scenarios: List[str] = typer.Option(
+        SUITE_SCENARIOS,
+        "--scenario",
+        "-s",
+        help="Scenarios to run (generate, details, export, database; repeatable)",
+    ),
+    output: str = typer.Option(
+        "benchmark_results.json", "--output", "-o", help="JSON file for the results"
+    ),
+    latency_ms: float = typer.Option(
+        50, "--latency-ms", help="Mean latency of the fake OpenAI API"
+    ),
+    pokeapi_latency_ms: float = typer.Option(
+        5, "--pokeapi-latency-ms", help="Mean latency of the fake PokéAPI"
+    ),
+    error_rate: float = typer.Option(
+        0.0, "--error-rate", help="Share of requests the fake APIs fail with a 500"
+    ),
+    max_in_flight: Optional[int] = typer.Option(
+        None,
+        "--max-in-flight",
+        help="Concurrent requests the fake OpenAI API allows before returning 429s",
+    ),
+    concurrency: int = typer.Option(
+        32, "--concurrency", "-c", help="Nickname requests in flight"
+    ),
+    pack: int = typer.Option(1, "--pack", "-k", help="Sprites per request"),
+    details_runs: int = typer.Option(
+        10, "--details-runs", help="Number of details commands to time per size"
+    ),
+):
+    """Run the offline end-to-end suite against fake APIs and write JSON results."""
+    from fake_servers import FakeOpenAIServer, FakePokeAPIServer
+
+    unknown = set(scenarios) - set(SUITE_SCENARIOS)
+    if unknown:
+        console.print(
+            "[bold red]Error:[/bold red] Unknown scenario(s): "
+            + ", ".join(sorted(unknown))
+        )
+        raise typer.Exit(1)
+
+    report: Dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "sizes": sizes,
+            "scenarios": scenarios,
+            "latency_ms": latency_ms,
+            "pokeapi_latency_ms": pokeapi_latency_ms,
+            "error_rate": error_rate,
+            "max_in_flight": max_in_flight,
+            "concurrency": concurrency,
+            "pack": pack,
+        },
+        "results": [],
+    }
+
+    for size in sizes:
+        # Fresh servers per size, so their request counts belong to one catalog
+        with FakeOpenAIServer(
+            latency_ms, error_rate=error_rate, max_in_flight=max_in_flight
+        ) as openai, FakePokeAPIServer(
+            pokeapi_latency_ms, error_rate=error_rate
+        ) as pokeapi, tempfile.TemporaryDirectory() as workspace:
+            try:
+                results = run_suite_size(
+                    workspace,
+                    size,
+                    scenarios,
+                    f"{openai.url}/v1",
+                    f"{pokeapi.url}/api/v2",
+                    concurrency,
+                    pack,
+                    details_runs,
+                )
+            except RuntimeError as e:
+                console.print(f"[bold red]Error:[/bold red] {e}")
+                raise typer.Exit(1)
+
+            for result in results:
+                if result["scenario"] == "generate":
+                    result["servers"] = {
+                        "openai": openai.stats(),
+                        "pokeapi": pokeapi.stats(),
+                    }
+            report["results"].extend(results)
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    console.print(
+        f"[bold green]Wrote {len(report['results'])} results to {output}[/bold green]"
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,386 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+
+SPRITES_DIR = "sprites"
+DEFAULT_SPRITE_CACHE_PATH = os.path.join(".cache", "sprite_payloads.db")
+DEFAULT_DB_PATH = "pokemon_nicknames.db"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def sprite_path(pokemon_name: str, sprites_dir: str = SPRITES_DIR) -> str:
+    """
+    Get the path of the combined sprite for a Pokémon.
+
+    Args:
+        pokemon_name: The name of the Pokémon
+        sprites_dir: The directory containing the sprites
+
+    Returns:
+        The path of the sprite file
+    """
+    return os.path.join(sprites_dir, f"{pokemon_name}_combined.png")
+
+
+def response_cache_path(db_path: str = DEFAULT_DB_PATH) -> str:
+    """
+    Get the path of the response cache that sits next to a database file.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        The path of the response cache file
+    """
+    return f"{os.path.splitext(db_path)[0]}_responses.db"
+
+
+def ann_index_path(db_path: str = DEFAULT_DB_PATH) -> str:
+    """
+    Get the directory of the nearest-neighbour index that sits next to a database file.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        The path of the index directory
+    """
+    return f"{os.path.splitext(db_path)[0]}_ann"
+
+
+def encode_sprite(image_bytes: bytes) -> str:
+    """
+    Encode sprite file contents as a base64 PNG data URL.
+
+    PNG files are encoded as-is; other formats are decoded and re-encoded as PNG.
+
+    Args:
+        image_bytes: The raw contents of the sprite file
+
+    Returns:
+        A data URL ready to send to the model
+    """
+    if not image_bytes.startswith(PNG_SIGNATURE):
+        from PIL import Image
+
+        img_byte_arr = io.BytesIO()
+        Image.open(io.BytesIO(image_bytes)).save(img_byte_arr, format="PNG")
+        image_bytes = img_byte_arr.getvalue()
+
+    return f"data:image/png;base64,{base64.b64encode(image_bytes).decode('utf-8')}"
+
+
+class SpritePayload(NamedTuple):
+    """
+    An encoded sprite and the hash of the file it was built from.
+    """
+
+    sha256: str
+    data_url: str
+
+
+class SpritePayloadCache:
+    """
+    An on-disk cache of encoded sprite payloads.
+
+    Entries are keyed by file path and validated against the file's mtime and size;
+    when those change the file is re-hashed, and only re-encoded if its content hash
+    changed too.
+    """
+
+    def __init__(self, cache_path: str = DEFAULT_SPRITE_CACHE_PATH):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_path: Path to the SQLite cache file
+        """
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._memo: Dict[str, tuple] = {}
+
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        # Sharded generate processes share this cache; let them read while one writes
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS sprite_payloads (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            data_url TEXT NOT NULL
+        )
+        """)
+        self._conn.commit()
+
+    def get(self, path: str) -> SpritePayload:
+        """
+        Get the encoded payload for a sprite file, encoding it if needed.
+
+        Args:
+            path: Path to the sprite file
+
+        Returns:
+            The sprite payload
+
+        Raises:
+            FileNotFoundError: If the sprite file does not exist
+        """
+        stat = os.stat(path)
+
+        with self._lock:
+            # Check the in-process memo first, then the on-disk cache
+            entry = self._memo.get(path)
+            if entry is None:
+                entry = self._conn.execute(
+                    "SELECT mtime_ns, size, sha256, data_url FROM sprite_payloads WHERE path = ?",
+                    (path,),
+                ).fetchone()
+
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._memo[path] = entry
+                return SpritePayload(entry[2], entry[3])
+
+            with open(path, "rb") as f:
+                image_bytes = f.read()
+            sha256 = hashlib.sha256(image_bytes).hexdigest()
+
+            # Only re-encode if the content actually changed
+            if entry and entry[2] == sha256:
+                data_url = entry[3]
+            else:
+                data_url = encode_sprite(image_bytes)
+
+            entry = (stat.st_mtime_ns, stat.st_size, sha256, data_url)
+            self._conn.execute(
+                """
+            INSERT OR REPLACE INTO sprite_payloads (
+                path, mtime_ns, size, sha256, data_url
+            ) VALUES (?, ?, ?, ?, ?)
+            """,
+                (path, *entry),
+            )
+            self._conn.commit()
+            self._memo[path] = entry
+
+            return SpritePayload(sha256, data_url)
+
+    def warm(self, sprites_dir: str = SPRITES_DIR) -> int:
+        """
+        Encode every combined sprite in a directory into the cache.
+
+        Args:
+            sprites_dir: The directory containing the sprites
+
+        Returns:
+            The number of sprites in the cache
+        """
+        from catalog import get_catalog
+
+        count = 0
+        for entry in get_catalog(sprites_dir):
+            self.get(entry.path)
+            count += 1
+
+        return count
+
+    def close(self) -> None:
+        """
+        Close the cache database.
+        """
+        self._conn.close()
+
+
+_default_sprite_cache: Optional[SpritePayloadCache] = None
+
+
+def get_default_sprite_cache() -> SpritePayloadCache:
+    """
+    Get the process-wide sprite payload cache at the default location.
+    """
+    global _default_sprite_cache
+    if _default_sprite_cache is None:
+        _default_sprite_cache = SpritePayloadCache()
+    return _default_sprite_cache
+
+
+class ResponseCache:
+    """
+    A content-addressed SQLite cache of model responses.
+
+    Keys hash everything that determines a response: the sprite contents, the
+    system prompt, the model, the temperature and a sample index. Entries older
+    than `max_age` are dropped, and the least recently used entries are evicted
+    once the cache grows beyond `max_entries`.
+    """
+
+    # Evict after this many writes rather than on every write
+    EVICT_EVERY = 100
+
+    def __init__(
+        self,
+        cache_path: str = response_cache_path(),
+        max_entries: Optional[int] = 50_000,
+        max_age: Optional[float] = 90 * 24 * 60 * 60,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_path: Path to the SQLite cache file
+            max_entries: Maximum number of entries to keep (None for no limit)
+            max_age: Maximum age of an entry in seconds (None for no limit)
+        """
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            nicknames TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used_at)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(
+        sprite_sha256: str,
+        system_prompt: str,
+        model: str,
+        temperature: float,
+        sample_index: int = 0,
+    ) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            sprite_sha256: The SHA-256 of the sprite file contents
+            system_prompt: The system prompt sent with the sprite
+            model: The name of the chat model
+            temperature: Sampling temperature
+            sample_index: Index of the sample, to keep several responses for the same input
+
+        Returns:
+            The hex digest used as the cache key
+        """
+        key_data = json.dumps(
+            [sprite_sha256, system_prompt, model, temperature, sample_index]
+        )
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """
+        Get the cached nicknames for a key.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The cached nicknames, or None on a miss
+        """
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT nicknames, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if not row:
+                return None
+
+            if self.max_age is not None and now - row[1] > self.max_age:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+
+        return json.loads(row[0])
+
+    def put(self, key: str, nicknames: List[str]) -> None:
+        """
+        Store the nicknames for a key.
+
+        Args:
+            key: The cache key
+            nicknames: The nicknames returned by the model
+        """
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                """
+            INSERT OR REPLACE INTO responses (
+                key, nicknames, created_at, last_used_at
+            ) VALUES (?, ?, ?, ?)
+            """,
+                (key, json.dumps(nicknames), now, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+
+        if self._writes % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop expired entries and trim the cache to its maximum size.
+
+        Returns:
+            The number of entries removed
+        """
+        removed = 0
+
+        with self._lock:
+            if self.max_age is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?",
+                    (time.time() - self.max_age,),
+                )
+                removed += cursor.rowcount
+
+            if self.max_entries is not None:
+                cursor = self._conn.execute(
+                    """
+                DELETE FROM responses WHERE key NOT IN (
+                    SELECT key FROM responses ORDER BY last_used_at DESC LIMIT ?
+                )
+                """,
+                    (self.max_entries,),
+                )
+                removed += cursor.rowcount
+
+            self._conn.commit()
+
+        return removed
+
+    def close(self) -> None:
+        """
+        Close the cache database.
+        """
+        self._conn.close()
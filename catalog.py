@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from cache import PNG_SIGNATURE, SPRITES_DIR
+
+
+DEFAULT_CATALOG_PATH = os.path.join(".cache", "sprite_catalog.json")
+
+SPRITE_SUFFIX = "_combined.png"
+
+# Bump when the index layout changes so old indexes are rebuilt
+CATALOG_VERSION = 1
+
+
+class SpriteEntry(NamedTuple):
+    """
+    A sprite file in the catalog.
+    """
+
+    name: str
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    width: int
+    height: int
+
+
+def image_dimensions(image_bytes: bytes) -> Tuple[int, int]:
+    """
+    Get the width and height of an image.
+
+    PNG dimensions are read from the header; other formats are decoded with PIL.
+
+    Args:
+        image_bytes: The raw contents of the image file
+
+    Returns:
+        The width and height in pixels
+    """
+    if image_bytes.startswith(PNG_SIGNATURE) and len(image_bytes) >= 24:
+        return struct.unpack(">II", image_bytes[16:24])
+
+    import io
+
+    from PIL import Image
+
+    return Image.open(io.BytesIO(image_bytes)).size
+
+
+class SpriteCatalog:
+    """
+    A persistent index of the combined sprites in a directory.
+
+    The index is stored as JSON and reused as long as the directory's mtime is
+    unchanged, so loading it costs one stat instead of a directory listing. When
+    the directory changes, only new or modified files are re-hashed.
+
+    Adding, removing or renaming sprites changes the directory mtime; editing a
+    sprite in place does not, so consumers that depend on file contents (like
+    SpritePayloadCache) still validate each file's own mtime and size.
+    """
+
+    def __init__(
+        self,
+        sprites_dir: str = SPRITES_DIR,
+        index_path: Optional[str] = DEFAULT_CATALOG_PATH,
+    ):
+        """
+        Initialize the catalog.
+
+        Args:
+            sprites_dir: The directory containing the sprites
+            index_path: Path to the JSON index file (None to keep it in memory only)
+        """
+        self.sprites_dir = sprites_dir
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._dir_mtime_ns: Optional[int] = None
+        self._entries: Dict[str, SpriteEntry] = {}
+
+        self.refresh()
+
+    def _load_index(self) -> Optional[Dict]:
+        """
+        Read the JSON index file.
+
+        Returns:
+            The index, or None if it is missing, unreadable or for another directory
+        """
+        if not self.index_path:
+            return None
+
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (
+            index.get("version") != CATALOG_VERSION
+            or index.get("sprites_dir") != os.path.abspath(self.sprites_dir)
+        ):
+            return None
+
+        return index
+
+    def _save_index(self) -> None:
+        """
+        Write the JSON index file atomically.
+        """
+        if not self.index_path:
+            return
+
+        index_dir = os.path.dirname(self.index_path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+
+        index = {
+            "version": CATALOG_VERSION,
+            "sprites_dir": os.path.abspath(self.sprites_dir),
+            "dir_mtime_ns": self._dir_mtime_ns,
+            "sprites": {
+                name: entry._asdict() for name, entry in sorted(self._entries.items())
+            },
+        }
+
+        # Write to a temporary file first so readers never see a partial index
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _scan(self, previous: Dict[str, SpriteEntry]) -> Dict[str, SpriteEntry]:
+        """
+        List the sprites directory, reusing entries whose files are unchanged.
+
+        Args:
+            previous: The entries from the last scan
+
+        Returns:
+            The entries for the sprites currently in the directory
+        """
+        entries = {}
+
+        with os.scandir(self.sprites_dir) as it:
+            for dir_entry in it:
+                if not dir_entry.name.endswith(SPRITE_SUFFIX):
+                    continue
+
+                name = dir_entry.name[: -len(SPRITE_SUFFIX)]
+                stat = dir_entry.stat()
+
+                old = previous.get(name)
+                if (
+                    old
+                    and old.path == dir_entry.path
+                    and old.size == stat.st_size
+                    and old.mtime_ns == stat.st_mtime_ns
+                ):
+                    entries[name] = old
+                    continue
+
+                with open(dir_entry.path, "rb") as f:
+                    image_bytes = f.read()
+                width, height = image_dimensions(image_bytes)
+
+                entries[name] = SpriteEntry(
+                    name=name,
+                    path=dir_entry.path,
+                    size=stat.st_size,
+                    mtime_ns=stat.st_mtime_ns,
+                    sha256=hashlib.sha256(image_bytes).hexdigest(),
+                    width=width,
+                    height=height,
+                )
+
+        return entries
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Bring the catalog up to date with the sprites directory.
+
+        Args:
+            force: Re-check every file even if the directory mtime is unchanged
+
+        Returns:
+            Whether the directory had to be scanned
+
+        Raises:
+            FileNotFoundError: If the sprites directory does not exist
+        """
+        with self._lock:
+            dir_mtime_ns = os.stat(self.sprites_dir).st_mtime_ns
+
+            if not force and dir_mtime_ns == self._dir_mtime_ns:
+                return False
+
+            # Load the persisted index the first time round
+            if self._dir_mtime_ns is None:
+                index = self._load_index()
+                if index:
+                    self._entries = {
+                        name: SpriteEntry(**fields)
+                        for name, fields in index["sprites"].items()
+                    }
+                    if not force and index["dir_mtime_ns"] == dir_mtime_ns:
+                        self._dir_mtime_ns = dir_mtime_ns
+                        return False
+
+            self._entries = self._scan(self._entries)
+            self._dir_mtime_ns = dir_mtime_ns
+            self._save_index()
+
+            return True
+
+    def get(self, pokemon_name: str) -> Optional[SpriteEntry]:
+        """
+        Get the catalog entry for a Pokémon.
+
+        Args:
+            pokemon_name: The name of the Pokémon
+
+        Returns:
+            The sprite entry, or None if there is no sprite
+        """
+        return self._entries.get(pokemon_name)
+
+    def names(self) -> List[str]:
+        """
+        Get the names of all Pokémon with a sprite.
+
+        Returns:
+            The sorted Pokémon names
+        """
+        return sorted(self._entries)
+
+    def __contains__(self, pokemon_name: object) -> bool:
+        return pokemon_name in self._entries
+
+    def __iter__(self) -> Iterator[SpriteEntry]:
+        return iter(self._entries[name] for name in self.names())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_default_catalogs: Dict[str, SpriteCatalog] = {}
+
+
+def get_catalog(sprites_dir: str = SPRITES_DIR) -> SpriteCatalog:
+    """
+    Get the process-wide catalog for a sprites directory, refreshed if it changed.
+
+    Args:
+        sprites_dir: The directory containing the sprites
+
+    Returns:
+        The sprite catalog
+
+    Raises:
+        FileNotFoundError: If the sprites directory does not exist
+    """
+    catalog = _default_catalogs.get(sprites_dir)
+    if catalog is None:
+        # Keep one index per directory; the default directory uses the default path
+        index_path = DEFAULT_CATALOG_PATH
+        if sprites_dir != SPRITES_DIR:
+            digest = hashlib.sha256(os.path.abspath(sprites_dir).encode()).hexdigest()
+            index_path = os.path.join(".cache", f"sprite_catalog_{digest[:12]}.json")
+
+        catalog = _default_catalogs[sprites_dir] = SpriteCatalog(sprites_dir, index_path)
+    else:
+        catalog.refresh()
+
+    return catalog
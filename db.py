@@ -1,287 +1,1901 @@
+import json
+import queue
 import sqlite3
-from typing import List, Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Dict, Any, Tuple
 import csv
-import pokebase as pb
+
+from metrics import get_recorder
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _migration_1_baseline(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the original tables if they don't exist.
+    """
+    # Create the pokemon table with only basic identification
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pokemon (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        pokedex_id INTEGER
+    )
+    """)
+
+    # Create a separate table for Pokémon details
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pokemon_details (
+        pokemon_id INTEGER PRIMARY KEY,
+        height INTEGER,
+        weight INTEGER,
+        types TEXT,
+        color TEXT,
+        habitat TEXT,
+        FOREIGN KEY (pokemon_id) REFERENCES pokemon (id)
+    )
+    """)
+
+    # Create a table for Pokémon moves
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pokemon_moves (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pokemon_id INTEGER,
+        move_name TEXT,
+        FOREIGN KEY (pokemon_id) REFERENCES pokemon (id),
+        UNIQUE (pokemon_id, move_name)
+    )
+    """)
+
+    # Create the nicknames table with a fixed number of nickname slots
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS nicknames (
+        pokemon_id INTEGER PRIMARY KEY,
+        nickname1 TEXT,
+        nickname2 TEXT,
+        nickname3 TEXT,
+        nickname4 TEXT,
+        nickname5 TEXT,
+        FOREIGN KEY (pokemon_id) REFERENCES pokemon (id)
+    )
+    """)
+
+    # Create the tables for a local PokéAPI snapshot
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pokeapi_pokemon (
+        name TEXT PRIMARY KEY,
+        pokedex_id INTEGER,
+        height INTEGER,
+        weight INTEGER,
+        types TEXT,
+        moves TEXT,
+        species TEXT
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pokeapi_species (
+        name TEXT PRIMARY KEY,
+        color TEXT,
+        habitat TEXT
+    )
+    """)
+
+
+def _migration_2_normalize_moves_and_types(cursor: sqlite3.Cursor) -> None:
+    """
+    Move types and moves into dictionary-encoded tables with covering indexes.
+
+    Types were stored as a comma-joined string in pokemon_details and moves as
+    free text in pokemon_moves; both become integer references into the new
+    types and moves tables.
+    """
+    cursor.execute("""
+    CREATE TABLE types (
+        id INTEGER PRIMARY KEY,
+        name TEXT UNIQUE NOT NULL
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE moves (
+        id INTEGER PRIMARY KEY,
+        name TEXT UNIQUE NOT NULL
+    )
+    """)
+
+    # Types keep their slot so they are returned in PokéAPI order
+    cursor.execute("""
+    CREATE TABLE pokemon_types (
+        pokemon_id INTEGER NOT NULL,
+        slot INTEGER NOT NULL,
+        type_id INTEGER NOT NULL,
+        PRIMARY KEY (pokemon_id, slot),
+        FOREIGN KEY (pokemon_id) REFERENCES pokemon (id),
+        FOREIGN KEY (type_id) REFERENCES types (id)
+    ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+    CREATE TABLE pokemon_moves_new (
+        pokemon_id INTEGER NOT NULL,
+        move_id INTEGER NOT NULL,
+        PRIMARY KEY (pokemon_id, move_id),
+        FOREIGN KEY (pokemon_id) REFERENCES pokemon (id),
+        FOREIGN KEY (move_id) REFERENCES moves (id)
+    ) WITHOUT ROWID
+    """)
+
+    # Split the existing type strings into rows
+    cursor.execute(
+        "SELECT pokemon_id, types FROM pokemon_details WHERE types IS NOT NULL AND types != ''"
+    )
+    type_rows = [
+        (pokemon_id, slot, type_name)
+        for pokemon_id, types in cursor.fetchall()
+        for slot, type_name in enumerate(types.split(","), start=1)
+    ]
+    cursor.executemany(
+        "INSERT OR IGNORE INTO types (name) VALUES (?)",
+        [(type_name,) for _, _, type_name in type_rows],
+    )
+    cursor.executemany(
+        """
+    INSERT INTO pokemon_types (pokemon_id, slot, type_id)
+    SELECT ?, ?, id FROM types WHERE name = ?
+    """,
+        type_rows,
+    )
+
+    # Move the move names into the dictionary
+    cursor.execute("""
+    INSERT OR IGNORE INTO moves (name)
+    SELECT DISTINCT move_name FROM pokemon_moves WHERE move_name IS NOT NULL
+    """)
+    cursor.execute("""
+    INSERT OR IGNORE INTO pokemon_moves_new (pokemon_id, move_id)
+    SELECT pm.pokemon_id, m.id
+    FROM pokemon_moves pm
+    JOIN moves m ON m.name = pm.move_name
+    WHERE pm.pokemon_id IS NOT NULL
+    """)
+    cursor.execute("DROP TABLE pokemon_moves")
+    cursor.execute("ALTER TABLE pokemon_moves_new RENAME TO pokemon_moves")
+
+    # Rebuild pokemon_details without the types column
+    cursor.execute("""
+    CREATE TABLE pokemon_details_new (
+        pokemon_id INTEGER PRIMARY KEY,
+        height INTEGER,
+        weight INTEGER,
+        color TEXT,
+        habitat TEXT,
+        FOREIGN KEY (pokemon_id) REFERENCES pokemon (id)
+    )
+    """)
+    cursor.execute("""
+    INSERT INTO pokemon_details_new (pokemon_id, height, weight, color, habitat)
+    SELECT pokemon_id, height, weight, color, habitat FROM pokemon_details
+    """)
+    cursor.execute("DROP TABLE pokemon_details")
+    cursor.execute("ALTER TABLE pokemon_details_new RENAME TO pokemon_details")
+
+    # Covering indexes for reverse lookups
+    cursor.execute(
+        "CREATE INDEX idx_pokemon_types_type ON pokemon_types (type_id, pokemon_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX idx_pokemon_moves_move ON pokemon_moves (move_id, pokemon_id)"
+    )
+    cursor.execute("CREATE INDEX idx_pokemon_pokedex_id ON pokemon (pokedex_id)")
+
+
+def _migration_3_sprite_embeddings(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the table for sprite embedding vectors.
+
+    Vectors are stored as raw float32 BLOBs, one row per Pokémon name and
+    embedding model, along with the hash of the sprite they were computed from.
+    Keying by name means embedding the sprite catalog does not add rows to the
+    pokemon table.
+    """
+    cursor.execute("""
+    CREATE TABLE sprite_embeddings (
+        pokemon TEXT NOT NULL,
+        model TEXT NOT NULL,
+        sprite_sha256 TEXT NOT NULL,
+        dim INTEGER NOT NULL,
+        vector BLOB NOT NULL,
+        PRIMARY KEY (pokemon, model)
+    )
+    """)
+
+
+# The search index text for each source table, as SQL over {row}, the
+# trigger's NEW or OLD row, or {pokemon_id}
+SEARCH_NICKNAMES_SQL = """TRIM(
+    COALESCE({row}.nickname1, '') || ' ' || COALESCE({row}.nickname2, '') || ' ' ||
+    COALESCE({row}.nickname3, '') || ' ' || COALESCE({row}.nickname4, '') || ' ' ||
+    COALESCE({row}.nickname5, '')
+)"""
+
+SEARCH_TYPES_SQL = """(
+    SELECT GROUP_CONCAT(t.name, ' ')
+    FROM pokemon_types pt
+    JOIN types t ON t.id = pt.type_id
+    WHERE pt.pokemon_id = {pokemon_id}
+)"""
+
+
+def _migration_4_search_index(cursor: sqlite3.Cursor) -> None:
+    """
+    Create a full-text index over nicknames, types, colour and habitat.
+
+    The pokemon_search FTS5 table has one row per Pokémon, keyed by its ID, and
+    is kept in sync by triggers on the tables it draws from. Each trigger only
+    rewrites the columns that come from its own table.
+    """
+    cursor.execute("""
+    CREATE VIRTUAL TABLE pokemon_search USING fts5(
+        name, nicknames, types, color, habitat,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """)
+
+    # A new Pokémon has no nicknames or details yet, so only its name is indexed
+    cursor.execute("""
+    CREATE TRIGGER pokemon_search_pokemon_insert AFTER INSERT ON pokemon BEGIN
+        INSERT INTO pokemon_search (rowid, name) VALUES (NEW.id, NEW.name);
+    END
+    """)
+
+    cursor.execute("""
+    CREATE TRIGGER pokemon_search_pokemon_update AFTER UPDATE OF name ON pokemon BEGIN
+        UPDATE pokemon_search SET name = NEW.name WHERE rowid = NEW.id;
+    END
+    """)
+
+    cursor.execute("""
+    CREATE TRIGGER pokemon_search_pokemon_delete AFTER DELETE ON pokemon BEGIN
+        DELETE FROM pokemon_search WHERE rowid = OLD.id;
+    END
+    """)
+
+    # Columns set by each source table on insert or update, and cleared on delete
+    source_columns = {
+        "nicknames": {"nicknames": SEARCH_NICKNAMES_SQL},
+        "pokemon_details": {"color": "{row}.color", "habitat": "{row}.habitat"},
+        "pokemon_types": {"types": SEARCH_TYPES_SQL},
+    }
+
+    for table, columns in source_columns.items():
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            # Types are re-aggregated after a delete; other columns are cleared
+            assignments = ", ".join(
+                f"{column} = "
+                + (
+                    expression.format(row=row, pokemon_id=f"{row}.pokemon_id")
+                    if event != "DELETE" or table == "pokemon_types"
+                    else "NULL"
+                )
+                for column, expression in columns.items()
+            )
+            cursor.execute(f"""
+            CREATE TRIGGER pokemon_search_{table}_{event.lower()}
+            AFTER {event} ON {table} BEGIN
+                UPDATE pokemon_search SET {assignments} WHERE rowid = {row}.pokemon_id;
+            END
+            """)
+
+    # Index the existing Pokémon
+    cursor.execute(f"""
+    INSERT INTO pokemon_search (rowid, name, nicknames, types, color, habitat)
+    SELECT
+        p.id,
+        p.name,
+        {SEARCH_NICKNAMES_SQL.format(row="n")},
+        {SEARCH_TYPES_SQL.format(pokemon_id="p.id")},
+        d.color,
+        d.habitat
+    FROM pokemon p
+    LEFT JOIN nicknames n ON n.pokemon_id = p.id
+    LEFT JOIN pokemon_details d ON d.pokemon_id = p.id
+    """)
+
+
+# Columns of the search index that can be searched
+SEARCH_FIELDS = ["name", "nicknames", "types", "color", "habitat"]
+
+
+# Per-Pokémon type and move lists, aggregated once per table rather than
+# looked up per Pokémon
+TYPE_LISTS_CTE = """
+type_lists AS (
+    SELECT pokemon_id, GROUP_CONCAT(name, ',') AS types
+    FROM (
+        SELECT pt.pokemon_id, t.name
+        FROM pokemon_types pt
+        JOIN types t ON t.id = pt.type_id
+        ORDER BY pt.pokemon_id, pt.slot
+    )
+    GROUP BY pokemon_id
+)"""
+
+MOVE_LISTS_CTE = """
+move_lists AS (
+    SELECT pokemon_id, GROUP_CONCAT(name, ',') AS moves
+    FROM (
+        SELECT pm.pokemon_id, m.name
+        FROM pokemon_moves pm
+        JOIN moves m ON m.id = pm.move_id
+        ORDER BY pm.pokemon_id, m.name
+    )
+    GROUP BY pokemon_id
+)"""
+
+# One row per Pokémon with its details, types, moves and nicknames
+DETAILED_EXPORT_QUERY = f"""
+WITH {TYPE_LISTS_CTE.strip()},
+{MOVE_LISTS_CTE.strip()}
+SELECT 
+    p.name AS pokemon, p.pokedex_id, 
+    d.height, d.weight, tl.types, d.color, d.habitat, ml.moves,
+    n.nickname1, n.nickname2, n.nickname3, n.nickname4, n.nickname5
+FROM pokemon p
+LEFT JOIN pokemon_details d ON p.id = d.pokemon_id
+LEFT JOIN type_lists tl ON p.id = tl.pokemon_id
+LEFT JOIN move_lists ml ON p.id = ml.pokemon_id
+LEFT JOIN nicknames n ON p.id = n.pokemon_id
+ORDER BY p.name
+"""
+
+DETAILED_EXPORT_COLUMNS = [
+    "pokemon",
+    "pokedex_id",
+    "height",
+    "weight",
+    "types",
+    "color",
+    "habitat",
+    "moves",
+    "nickname1",
+    "nickname2",
+    "nickname3",
+    "nickname4",
+    "nickname5",
+]
+
+NICKNAME_COLUMNS = ["nickname1", "nickname2", "nickname3", "nickname4", "nickname5"]
+
+# Tables available to DataFrame queries, with the columns each provides as
+# SQL expressions. Nicknames are selected as five slots and collapsed into a list.
+FRAME_TABLES = {
+    "pokemon": {"pokemon": "p.name", "pokedex_id": "p.pokedex_id"},
+    "details": {
+        "height": "d.height",
+        "weight": "d.weight",
+        "color": "d.color",
+        "habitat": "d.habitat",
+    },
+    "types": {"types": "tl.types"},
+    "moves": {"moves": "ml.moves"},
+    "nicknames": {"nicknames": ", ".join(f"n.{column}" for column in NICKNAME_COLUMNS)},
+}
+
+FRAME_JOINS = {
+    "details": "LEFT JOIN pokemon_details d ON p.id = d.pokemon_id",
+    "types": "LEFT JOIN type_lists tl ON p.id = tl.pokemon_id",
+    "moves": "LEFT JOIN move_lists ml ON p.id = ml.pokemon_id",
+    "nicknames": "LEFT JOIN nicknames n ON p.id = n.pokemon_id",
+}
+
+FRAME_CTES = {"types": TYPE_LISTS_CTE, "moves": MOVE_LISTS_CTE}
+
+FRAME_DTYPES = {"pokedex_id": "Int64", "height": "Int64", "weight": "Int64"}
+
+# Columns of the columnar exports
+EXPORT_FRAME_COLUMNS = [
+    "pokemon",
+    "pokedex_id",
+    "height",
+    "weight",
+    "types",
+    "color",
+    "habitat",
+    "moves",
+    "nicknames",
+]
+
+# Supported export formats, and the compression each uses by default
+EXPORT_FORMATS = ["csv", "parquet", "feather", "arrow"]
+DEFAULT_COMPRESSION = {"parquet": "snappy", "feather": "lz4", "arrow": None}
+
+
+def _migration_5_jobs(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the work journal for batch generation runs.
+
+    Each run is a job with one job item per Pokémon, recording its status
+    (pending, running, done, failed or skipped), attempts, last error and
+    timings, so an interrupted run can be resumed without redoing finished work.
+    Job items are keyed by Pokémon name, so creating a job does not add rows
+    to the pokemon table.
+    """
+    cursor.execute("""
+    CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        status TEXT NOT NULL DEFAULT 'running',
+        force INTEGER NOT NULL DEFAULT 0,
+        params TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        finished_at REAL
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE job_items (
+        job_id INTEGER NOT NULL,
+        pokemon TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        started_at REAL,
+        finished_at REAL,
+        PRIMARY KEY (job_id, pokemon),
+        FOREIGN KEY (job_id) REFERENCES jobs (id)
+    ) WITHOUT ROWID
+    """)
+
+
+def _migration_6_metrics(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the tables for run instrumentation.
+
+    Each command run is a row in runs; metrics holds one row per timed stage
+    (sprite loading, model request, response parsing, PokéAPI fetches and
+    SQLite writes) with its duration and, for model calls, token counts.
+    Retries are recorded as "retry" rows whose duration is the backoff delay.
+    """
+    cursor.execute("""
+    CREATE TABLE runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        command TEXT NOT NULL,
+        params TEXT,
+        started_at REAL NOT NULL,
+        finished_at REAL,
+        items INTEGER
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE metrics (
+        run_id INTEGER NOT NULL,
+        stage TEXT NOT NULL,
+        started_at REAL NOT NULL,
+        seconds REAL NOT NULL,
+        pokemon TEXT,
+        items INTEGER,
+        ok INTEGER NOT NULL DEFAULT 1,
+        prompt_tokens INTEGER,
+        completion_tokens INTEGER,
+        attempt INTEGER,
+        error TEXT,
+        FOREIGN KEY (run_id) REFERENCES runs (id)
+    )
+    """)
+    cursor.execute("CREATE INDEX idx_metrics_run_stage ON metrics (run_id, stage)")
+
+
+def _migration_7_updated_at(cursor: sqlite3.Cursor) -> None:
+    """
+    Record when nicknames and details were last written.
+
+    The timestamps decide which copy wins when shard databases are merged.
+    Rows written before this migration have none and lose to any stamped row.
+    """
+    cursor.execute("ALTER TABLE nicknames ADD COLUMN updated_at REAL")
+    cursor.execute("ALTER TABLE pokemon_details ADD COLUMN updated_at REAL")
+
+
+# Schema migrations in order, as (version, migration) pairs
+MIGRATIONS = [
+    (1, _migration_1_baseline),
+    (2, _migration_2_normalize_moves_and_types),
+    (3, _migration_3_sprite_embeddings),
+    (4, _migration_4_search_index),
+    (5, _migration_5_jobs),
+    (6, _migration_6_metrics),
+    (7, _migration_7_updated_at),
+]
+
+# Job item statuses that still need work
+PENDING_JOB_STATUSES = ("pending", "running", "failed")
 
 
 class PokemonDatabase:
     """
     A class to handle database operations for storing Pokémon nicknames and details.
+
+    Connections are long-lived: each thread gets its own connection, opened on
+    first use and reused until close() is called. The class can be used as a
+    context manager to close them automatically. Passing ":memory:" as the path
+    gives a shared in-memory database that all threads of this instance see.
     """
 
-    def __init__(self, db_path: str = "pokemon_nicknames.db"):
+    def __init__(
+        self,
+        db_path: str = "pokemon_nicknames.db",
+        synchronous: str = "NORMAL",
+        cache_size: int = -64000,
+        mmap_size: int = 256 * 1024 * 1024,
+    ):
         """
         Initialize the database connection.
 
         Args:
-            db_path: Path to the SQLite database file
+            db_path: Path to the SQLite database file, or ":memory:"
+            synchronous: Value of the synchronous pragma (OFF, NORMAL, FULL or EXTRA)
+            cache_size: Value of the cache_size pragma (negative values are in KiB)
+            mmap_size: Value of the mmap_size pragma in bytes (0 disables memory-mapped I/O)
         """
         self.db_path = db_path
-        self._create_tables_if_not_exist()
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+
+        # A named memdb database lets every thread see the same in-memory data.
+        # Unlike shared-cache mode it uses ordinary database locks, which wait
+        # out the busy timeout instead of failing with "table is locked"
+        self._memory_uri = (
+            f"file:/pokemon_nicknames_{id(self)}?vfs=memdb"
+            if db_path == ":memory:"
+            else None
+        )
+
+        # Opening the first connection also keeps an in-memory database alive
+        conn = self._connect()
+        if self._memory_uri is None:
+            conn.execute("PRAGMA journal_mode = WAL")
+
+        self._migrate()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Get the calling thread's connection, opening it if needed.
+
+        Opening a connection also closes those of threads that have exited.
+
+        Returns:
+            The connection for the current thread
+        """
+        thread_id = threading.get_ident()
+
+        with self._lock:
+            conn = self._connections.get(thread_id)
+            if conn is not None:
+                return conn
+
+            if self._memory_uri:
+                # Without WAL, writers must take the write lock up front; a
+                # deferred transaction that upgrades later can deadlock
+                conn = sqlite3.connect(
+                    self._memory_uri,
+                    uri=True,
+                    check_same_thread=False,
+                    isolation_level="IMMEDIATE",
+                )
+            else:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+            conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+
+            self._connections[thread_id] = conn
+
+            # The new connection keeps an in-memory database alive meanwhile
+            alive = {thread.ident for thread in threading.enumerate()}
+            for stale_id in [t for t in self._connections if t not in alive]:
+                self._connections.pop(stale_id).close()
+
+            return conn
+
+    def close(self) -> None:
+        """
+        Close all connections opened by this instance.
+        """
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+
+    def __enter__(self) -> "PokemonDatabase":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _migrate(self) -> None:
+        """
+        Bring the schema up to date by applying any pending migrations.
+
+        Each migration runs in its own transaction and bumps the version stored
+        in the schema_version table. Databases created before versioning start
+        at version 0; the baseline migration only creates missing tables, so
+        their data is preserved.
+        """
+        conn = self._connect()
+
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"
+        )
+        row = conn.execute("SELECT version FROM schema_version").fetchone()
+        if row is None:
+            conn.execute("INSERT INTO schema_version (version) VALUES (0)")
+            conn.commit()
+            version = 0
+        else:
+            version = row[0]
+
+        for target_version, migration in MIGRATIONS:
+            if target_version <= version:
+                continue
+
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN")
+                migration(cursor)
+                cursor.execute("UPDATE schema_version SET version = ?", (target_version,))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
+
+            version = target_version
+
+    def get_schema_version(self) -> int:
+        """
+        Get the current schema version of the database.
+
+        Returns:
+            The schema version
+        """
+        conn = self._connect()
+        return conn.execute("SELECT version FROM schema_version").fetchone()[0]
 
-    def _create_tables_if_not_exist(self) -> None:
+    def import_pokeapi_snapshot(
+        self, pokemon: List[Dict[str, Any]], species: List[Dict[str, Any]]
+    ) -> Tuple[int, int]:
         """
-        Create the necessary tables if they don't exist.
+        Bulk-load extracted PokéAPI resources into the local snapshot tables.
+
+        Args:
+            pokemon: Records from pokeapi.extract_pokemon
+            species: Records from pokeapi.extract_species
+
+        Returns:
+            The number of pokemon and species records loaded
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
-        # Create the pokemon table with only basic identification
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS pokemon (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            pokedex_id INTEGER
+        try:
+            cursor.executemany(
+                """
+            INSERT OR REPLACE INTO pokeapi_pokemon (
+                name, pokedex_id, height, weight, types, moves, species
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                [
+                    (
+                        p["name"],
+                        p["pokedex_id"],
+                        p["height"],
+                        p["weight"],
+                        p["types"],
+                        json.dumps(p["moves"]),
+                        p["species"],
+                    )
+                    for p in pokemon
+                ],
+            )
+
+            cursor.executemany(
+                """
+            INSERT OR REPLACE INTO pokeapi_species (
+                name, color, habitat
+            ) VALUES (?, ?, ?)
+            """,
+                [(s["name"], s["color"], s["habitat"]) for s in species],
+            )
+
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+        return len(pokemon), len(species)
+
+    def get_snapshot_details(
+        self, pokemon_names: Dict[str, str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up Pokémon details in the local PokéAPI snapshot.
+
+        Args:
+            pokemon_names: A dictionary mapping Pokémon names to their PokéAPI names
+
+        Returns:
+            A dictionary of details keyed by Pokémon name, in the same format as
+            pokeapi.fetch_pokemon_details, for the Pokémon found in the snapshot
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("DROP TABLE IF EXISTS temp.lookup_names")
+        cursor.execute("CREATE TEMP TABLE lookup_names (name TEXT, api_name TEXT)")
+        cursor.executemany(
+            "INSERT INTO lookup_names (name, api_name) VALUES (?, ?)",
+            list(pokemon_names.items()),
         )
-        """)
 
-        # Create a separate table for Pokémon details
         cursor.execute("""
-        CREATE TABLE IF NOT EXISTS pokemon_details (
-            pokemon_id INTEGER PRIMARY KEY,
-            height INTEGER,
-            weight INTEGER,
-            types TEXT,
-            color TEXT,
-            habitat TEXT,
-            FOREIGN KEY (pokemon_id) REFERENCES pokemon (id)
-        )
+        SELECT 
+            l.name, p.pokedex_id, p.height, p.weight, p.types, p.moves,
+            s.color, s.habitat
+        FROM lookup_names l
+        JOIN pokeapi_pokemon p ON p.name = l.api_name
+        LEFT JOIN pokeapi_species s ON s.name = p.species
         """)
 
-        # Create a table for Pokémon moves
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS pokemon_moves (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            pokemon_id INTEGER,
-            move_name TEXT,
-            FOREIGN KEY (pokemon_id) REFERENCES pokemon (id),
-            UNIQUE (pokemon_id, move_name)
+        details = {}
+        for row in cursor.fetchall():
+            details[row[0]] = {
+                "pokedex_id": row[1],
+                "height": row[2],
+                "weight": row[3],
+                "types": row[4],
+                "moves": json.loads(row[5]) if row[5] else [],
+                "color": row[6],
+                "habitat": row[7],
+            }
+
+        # Drop the lookup table and end the implicit transaction
+        cursor.execute("DROP TABLE temp.lookup_names")
+        conn.commit()
+
+        return details
+
+    def add_pokemon_with_nicknames(
+        self, pokemon_name: str, nicknames: List[str]
+    ) -> None:
+        """
+        Add a Pokémon and its nicknames to the database.
+        If the Pokémon already exists, update its nicknames.
+
+        This is a purely local operation; details are filled in separately by
+        add_pokemon_details_many (see the `hydrate` command).
+
+        Args:
+            pokemon_name: The name of the Pokémon
+            nicknames: A list of nicknames for the Pokémon (up to 5)
+        """
+        self.add_nicknames_many([(pokemon_name, nicknames)])
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add Pokémon with their nicknames and/or details in a single transaction.
+
+        Each record is a dictionary with a "name" and optional "nicknames" (a list
+        of up to 5 nicknames), "details" (as returned by
+        pokeapi.fetch_pokemon_details) and "job_id" (a job whose item for the
+        Pokémon is marked done in the same transaction). Every table is written
+        with one executemany call, and existing nicknames and details are
+        replaced, so writing the same records twice is harmless.
+
+        Args:
+            records: The records to write
+
+        Returns:
+            The number of records written
+        """
+        nickname_items = []
+        detail_items = []
+        job_items = []
+        count = 0
+
+        for record in records:
+            pokemon_name = record["name"].lower()
+            if record.get("nicknames") is not None:
+                nickname_items.append((pokemon_name, record["nicknames"]))
+            if record.get("details") is not None:
+                detail_items.append((pokemon_name, record["details"]))
+            if record.get("job_id") is not None:
+                job_items.append((record["job_id"], pokemon_name))
+            count += 1
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        start = time.perf_counter()
+
+        try:
+            self._write_details(cursor, detail_items)
+            self._write_nicknames(cursor, nickname_items)
+
+            # Journal the results with the data, so a crash never loses or repeats them
+            if job_items:
+                now = time.time()
+                cursor.executemany(
+                    """
+                UPDATE job_items SET status = 'done', last_error = NULL, finished_at = ?
+                WHERE job_id = ? AND pokemon = ?
+                """,
+                    [(now, job_id, pokemon_name) for job_id, pokemon_name in job_items],
+                )
+
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+        get_recorder().record("write", time.perf_counter() - start, items=count)
+
+        return count
+
+    @staticmethod
+    def _write_details(
+        cursor: sqlite3.Cursor, items: List[Tuple[str, Dict[str, Any]]]
+    ) -> None:
+        """
+        Write (pokemon_name, details) pairs inside the current transaction.
+        """
+        # Insert the Pokémon or update their Pokédex ID, keeping existing row IDs
+        cursor.executemany(
+            """
+        INSERT INTO pokemon (name, pokedex_id) VALUES (?, ?)
+        ON CONFLICT (name) DO UPDATE SET pokedex_id = excluded.pokedex_id
+        """,
+            [(name, info["pokedex_id"]) for name, info in items],
         )
-        """)
 
-        # Create the nicknames table with a fixed number of nickname slots
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS nicknames (
-            pokemon_id INTEGER PRIMARY KEY,
-            nickname1 TEXT,
-            nickname2 TEXT,
-            nickname3 TEXT,
-            nickname4 TEXT,
-            nickname5 TEXT,
-            FOREIGN KEY (pokemon_id) REFERENCES pokemon (id)
+        # Insert or replace the Pokémon details
+        now = time.time()
+        cursor.executemany(
+            """
+        INSERT OR REPLACE INTO pokemon_details (
+            pokemon_id, height, weight, color, habitat, updated_at
+        )
+        SELECT id, ?, ?, ?, ?, ? FROM pokemon WHERE name = ?
+        """,
+            [
+                (
+                    info["height"],
+                    info["weight"],
+                    info["color"],
+                    info["habitat"],
+                    now,
+                    name,
+                )
+                for name, info in items
+            ],
+        )
+
+        # Replace the types, keeping their slot order
+        type_rows = [
+            (name, slot, type_name)
+            for name, info in items
+            for slot, type_name in enumerate(
+                info["types"].split(",") if info["types"] else [], start=1
+            )
+        ]
+        cursor.executemany(
+            "INSERT OR IGNORE INTO types (name) VALUES (?)",
+            [(type_name,) for _, _, type_name in type_rows],
+        )
+        cursor.executemany(
+            """
+        DELETE FROM pokemon_types
+        WHERE pokemon_id = (SELECT id FROM pokemon WHERE name = ?)
+        """,
+            [(name,) for name, _ in items],
+        )
+        cursor.executemany(
+            """
+        INSERT INTO pokemon_types (pokemon_id, slot, type_id)
+        SELECT p.id, ?, t.id FROM pokemon p, types t
+        WHERE p.name = ? AND t.name = ?
+        """,
+            [(slot, name, type_name) for name, slot, type_name in type_rows],
+        )
+
+        # Replace the moves
+        move_rows = [(name, move) for name, info in items for move in info["moves"]]
+        cursor.executemany(
+            "INSERT OR IGNORE INTO moves (name) VALUES (?)",
+            [(move,) for _, move in move_rows],
+        )
+        cursor.executemany(
+            """
+        DELETE FROM pokemon_moves
+        WHERE pokemon_id = (SELECT id FROM pokemon WHERE name = ?)
+        """,
+            [(name,) for name, _ in items],
+        )
+        cursor.executemany(
+            """
+        INSERT OR IGNORE INTO pokemon_moves (pokemon_id, move_id)
+        SELECT p.id, m.id FROM pokemon p, moves m
+        WHERE p.name = ? AND m.name = ?
+        """,
+            move_rows,
+        )
+
+    @staticmethod
+    def _write_nicknames(
+        cursor: sqlite3.Cursor, items: List[Tuple[str, List[str]]]
+    ) -> None:
+        """
+        Write (pokemon_name, nicknames) pairs inside the current transaction.
+        """
+        rows = []
+        for pokemon_name, nicknames in items:
+            # Ensure we have exactly 5 nicknames (pad with None if needed)
+            padded_nicknames = nicknames[:5] + [None] * (5 - len(nicknames[:5]))
+            rows.append((pokemon_name, *padded_nicknames))
+
+        # Create any missing Pokémon without touching existing rows
+        cursor.executemany(
+            "INSERT INTO pokemon (name) VALUES (?) ON CONFLICT (name) DO NOTHING",
+            [(row[0],) for row in rows],
+        )
+
+        # Insert or replace the nicknames
+        now = time.time()
+        cursor.executemany(
+            """
+        INSERT OR REPLACE INTO nicknames (
+            pokemon_id, nickname1, nickname2, nickname3, nickname4, nickname5,
+            updated_at
+        )
+        SELECT id, ?, ?, ?, ?, ?, ? FROM pokemon WHERE name = ?
+        """,
+            [(*row[1:], now, row[0]) for row in rows],
+        )
+
+    def add_pokemon_details_many(self, details: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Add or replace the details of many Pokémon in a single transaction.
+
+        Args:
+            details: A dictionary of details keyed by Pokémon name, as returned
+                by pokeapi.fetch_pokemon_details
+
+        Returns:
+            The number of Pokémon written
+        """
+        return self.add_many(
+            {"name": name, "details": info} for name, info in details.items()
+        )
+
+    def add_nicknames_many(self, records: Iterable[Tuple[str, List[str]]]) -> int:
+        """
+        Add nicknames for many Pokémon in a single transaction.
+
+        Pokémon rows are created if needed (without fetching details) and existing
+        nicknames are replaced, so loading the same records twice is harmless.
+
+        Args:
+            records: (pokemon_name, nicknames) pairs
+
+        Returns:
+            The number of records written
+        """
+        return self.add_many(
+            {"name": name, "nicknames": nicknames} for name, nicknames in records
+        )
+
+    def add_embeddings_many(
+        self, model: str, records: Iterable[Tuple[str, str, int, bytes]]
+    ) -> int:
+        """
+        Store sprite embeddings in a single transaction.
+
+        Args:
+            model: The name of the embedding model
+            records: (pokemon_name, sprite_sha256, dim, vector) tuples, where
+                vector is the raw float32 bytes
+
+        Returns:
+            The number of embeddings stored
+        """
+        rows = [
+            (pokemon_name.lower(), sprite_sha256, dim, vector)
+            for pokemon_name, sprite_sha256, dim, vector in records
+        ]
+
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.executemany(
+                """
+            INSERT OR REPLACE INTO sprite_embeddings (
+                pokemon, model, sprite_sha256, dim, vector
+            ) VALUES (?, ?, ?, ?, ?)
+            """,
+                [(row[0], model, *row[1:]) for row in rows],
+            )
+
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+        return len(rows)
+
+    def delete_embeddings(self, model: str, pokemon_names: Iterable[str]) -> int:
+        """
+        Delete stored embeddings in a single transaction.
+
+        Args:
+            model: The name of the embedding model
+            pokemon_names: The names of the Pokémon whose embeddings to delete
+
+        Returns:
+            The number of embeddings deleted
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.executemany(
+                "DELETE FROM sprite_embeddings WHERE pokemon = ? AND model = ?",
+                [(name.lower(), model) for name in pokemon_names],
+            )
+            deleted = cursor.rowcount
+
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+        return deleted
+
+    def get_embedding_hashes(self, model: str) -> Dict[str, str]:
+        """
+        Get the sprite hash each stored embedding was computed from.
+
+        Args:
+            model: The name of the embedding model
+
+        Returns:
+            A dictionary of Pokémon name to sprite SHA-256
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+        SELECT pokemon, sprite_sha256
+        FROM sprite_embeddings
+        WHERE model = ?
+        """,
+            (model,),
+        )
+
+        return dict(cursor.fetchall())
+
+    def get_embeddings(
+        self, model: str, pokemon_names: Optional[List[str]] = None
+    ) -> List[Tuple[str, int, bytes]]:
+        """
+        Get the stored embeddings for a model.
+
+        Args:
+            model: The name of the embedding model
+            pokemon_names: Only get these Pokémon (defaults to all)
+
+        Returns:
+            (pokemon_name, dim, vector) tuples ordered by name
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        if pokemon_names is None:
+            cursor.execute(
+                """
+            SELECT pokemon, dim, vector
+            FROM sprite_embeddings
+            WHERE model = ?
+            ORDER BY pokemon
+            """,
+                (model,),
+            )
+            return cursor.fetchall()
+
+        # Look the names up in chunks to stay under SQLite's parameter limit
+        rows = []
+        names = [name.lower() for name in pokemon_names]
+        for start in range(0, len(names), 500):
+            chunk = names[start : start + 500]
+            cursor.execute(
+                f"""
+            SELECT pokemon, dim, vector
+            FROM sprite_embeddings
+            WHERE model = ? AND pokemon IN ({", ".join("?" * len(chunk))})
+            """,
+                (model, *chunk),
+            )
+            rows.extend(cursor.fetchall())
+
+        return sorted(rows)
+
+    def get_pokemon_without_details(self, pokemon_names: List[str]) -> List[str]:
+        """
+        Get the Pokémon from a list that have no stored details.
+
+        Args:
+            pokemon_names: The names of the Pokémon to check
+
+        Returns:
+            The names of the Pokémon without details, in the given order
+        """
+        return self._names_without(pokemon_names, "pokemon_details")
+
+    def _names_without(self, pokemon_names: List[str], table: str) -> List[str]:
+        """
+        Get the Pokémon from a list that have no row in a table keyed by pokemon_id.
+
+        The names are loaded into a temporary table and filtered with one
+        anti-join, rather than reading every stored name into Python.
+
+        Args:
+            pokemon_names: The names of the Pokémon to check
+            table: The table to check, e.g. "nicknames"
+
+        Returns:
+            The names of the Pokémon without a row, in the given order
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("DROP TABLE IF EXISTS temp.check_names")
+        cursor.execute(
+            "CREATE TEMP TABLE check_names (position INTEGER PRIMARY KEY, name TEXT)"
+        )
+        cursor.executemany(
+            "INSERT INTO check_names (name) VALUES (?)",
+            [(name,) for name in pokemon_names],
+        )
+
+        cursor.execute(f"""
+        SELECT c.name
+        FROM check_names c
+        LEFT JOIN pokemon p ON p.name = LOWER(c.name)
+        LEFT JOIN {table} t ON t.pokemon_id = p.id
+        WHERE t.pokemon_id IS NULL
+        ORDER BY c.position
+        """)
+        missing = [row[0] for row in cursor.fetchall()]
+
+        # Drop the lookup table and end the implicit transaction
+        cursor.execute("DROP TABLE temp.check_names")
+        conn.commit()
+
+        return missing
+
+    def remove_nicknames(self, pokemon_name: str) -> bool:
+        """
+        Remove all nicknames for a specific Pokémon.
+
+        Args:
+            pokemon_name: The name of the Pokémon
+
+        Returns:
+            True if nicknames were removed, False otherwise
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        try:
+            # Get the Pokémon ID
+            cursor.execute(
+                "SELECT id FROM pokemon WHERE name = ?", (pokemon_name.lower(),)
+            )
+            result = cursor.fetchone()
+
+            if not result:
+                return False
+
+            pokemon_id = result[0]
+
+            # Delete the nicknames
+            cursor.execute("DELETE FROM nicknames WHERE pokemon_id = ?", (pokemon_id,))
+
+            rows_affected = cursor.rowcount
+            conn.commit()
+
+            return rows_affected > 0
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+    def get_nicknames(self, pokemon_name: str) -> List[str]:
+        """
+        Get the nicknames for a specific Pokémon.
+
+        Args:
+            pokemon_name: The name of the Pokémon
+
+        Returns:
+            A list of nicknames for the Pokémon
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+        SELECT n.nickname1, n.nickname2, n.nickname3, n.nickname4, n.nickname5
+        FROM nicknames n
+        JOIN pokemon p ON n.pokemon_id = p.id
+        WHERE p.name = ?
+        """,
+            (pokemon_name.lower(),),
+        )
+
+        result = cursor.fetchone()
+
+        if not result:
+            return []
+
+        # Filter out None values
+        return [nick for nick in result if nick]
+
+    def get_pokemon_without_nicknames(self, pokemon_names: List[str]) -> List[str]:
+        """
+        Get the Pokémon from a list that have no stored nicknames.
+
+        Args:
+            pokemon_names: The names of the Pokémon to check
+
+        Returns:
+            The names of the Pokémon without nicknames, in the given order
+        """
+        return self._names_without(pokemon_names, "nicknames")
+
+    def create_job(
+        self,
+        pokemon_names: List[str],
+        force: bool = False,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Start a generation job with one item per Pokémon.
+
+        Unless forced, Pokémon that already have nicknames are recorded as
+        skipped; this is decided with one anti-join rather than a lookup per
+        Pokémon.
+
+        Args:
+            pokemon_names: The names of the Pokémon to process
+            force: Whether to regenerate nicknames that already exist
+            params: Options of the run, stored as JSON for reference
+
+        Returns:
+            The ID of the new job
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        now = time.time()
+
+        try:
+            cursor.execute(
+                """
+            INSERT INTO jobs (status, force, params, created_at, updated_at)
+            VALUES ('running', ?, ?, ?, ?)
+            """,
+                (int(force), json.dumps(params or {}), now, now),
+            )
+            job_id = cursor.lastrowid
+
+            cursor.execute("DROP TABLE IF EXISTS temp.job_names")
+            cursor.execute("CREATE TEMP TABLE job_names (name TEXT PRIMARY KEY)")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO job_names (name) VALUES (?)",
+                [(name.lower(),) for name in pokemon_names],
+            )
+
+            cursor.execute(
+                """
+            INSERT INTO job_items (job_id, pokemon, status)
+            SELECT ?, j.name,
+                CASE WHEN n.pokemon_id IS NULL OR ? THEN 'pending' ELSE 'skipped' END
+            FROM job_names j
+            LEFT JOIN pokemon p ON p.name = j.name
+            LEFT JOIN nicknames n ON n.pokemon_id = p.id
+            """,
+                (job_id, int(force)),
+            )
+
+            cursor.execute("DROP TABLE temp.job_names")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+        return job_id
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a job and the number of its items in each status.
+
+        Args:
+            job_id: The ID of the job
+
+        Returns:
+            A dictionary with the job's fields and a "counts" dictionary, or
+            None if the job does not exist
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+        SELECT id, status, force, params, created_at, updated_at, finished_at
+        FROM jobs WHERE id = ?
+        """,
+            (job_id,),
+        )
+        row = cursor.fetchone()
+
+        if not row:
+            return None
+
+        cursor.execute(
+            "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status",
+            (job_id,),
+        )
+
+        return {
+            "id": row[0],
+            "status": row[1],
+            "force": bool(row[2]),
+            "params": json.loads(row[3]) if row[3] else {},
+            "created_at": row[4],
+            "updated_at": row[5],
+            "finished_at": row[6],
+            "counts": dict(cursor.fetchall()),
+        }
+
+    def get_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get the most recent jobs, newest first.
+
+        Args:
+            limit: Maximum number of jobs
+
+        Returns:
+            A list of jobs in the format returned by get_job
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT id FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+
+        return [self.get_job(row[0]) for row in cursor.fetchall()]
+
+    def get_pending_job_items(self, job_id: int) -> List[str]:
+        """
+        Get the Pokémon of a job that still need nicknames.
+
+        Items that are pending, were in flight when a run stopped, or failed are
+        returned. Unless the job was forced, Pokémon that have gained nicknames
+        since (for example from another run) are excluded by an anti-join.
+
+        Args:
+            job_id: The ID of the job
+
+        Returns:
+            The sorted names of the pending Pokémon
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            f"""
+        SELECT ji.pokemon
+        FROM job_items ji
+        JOIN jobs j ON j.id = ji.job_id
+        LEFT JOIN pokemon p ON p.name = ji.pokemon
+        LEFT JOIN nicknames n ON n.pokemon_id = p.id AND NOT j.force
+        WHERE ji.job_id = ?
+            AND ji.status IN ({", ".join("?" * len(PENDING_JOB_STATUSES))})
+            AND n.pokemon_id IS NULL
+        ORDER BY ji.pokemon
+        """,
+            (job_id, *PENDING_JOB_STATUSES),
+        )
+
+        return [row[0] for row in cursor.fetchall()]
+
+    def start_job_items(self, job_id: int, pokemon_names: List[str]) -> None:
+        """
+        Mark job items as in flight and count the attempt.
+
+        Args:
+            job_id: The ID of the job
+            pokemon_names: The names of the Pokémon being processed
+        """
+        self._update_job_items(
+            """
+        UPDATE job_items
+        SET status = 'running', attempts = attempts + 1, started_at = ?
+        WHERE job_id = ? AND pokemon = ?
+        """,
+            job_id,
+            pokemon_names,
+        )
+
+    def fail_job_items(self, job_id: int, pokemon_names: List[str], error: str) -> None:
+        """
+        Mark job items as failed and record the error.
+
+        Args:
+            job_id: The ID of the job
+            pokemon_names: The names of the Pokémon that failed
+            error: The error message
+        """
+        self._update_job_items(
+            """
+        UPDATE job_items
+        SET status = 'failed', last_error = ?, finished_at = ?
+        WHERE job_id = ? AND pokemon = ?
+        """,
+            job_id,
+            pokemon_names,
+            error,
+        )
+
+    def _update_job_items(
+        self, sql: str, job_id: int, pokemon_names: List[str], *values: Any
+    ) -> None:
+        """
+        Run a job item update for each Pokémon in one transaction.
+
+        The statement's parameters are the given values, the current time, the
+        job ID and the Pokémon name, in that order.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        now = time.time()
+
+        try:
+            cursor.executemany(
+                sql,
+                [(*values, now, job_id, name.lower()) for name in pokemon_names],
+            )
+            cursor.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?",
+                (now, job_id),
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+    def finish_job(self, job_id: int) -> str:
+        """
+        Close a job run, marking it completed if no items are left to do.
+
+        Args:
+            job_id: The ID of the job
+
+        Returns:
+            The job's new status, "completed" or "incomplete"
+        """
+        status = "incomplete" if self.get_pending_job_items(job_id) else "completed"
+
+        conn = self._connect()
+        now = time.time()
+
+        try:
+            conn.execute(
+                """
+            UPDATE jobs SET status = ?, updated_at = ?, finished_at = ?
+            WHERE id = ?
+            """,
+                (status, now, now, job_id),
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+        return status
+
+    def start_run(self, command: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Start recording a command run.
+
+        Args:
+            command: The name of the command
+            params: Options of the run, stored as JSON for reference
+
+        Returns:
+            The ID of the new run
+        """
+        conn = self._connect()
+
+        try:
+            cursor = conn.execute(
+                "INSERT INTO runs (command, params, started_at) VALUES (?, ?, ?)",
+                (command, json.dumps(params or {}), time.time()),
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int, items: Optional[int] = None) -> None:
+        """
+        Mark a run as finished.
+
+        Args:
+            run_id: The ID of the run
+            items: Number of items the run processed
+        """
+        conn = self._connect()
+
+        try:
+            conn.execute(
+                "UPDATE runs SET finished_at = ?, items = ? WHERE id = ?",
+                (time.time(), items, run_id),
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+    def add_metrics_many(self, run_id: Optional[int], events: List[tuple]) -> int:
+        """
+        Store metric events in a single transaction.
+
+        Args:
+            run_id: The ID of the run the events belong to
+            events: Tuples in the order of metrics.METRIC_FIELDS
+
+        Returns:
+            The number of events stored
+        """
+        conn = self._connect()
+
+        try:
+            conn.executemany(
+                """
+            INSERT INTO metrics (
+                run_id, stage, started_at, seconds, pokemon, items, ok,
+                prompt_tokens, completion_tokens, attempt, error
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                [(run_id, *event) for event in events],
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+        return len(events)
+
+    def get_runs(
+        self, limit: int = 10, run_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get recorded runs with their token and retry totals, newest first.
+
+        Args:
+            limit: Maximum number of runs
+            run_id: Only get this run
+
+        Returns:
+            A list of dictionaries with the run's fields and totals
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+        SELECT
+            r.id, r.command, r.params, r.started_at, r.finished_at, r.items,
+            COALESCE(SUM(m.prompt_tokens), 0),
+            COALESCE(SUM(m.completion_tokens), 0),
+            COALESCE(SUM(m.stage = 'retry'), 0)
+        FROM runs r
+        LEFT JOIN metrics m ON m.run_id = r.id
+        WHERE ? IS NULL OR r.id = ?
+        GROUP BY r.id
+        ORDER BY r.id DESC
+        LIMIT ?
+        """,
+            (run_id, run_id, limit),
         )
-        """)
 
-        conn.commit()
-        conn.close()
+        return [
+            {
+                "id": row[0],
+                "command": row[1],
+                "params": json.loads(row[2]) if row[2] else {},
+                "started_at": row[3],
+                "finished_at": row[4],
+                "items": row[5],
+                "prompt_tokens": row[6],
+                "completion_tokens": row[7],
+                "retries": row[8],
+            }
+            for row in cursor.fetchall()
+        ]
 
-    def _fetch_pokemon_details(self, pokemon_name: str) -> Dict[str, Any]:
+    def get_stage_durations(self, run_ids: List[int]) -> Dict[str, Dict[str, Any]]:
         """
-        Fetch Pokémon details from pokebase.
+        Get the sorted durations and error counts of each stage in some runs.
 
         Args:
-            pokemon_name: The name of the Pokémon
+            run_ids: The IDs of the runs
 
         Returns:
-            A dictionary containing Pokémon details
+            A dictionary keyed by stage, with "seconds" (sorted durations) and
+            "errors" (number of failed events)
         """
-        try:
-            # Fetch basic Pokémon data
-            pokemon = pb.pokemon(pokemon_name.lower())
-
-            # Get types as a comma-separated string
-            types = ",".join([t.type.name for t in pokemon.types])
-
-            # Get species information
-            species = pokemon.species
-
-            # Get moves (limit to 20 to avoid excessive data)
-            moves = [move.move.name for move in pokemon.moves[:20]]
-
-            # Prepare the details dictionary
-            details = {
-                "pokedex_id": pokemon.id,
-                "height": pokemon.height,
-                "weight": pokemon.weight,
-                "types": types,
-                "moves": moves,
-                "color": species.color.name
-                if hasattr(species, "color") and species.color
-                else None,
-                "habitat": species.habitat.name
-                if hasattr(species, "habitat") and species.habitat
-                else None,
-            }
+        conn = self._connect()
+        cursor = conn.cursor()
 
-            return details
-        except Exception:
-            # If there's an error, return a dictionary with None values
-            return {
-                "pokedex_id": None,
-                "height": None,
-                "weight": None,
-                "types": None,
-                "moves": [],
-                "color": None,
-                "habitat": None,
-            }
+        cursor.execute(
+            f"""
+        SELECT stage, seconds, ok
+        FROM metrics
+        WHERE run_id IN ({", ".join("?" * len(run_ids))})
+        ORDER BY stage, seconds
+        """,
+            run_ids,
+        )
 
-    def add_pokemon_with_nicknames(
-        self, pokemon_name: str, nicknames: List[str]
-    ) -> None:
+        stages: Dict[str, Dict[str, Any]] = {}
+        for stage, seconds, ok in cursor.fetchall():
+            entry = stages.setdefault(stage, {"seconds": [], "errors": 0})
+            entry["seconds"].append(seconds)
+            entry["errors"] += not ok
+
+        return stages
+
+    def merge_shard(self, shard_path: str) -> Dict[str, int]:
         """
-        Add a Pokémon and its nicknames to the database.
-        If the Pokémon already exists, update its nicknames and details.
+        Merge the Pokémon, nicknames and details of a shard database into this one.
+
+        The shard is attached and copied with set-based statements in one
+        transaction. Where both databases have nicknames (or details) for a
+        Pokémon, the more recently written copy wins, so merging a shard again,
+        or merging shards in any order, gives the same result. Types and moves
+        follow the details they belong to. Job journals and run metrics stay in
+        the shard.
 
         Args:
-            pokemon_name: The name of the Pokémon
-            nicknames: A list of nicknames for the Pokémon (up to 5)
+            shard_path: Path to the shard database file (already migrated)
+
+        Returns:
+            The number of Pokémon added, and of nicknames and details written
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
-        try:
-            # Fetch Pokémon details from pokebase
-            details = self._fetch_pokemon_details(pokemon_name)
+        # ATTACH cannot run inside a transaction
+        conn.commit()
+        cursor.execute("ATTACH DATABASE ? AS shard", (shard_path,))
 
-            # Insert or replace the Pokémon with basic details
-            cursor.execute(
-                """
-            INSERT OR REPLACE INTO pokemon (
-                name, pokedex_id
-            ) VALUES (?, ?)
-            """,
-                (pokemon_name.lower(), details["pokedex_id"]),
+        try:
+            cursor.execute("BEGIN")
+
+            cursor.execute("""
+            INSERT INTO main.pokemon (name, pokedex_id)
+            SELECT name, pokedex_id FROM shard.pokemon WHERE true
+            ON CONFLICT (name) DO NOTHING
+            """)
+            added = cursor.rowcount
+
+            # Map the shard's Pokémon IDs to ours
+            cursor.execute("DROP TABLE IF EXISTS temp.shard_ids")
+            cursor.execute("""
+            CREATE TEMP TABLE shard_ids (
+                shard_id INTEGER PRIMARY KEY,
+                pokemon_id INTEGER NOT NULL
             )
-
-            # Get the Pokémon ID
-            cursor.execute(
-                "SELECT id FROM pokemon WHERE name = ?", (pokemon_name.lower(),)
+            """)
+            cursor.execute("""
+            INSERT INTO temp.shard_ids (shard_id, pokemon_id)
+            SELECT s.id, p.id
+            FROM shard.pokemon s
+            JOIN main.pokemon p ON p.name = s.name
+            """)
+
+            # Unstamped rows predate the timestamps and lose to stamped ones
+            cursor.execute("""
+            INSERT INTO main.nicknames (
+                pokemon_id, nickname1, nickname2, nickname3, nickname4, nickname5,
+                updated_at
             )
-            pokemon_id = cursor.fetchone()[0]
-
-            # Insert or replace the Pokémon details
-            cursor.execute(
-                """
-            INSERT OR REPLACE INTO pokemon_details (
-                pokemon_id, height, weight, types, color, habitat
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    pokemon_id,
-                    details["height"],
-                    details["weight"],
-                    details["types"],
-                    details["color"],
-                    details["habitat"],
-                ),
+            SELECT
+                m.pokemon_id, n.nickname1, n.nickname2, n.nickname3, n.nickname4,
+                n.nickname5, n.updated_at
+            FROM shard.nicknames n
+            JOIN temp.shard_ids m ON m.shard_id = n.pokemon_id
+            WHERE true
+            ON CONFLICT (pokemon_id) DO UPDATE SET
+                nickname1 = excluded.nickname1,
+                nickname2 = excluded.nickname2,
+                nickname3 = excluded.nickname3,
+                nickname4 = excluded.nickname4,
+                nickname5 = excluded.nickname5,
+                updated_at = excluded.updated_at
+            WHERE COALESCE(excluded.updated_at, 0) > COALESCE(nicknames.updated_at, 0)
+            """)
+            nicknames = cursor.rowcount
+
+            # Details win as a whole, with their Pokédex ID, types and moves
+            cursor.execute("DROP TABLE IF EXISTS temp.detail_winners")
+            cursor.execute("""
+            CREATE TEMP TABLE detail_winners (
+                shard_id INTEGER PRIMARY KEY,
+                pokemon_id INTEGER NOT NULL
+            )
+            """)
+            cursor.execute("""
+            INSERT INTO temp.detail_winners (shard_id, pokemon_id)
+            SELECT m.shard_id, m.pokemon_id
+            FROM shard.pokemon_details s
+            JOIN temp.shard_ids m ON m.shard_id = s.pokemon_id
+            LEFT JOIN main.pokemon_details d ON d.pokemon_id = m.pokemon_id
+            WHERE d.pokemon_id IS NULL
+                OR COALESCE(s.updated_at, 0) > COALESCE(d.updated_at, 0)
+            """)
+            details = cursor.rowcount
+
+            cursor.execute("""
+            INSERT OR REPLACE INTO main.pokemon_details (
+                pokemon_id, height, weight, color, habitat, updated_at
             )
+            SELECT w.pokemon_id, s.height, s.weight, s.color, s.habitat, s.updated_at
+            FROM temp.detail_winners w
+            JOIN shard.pokemon_details s ON s.pokemon_id = w.shard_id
+            """)
+            cursor.execute("""
+            UPDATE main.pokemon SET pokedex_id = (
+                SELECT s.pokedex_id
+                FROM temp.detail_winners w
+                JOIN shard.pokemon s ON s.id = w.shard_id
+                WHERE w.pokemon_id = pokemon.id
+            )
+            WHERE id IN (SELECT pokemon_id FROM temp.detail_winners)
+            """)
 
-            # Delete existing moves for this Pokémon
+            # Replace the winners' types and moves, matching them by name
             cursor.execute(
-                "DELETE FROM pokemon_moves WHERE pokemon_id = ?", (pokemon_id,)
+                "INSERT OR IGNORE INTO main.types (name) SELECT name FROM shard.types"
             )
-
-            # Insert the moves
-            for move in details["moves"]:
-                cursor.execute(
-                    """
-                INSERT OR IGNORE INTO pokemon_moves (
-                    pokemon_id, move_name
-                ) VALUES (?, ?)
-                """,
-                    (pokemon_id, move),
-                )
-
-            # Ensure we have exactly 5 nicknames (pad with None if needed)
-            padded_nicknames = nicknames[:5] + [None] * (5 - len(nicknames[:5]))
-
-            # Insert or replace the nicknames
             cursor.execute(
-                """
-            INSERT OR REPLACE INTO nicknames (
-                pokemon_id, nickname1, nickname2, nickname3, nickname4, nickname5
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            """,
-                (pokemon_id, *padded_nicknames),
+                "INSERT OR IGNORE INTO main.moves (name) SELECT name FROM shard.moves"
             )
-
+            cursor.execute("""
+            DELETE FROM main.pokemon_types
+            WHERE pokemon_id IN (SELECT pokemon_id FROM temp.detail_winners)
+            """)
+            cursor.execute("""
+            INSERT INTO main.pokemon_types (pokemon_id, slot, type_id)
+            SELECT w.pokemon_id, st.slot, t.id
+            FROM temp.detail_winners w
+            JOIN shard.pokemon_types st ON st.pokemon_id = w.shard_id
+            JOIN shard.types s ON s.id = st.type_id
+            JOIN main.types t ON t.name = s.name
+            """)
+            cursor.execute("""
+            DELETE FROM main.pokemon_moves
+            WHERE pokemon_id IN (SELECT pokemon_id FROM temp.detail_winners)
+            """)
+            cursor.execute("""
+            INSERT INTO main.pokemon_moves (pokemon_id, move_id)
+            SELECT w.pokemon_id, mv.id
+            FROM temp.detail_winners w
+            JOIN shard.pokemon_moves sm ON sm.pokemon_id = w.shard_id
+            JOIN shard.moves s ON s.id = sm.move_id
+            JOIN main.moves mv ON mv.name = s.name
+            """)
+
+            cursor.execute("DROP TABLE temp.shard_ids")
+            cursor.execute("DROP TABLE temp.detail_winners")
             conn.commit()
         except Exception as e:
             conn.rollback()
             raise e
         finally:
-            conn.close()
+            cursor.execute("DETACH DATABASE shard")
 
-    def remove_nicknames(self, pokemon_name: str) -> bool:
-        """
-        Remove all nicknames for a specific Pokémon.
-
-        Args:
-            pokemon_name: The name of the Pokémon
+        return {"pokemon": added, "nicknames": nicknames, "details": details}
 
-        Returns:
-            True if nicknames were removed, False otherwise
+    def search_nicknames(
+        self,
+        query: str,
+        fields: Iterable[str] = ("nicknames",),
+        prefix: bool = True,
+        limit: Optional[int] = 20,
+    ) -> List[Dict[str, Any]]:
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        try:
-            # Get the Pokémon ID
-            cursor.execute(
-                "SELECT id FROM pokemon WHERE name = ?", (pokemon_name.lower(),)
-            )
-            result = cursor.fetchone()
+        Find Pokémon by nickname (or type, colour and habitat) using the full-text index.
 
-            if not result:
-                return False
-
-            pokemon_id = result[0]
+        Every word of the query has to match. Words are matched case-insensitively
+        and, with prefix matching, "spark" also finds "Sparky".
 
-            # Delete the nicknames
-            cursor.execute("DELETE FROM nicknames WHERE pokemon_id = ?", (pokemon_id,))
-
-            rows_affected = cursor.rowcount
-            conn.commit()
+        Args:
+            query: The words to search for
+            fields: Index columns to search ("name", "nicknames", "types", "color", "habitat")
+            prefix: Whether words also match as prefixes
+            limit: Maximum number of results (None for no limit)
 
-            return rows_affected > 0
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+        Returns:
+            A list of dictionaries with the Pokémon name, its nicknames and the
+            BM25 score (lower is a better match), best matches first
 
-    def get_nicknames(self, pokemon_name: str) -> List[str]:
+        Raises:
+            ValueError: If a field is not an index column
         """
-        Get the nicknames for a specific Pokémon.
+        fields = list(fields)
+        unknown = [field for field in fields if field not in SEARCH_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown search fields: {', '.join(unknown)}")
+
+        # Quote each word so FTS5 syntax in the query is matched literally
+        terms = [
+            '"' + word.replace('"', '""') + '"' + ("*" if prefix else "")
+            for word in query.split()
+        ]
+        if not terms or not fields:
+            return []
 
-        Args:
-            pokemon_name: The name of the Pokémon
+        match = f"{{{' '.join(fields)}}} : ({' AND '.join(terms)})"
 
-        Returns:
-            A list of nicknames for the Pokémon
-        """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute(
             """
-        SELECT n.nickname1, n.nickname2, n.nickname3, n.nickname4, n.nickname5
-        FROM nicknames n
-        JOIN pokemon p ON n.pokemon_id = p.id
-        WHERE p.name = ?
+        SELECT 
+            p.name, 
+            n.nickname1, n.nickname2, n.nickname3, n.nickname4, n.nickname5,
+            s.rank
+        FROM pokemon_search s
+        JOIN pokemon p ON p.id = s.rowid
+        LEFT JOIN nicknames n ON n.pokemon_id = p.id
+        WHERE pokemon_search MATCH ?
+        ORDER BY s.rank
+        LIMIT ?
         """,
-            (pokemon_name.lower(),),
+            (match, -1 if limit is None else limit),
         )
 
-        result = cursor.fetchone()
-        conn.close()
-
-        if not result:
-            return []
-
-        # Filter out None values
-        return [nick for nick in result if nick]
+        return [
+            {
+                "pokemon": row[0],
+                "nicknames": [nick for nick in row[1:6] if nick],
+                "score": row[6],
+            }
+            for row in cursor.fetchall()
+        ]
 
     def get_pokemon_details(self, pokemon_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -293,15 +1907,15 @@ class PokemonDatabase:
         Returns:
             A dictionary containing Pokémon details, or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         # Get basic Pokémon information and details
         cursor.execute(
             """
         SELECT 
-            p.name, p.pokedex_id, 
-            d.height, d.weight, d.types, d.color, d.habitat
+            p.id, p.name, p.pokedex_id, 
+            d.height, d.weight, d.color, d.habitat
         FROM pokemon p
         LEFT JOIN pokemon_details d ON p.id = d.pokemon_id
         WHERE p.name = ?
@@ -312,49 +1926,102 @@ class PokemonDatabase:
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return None
 
-        # Convert the result to a dictionary
-        columns = [
-            "name",
-            "pokedex_id",
-            "height",
-            "weight",
-            "types",
-            "color",
-            "habitat",
-        ]
+        pokemon_id = result[0]
 
-        details = dict(zip(columns, result))
+        # Convert the result to a dictionary
+        details = {
+            "name": result[1],
+            "pokedex_id": result[2],
+            "height": result[3],
+            "weight": result[4],
+        }
+
+        # Get the types in slot order
+        cursor.execute(
+            """
+        SELECT t.name
+        FROM pokemon_types pt
+        JOIN types t ON t.id = pt.type_id
+        WHERE pt.pokemon_id = ?
+        ORDER BY pt.slot
+        """,
+            (pokemon_id,),
+        )
+        details["types"] = [row[0] for row in cursor.fetchall()]
 
-        # Get the Pokémon ID
-        cursor.execute("SELECT id FROM pokemon WHERE name = ?", (pokemon_name.lower(),))
-        pokemon_id = cursor.fetchone()[0]
+        details["color"] = result[5]
+        details["habitat"] = result[6]
 
         # Get the moves
         cursor.execute(
             """
-        SELECT move_name
-        FROM pokemon_moves
-        WHERE pokemon_id = ?
-        ORDER BY move_name
+        SELECT m.name
+        FROM pokemon_moves pm
+        JOIN moves m ON m.id = pm.move_id
+        WHERE pm.pokemon_id = ?
+        ORDER BY m.name
         """,
             (pokemon_id,),
         )
+        details["moves"] = [row[0] for row in cursor.fetchall()]
 
-        moves = [row[0] for row in cursor.fetchall()]
-        details["moves"] = moves
+        return details
 
-        conn.close()
+    def get_pokemon_with_move(self, move_name: str) -> List[str]:
+        """
+        Get all Pokémon that know a move.
 
-        # Parse the types
-        if details["types"]:
-            details["types"] = details["types"].split(",")
-        else:
-            details["types"] = []
+        Args:
+            move_name: The name of the move, e.g. "thunderbolt"
 
-        return details
+        Returns:
+            A list of Pokémon names
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+        SELECT p.name
+        FROM moves m
+        JOIN pokemon_moves pm ON pm.move_id = m.id
+        JOIN pokemon p ON p.id = pm.pokemon_id
+        WHERE m.name = ?
+        ORDER BY p.name
+        """,
+            (move_name.lower(),),
+        )
+
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_pokemon_by_type(self, type_name: str) -> List[str]:
+        """
+        Get all Pokémon of a type.
+
+        Args:
+            type_name: The name of the type, e.g. "water"
+
+        Returns:
+            A list of Pokémon names
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+        SELECT p.name
+        FROM types t
+        JOIN pokemon_types pt ON pt.type_id = t.id
+        JOIN pokemon p ON p.id = pt.pokemon_id
+        WHERE t.name = ?
+        ORDER BY p.name
+        """,
+            (type_name.lower(),),
+        )
+
+        return [row[0] for row in cursor.fetchall()]
 
     def get_all_pokemon(self) -> List[str]:
         """
@@ -363,13 +2030,12 @@ class PokemonDatabase:
         Returns:
             A list of Pokémon names
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute("SELECT name FROM pokemon ORDER BY name")
         pokemon_names = [row[0] for row in cursor.fetchall()]
 
-        conn.close()
         return pokemon_names
 
     def get_all_pokemon_with_nicknames(self) -> List[Dict[str, Any]]:
@@ -379,7 +2045,7 @@ class PokemonDatabase:
         Returns:
             A list of dictionaries containing Pokémon names and their nicknames
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -392,7 +2058,6 @@ class PokemonDatabase:
         """)
 
         results = cursor.fetchall()
-        conn.close()
 
         pokemon_with_nicknames = []
         for row in results:
@@ -449,6 +2114,274 @@ class PokemonDatabase:
 
         return len(data)
 
+    def _frame_query(
+        self,
+        tables: Optional[Iterable[str]],
+        columns: Optional[Iterable[str]],
+        where: Optional[str],
+    ) -> Tuple[str, List[str]]:
+        """
+        Build the SQL query behind to_dataframe and iter_batches.
+
+        Args:
+            tables: Tables to include (defaults to all, or those the columns need)
+            columns: Columns to select (defaults to every column of the tables)
+            where: Optional SQL condition
+
+        Returns:
+            The query and the selected columns
+
+        Raises:
+            ValueError: If a table or column is unknown, or a column's table is not selected
+        """
+        column_tables = {
+            column: table
+            for table, table_columns in FRAME_TABLES.items()
+            for column in table_columns
+        }
+
+        if tables is not None:
+            tables = ["pokemon"] + [table for table in tables if table != "pokemon"]
+            unknown = [table for table in tables if table not in FRAME_TABLES]
+            if unknown:
+                raise ValueError(f"Unknown tables: {', '.join(unknown)}")
+
+        if columns is None:
+            tables = tables if tables is not None else list(FRAME_TABLES)
+            columns = [
+                column for table in tables for column in FRAME_TABLES[table]
+            ]
+        else:
+            columns = list(columns)
+            unknown = [column for column in columns if column not in column_tables]
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+            needed = {column_tables[column] for column in columns}
+            if tables is None:
+                tables = ["pokemon"] + [
+                    table for table in FRAME_TABLES if table in needed - {"pokemon"}
+                ]
+            elif not needed <= set(tables):
+                raise ValueError(
+                    f"Columns need tables that are not selected: {', '.join(sorted(needed - set(tables)))}"
+                )
+
+        # Nicknames are selected as their five slots, everything else by name
+        select = [
+            FRAME_TABLES["nicknames"][column]
+            if column == "nicknames"
+            else f"{FRAME_TABLES[column_tables[column]][column]} AS {column}"
+            for column in columns
+        ]
+
+        ctes = [FRAME_CTES[table].strip() for table in tables if table in FRAME_CTES]
+        joins = [FRAME_JOINS[table] for table in tables if table in FRAME_JOINS]
+
+        query = f"SELECT {', '.join(select)}\nFROM pokemon p\n" + "\n".join(joins)
+        if ctes:
+            query = f"WITH {', '.join(ctes)}\n{query}"
+        if where:
+            query += f"\nWHERE {where}"
+        query += "\nORDER BY p.name"
+
+        return query, columns
+
+    @staticmethod
+    def _finish_frame(frame: "pd.DataFrame") -> "pd.DataFrame":
+        """
+        Turn the raw query columns of a DataFrame chunk into list columns.
+
+        Args:
+            frame: A DataFrame read by _frame_query
+
+        Returns:
+            The DataFrame with types, moves and nicknames as lists of strings
+        """
+        import pandas as pd
+
+        # List columns are built as object Series, so empty chunks do not
+        # fall back to float64
+        if "nickname1" in frame.columns:
+            nicknames = pd.Series(
+                [
+                    [nick for nick in row if isinstance(nick, str) and nick]
+                    for row in zip(*(frame[column] for column in NICKNAME_COLUMNS))
+                ],
+                index=frame.index,
+                dtype=object,
+            )
+            position = frame.columns.get_loc("nickname1")
+            frame = frame.drop(columns=NICKNAME_COLUMNS)
+            frame.insert(position, "nicknames", nicknames)
+
+        for column in ("types", "moves"):
+            if column in frame.columns:
+                frame[column] = pd.Series(
+                    [
+                        value.split(",") if isinstance(value, str) and value else []
+                        for value in frame[column]
+                    ],
+                    index=frame.index,
+                    dtype=object,
+                )
+
+        return frame
+
+    def to_dataframe(
+        self,
+        tables: Optional[Iterable[str]] = None,
+        columns: Optional[Iterable[str]] = None,
+        where: Optional[str] = None,
+        params: Iterable[Any] = (),
+    ) -> "pd.DataFrame":
+        """
+        Load Pokémon into a pandas DataFrame with a single query.
+
+        Tables are "pokemon", "details", "types", "moves" and "nicknames"; the
+        pokemon table is always included. Integer columns use pandas' nullable
+        Int64 dtype, and types, moves and nicknames are lists of strings.
+
+        Args:
+            tables: Tables to include (defaults to all, or those the columns need)
+            columns: Columns to select, e.g. ["pokemon", "height", "types"]
+            where: Optional SQL condition, e.g. "d.weight > ?"
+            params: Parameters for the condition
+
+        Returns:
+            A DataFrame with one row per Pokémon, ordered by name
+
+        Raises:
+            ValueError: If a table or column is unknown
+        """
+        import pandas as pd
+
+        query, columns = self._frame_query(tables, columns, where)
+        frame = pd.read_sql(
+            query,
+            self._connect(),
+            params=tuple(params),
+            dtype={column: FRAME_DTYPES[column] for column in columns if column in FRAME_DTYPES},
+        )
+        return self._finish_frame(frame)
+
+    def iter_batches(
+        self,
+        batch_size: int = 10_000,
+        tables: Optional[Iterable[str]] = None,
+        columns: Optional[Iterable[str]] = None,
+        where: Optional[str] = None,
+        params: Iterable[Any] = (),
+    ) -> Iterator["pd.DataFrame"]:
+        """
+        Stream Pokémon as DataFrame batches from a single query.
+
+        Takes the same arguments as to_dataframe, and keeps at most one batch
+        in memory at a time.
+
+        Args:
+            batch_size: Number of rows per batch
+            tables: Tables to include (defaults to all, or those the columns need)
+            columns: Columns to select, e.g. ["pokemon", "height", "types"]
+            where: Optional SQL condition, e.g. "d.weight > ?"
+            params: Parameters for the condition
+
+        Yields:
+            DataFrames of at most batch_size rows
+        """
+        import pandas as pd
+
+        query, columns = self._frame_query(tables, columns, where)
+        for frame in pd.read_sql(
+            query,
+            self._connect(),
+            params=tuple(params),
+            chunksize=batch_size,
+            dtype={column: FRAME_DTYPES[column] for column in columns if column in FRAME_DTYPES},
+        ):
+            yield self._finish_frame(frame)
+
+    def export_columnar(
+        self,
+        path: str,
+        fmt: str = "parquet",
+        detailed: bool = False,
+        compression: Optional[str] = None,
+        chunk_size: int = 50_000,
+    ) -> int:
+        """
+        Export the database to a Parquet, Feather or Arrow file.
+
+        Rows are read and written in chunks, so memory stays bounded for large
+        databases. Feather files use the Arrow IPC file format, and Arrow files
+        the IPC stream format.
+
+        Args:
+            path: Path to the output file
+            fmt: One of "parquet", "feather" or "arrow"
+            detailed: Whether to include the Pokémon details
+            compression: Compression codec, or "none" (defaults to the format's default)
+            chunk_size: Number of rows per chunk
+
+        Returns:
+            The number of rows exported
+
+        Raises:
+            ValueError: If the format is not a columnar format
+            ImportError: If pyarrow is not installed
+        """
+        if fmt not in DEFAULT_COMPRESSION:
+            raise ValueError(f"Unsupported columnar format: {fmt}")
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                f"pyarrow is required for {fmt} exports; install it with `uv sync --extra arrow`"
+            ) from e
+
+        if compression is None:
+            compression = DEFAULT_COMPRESSION[fmt]
+        elif compression == "none":
+            compression = None
+
+        # Build the schema explicitly so empty chunks and nulls keep their types
+        string_list = pa.list_(pa.string())
+        fields = [("pokemon", pa.string())]
+        if detailed:
+            fields += [
+                ("pokedex_id", pa.int64()),
+                ("height", pa.int64()),
+                ("weight", pa.int64()),
+                ("types", string_list),
+                ("color", pa.string()),
+                ("habitat", pa.string()),
+                ("moves", string_list),
+            ]
+        fields.append(("nicknames", string_list))
+        schema = pa.schema(fields)
+
+        if fmt == "parquet":
+            writer = pq.ParquetWriter(path, schema, compression=compression or "none")
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            if fmt == "feather":
+                writer = pa.ipc.new_file(path, schema, options=options)
+            else:
+                writer = pa.ipc.new_stream(path, schema, options=options)
+
+        count = 0
+        with writer:
+            export_columns = EXPORT_FRAME_COLUMNS if detailed else ["pokemon", "nicknames"]
+            for frame in self.iter_batches(chunk_size, columns=export_columns):
+                writer.write_table(
+                    pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+                )
+                count += len(frame)
+
+        return count
+
     def export_detailed_csv(self, csv_path: str) -> int:
         """
         Export the database with detailed Pokémon information to a CSV file.
@@ -459,81 +2392,113 @@ class PokemonDatabase:
         Returns:
             The number of rows exported
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
-        # Get all Pokémon with their details
-        cursor.execute("""
-        SELECT 
-            p.name, p.pokedex_id, 
-            d.height, d.weight, d.types, d.color, d.habitat
-        FROM pokemon p
-        LEFT JOIN pokemon_details d ON p.id = d.pokemon_id
-        ORDER BY p.name
-        """)
+        # Get every Pokémon with its details, moves and nicknames in one pass
+        cursor.execute(DETAILED_EXPORT_QUERY)
 
-        results = cursor.fetchall()
+        count = 0
+        with open(csv_path, "w", newline="") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(DETAILED_EXPORT_COLUMNS)
 
-        # Prepare the data for export
-        export_data = []
-        for row in results:
-            pokemon_name = row[0]
+            # Stream rows from the cursor straight into the file
+            for rows in iter(lambda: cursor.fetchmany(1000), []):
+                writer.writerows(rows)
+                count += len(rows)
 
-            # Get the Pokémon ID
-            cursor.execute("SELECT id FROM pokemon WHERE name = ?", (pokemon_name,))
-            pokemon_id = cursor.fetchone()[0]
+        return count
 
-            # Get the moves
-            cursor.execute(
-                """
-            SELECT move_name
-            FROM pokemon_moves
-            WHERE pokemon_id = ?
-            ORDER BY move_name
-            """,
-                (pokemon_id,),
-            )
 
-            moves = [row[0] for row in cursor.fetchall()]
-            moves_str = ",".join(moves)
+class GroupCommitWriter:
+    """
+    A single writer thread that group-commits records from concurrent producers.
 
-            # Get the nicknames
-            cursor.execute(
-                """
-            SELECT nickname1, nickname2, nickname3, nickname4, nickname5
-            FROM nicknames
-            WHERE pokemon_id = ?
-            """,
-                (pokemon_id,),
-            )
+    Producers call submit() from any thread; the writer collects records and
+    writes them with PokemonDatabase.add_many once `max_batch` records are
+    waiting or `max_delay_ms` milliseconds have passed since the first one.
+    """
 
-            nickname_row = cursor.fetchone()
-            nicknames = [nick for nick in nickname_row] if nickname_row else [None] * 5
+    def __init__(
+        self, db: PokemonDatabase, max_batch: int = 100, max_delay_ms: float = 50
+    ):
+        """
+        Initialize the writer and start its thread.
 
-            # Add to export data
-            export_data.append(row + (moves_str,) + tuple(nicknames))
+        Args:
+            db: The database instance
+            max_batch: Maximum number of records per transaction
+            max_delay_ms: Maximum time a record waits before its batch is committed
+        """
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
 
-        conn.close()
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
 
-        with open(csv_path, "w", newline="") as csvfile:
-            fieldnames = [
-                "pokemon",
-                "pokedex_id",
-                "height",
-                "weight",
-                "types",
-                "color",
-                "habitat",
-                "moves",
-                "nickname1",
-                "nickname2",
-                "nickname3",
-                "nickname4",
-                "nickname5",
-            ]
-            writer = csv.writer(csvfile)
+    def submit(self, record: Dict[str, Any]) -> Future:
+        """
+        Queue a record for writing.
+
+        Args:
+            record: A record in the format accepted by PokemonDatabase.add_many
+
+        Returns:
+            A future that resolves once the record's batch is committed
+        """
+        future: Future = Future()
+        self._queue.put((record, future))
+        return future
+
+    def _run(self) -> None:
+        """
+        Collect queued records into batches and commit them until closed.
+        """
+        closed = False
+
+        while not closed:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+
+            # Keep collecting until the batch is full or the deadline passes
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                batch.append(item)
+
+            try:
+                self.db.add_many(record for record, _ in batch)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for _, future in batch:
+                    future.set_result(None)
+
+    def close(self) -> None:
+        """
+        Commit any queued records and stop the writer thread.
+        """
+        self._queue.put(None)
+        self._thread.join()
 
-            writer.writerow(fieldnames)
-            writer.writerows(export_data)
+    def __enter__(self) -> "GroupCommitWriter":
+        return self
 
-        return len(export_data)
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,240 @@
+import io
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import SpriteCatalog
+from db import PokemonDatabase
+
+
+# Name stored with each vector; change it when the features change
+EMBEDDING_MODEL = "color-hist-v1"
+
+# Bins per colour channel for the colour histogram
+COLOR_BINS = 4
+
+# Size (width, height) of the downsampled foreground mask; combined sprites are wide
+MASK_SIZE = (16, 8)
+
+# Weight of the silhouette features relative to the colour features
+MASK_WEIGHT = 0.5
+
+# Border colours covering at least this share of the border count as background
+BACKGROUND_MIN_SHARE = 0.1
+
+EMBEDDING_DIM = COLOR_BINS**3 + MASK_SIZE[0] * MASK_SIZE[1]
+
+
+class MissingEmbeddingError(ValueError):
+    """
+    Raised when a Pokémon has no stored embedding to search from.
+    """
+
+
+def foreground_mask(pixels: np.ndarray) -> np.ndarray:
+    """
+    Find the pixels that belong to the Pokémon rather than the background.
+
+    The combined sprites are opaque with flat background panels, so besides
+    transparent pixels, any colour that covers a large share of the image
+    border is treated as background.
+
+    Args:
+        pixels: An (height, width, 4) RGBA array
+
+    Returns:
+        A boolean (height, width) mask of foreground pixels
+    """
+    packed = (
+        (pixels[..., 0].astype(np.int32) << 16)
+        | (pixels[..., 1].astype(np.int32) << 8)
+        | pixels[..., 2]
+    )
+    border = np.concatenate([packed[0], packed[-1], packed[:, 0], packed[:, -1]])
+    colours, counts = np.unique(border, return_counts=True)
+    background = colours[counts >= BACKGROUND_MIN_SHARE * len(border)]
+
+    return (pixels[..., 3] > 0) & ~np.isin(packed, background)
+
+
+def embed_image(image_bytes: bytes) -> np.ndarray:
+    """
+    Compute the embedding of a sprite image.
+
+    The vector concatenates a colour histogram of the foreground pixels
+    (square-rooted, so cosine similarity compares distributions) and a
+    downsampled foreground mask that captures the silhouette. It is
+    L2-normalized, so dot products are cosine similarities.
+
+    Args:
+        image_bytes: The raw contents of the sprite file
+
+    Returns:
+        A float32 vector of length EMBEDDING_DIM
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(image_bytes)).convert("RGBA")
+    pixels = np.asarray(image)
+    foreground = foreground_mask(pixels)
+
+    # Colour histogram over the foreground pixels
+    rgb = (pixels[..., :3][foreground] // (256 // COLOR_BINS)).astype(np.int64)
+    bins = (rgb[:, 0] * COLOR_BINS + rgb[:, 1]) * COLOR_BINS + rgb[:, 2]
+    histogram = np.bincount(bins, minlength=COLOR_BINS**3).astype(np.float32)
+    if histogram.sum():
+        histogram = np.sqrt(histogram / histogram.sum())
+
+    # Silhouette from the downsampled foreground mask
+    mask_image = Image.fromarray(foreground.astype(np.uint8) * 255)
+    mask = np.asarray(
+        mask_image.resize(MASK_SIZE, Image.Resampling.BILINEAR), dtype=np.float32
+    ).ravel()
+    mask_norm = np.linalg.norm(mask)
+    if mask_norm:
+        mask /= mask_norm
+
+    vector = np.concatenate([histogram, MASK_WEIGHT * mask])
+    norm = np.linalg.norm(vector)
+
+    return (vector / norm if norm else vector).astype(np.float32)
+
+
+def embed_catalog(
+    db: PokemonDatabase,
+    catalog: SpriteCatalog,
+    force: bool = False,
+    batch_size: int = 256,
+    on_done: Optional[Callable[[str], None]] = None,
+) -> int:
+    """
+    Embed every sprite in the catalog whose embedding is missing or stale.
+
+    Sprites are compared by content hash with the stored embeddings, so only
+    new or changed sprites are embedded. Vectors are written in batches, one
+    transaction per batch. Embeddings of sprites no longer in the catalog are
+    deleted.
+
+    Args:
+        db: The database instance
+        catalog: The sprite catalog
+        force: Whether to embed every sprite again
+        batch_size: Number of vectors written per transaction
+        on_done: Optional callback called with each Pokémon name once processed
+
+    Returns:
+        The number of sprites embedded
+    """
+    stored = db.get_embedding_hashes(EMBEDDING_MODEL)
+
+    removed = [name for name in stored if name not in catalog]
+    if removed:
+        db.delete_embeddings(EMBEDDING_MODEL, removed)
+
+    if force:
+        stored = {}
+    pending = [entry for entry in catalog if stored.get(entry.name) != entry.sha256]
+
+    count = 0
+    for start in range(0, len(pending), batch_size):
+        records = []
+        for entry in pending[start : start + batch_size]:
+            with open(entry.path, "rb") as f:
+                vector = embed_image(f.read())
+            records.append((entry.name, entry.sha256, EMBEDDING_DIM, vector.tobytes()))
+
+            if on_done:
+                on_done(entry.name)
+
+        count += db.add_embeddings_many(EMBEDDING_MODEL, records)
+
+    return count
+
+
+def load_embeddings(
+    db: PokemonDatabase,
+    model: str = EMBEDDING_MODEL,
+    pokemon_names: Optional[List[str]] = None,
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Load stored embeddings into one matrix.
+
+    Args:
+        db: The database instance
+        model: The name of the embedding model
+        pokemon_names: Only load these Pokémon (defaults to all)
+
+    Returns:
+        The Pokémon names and a (len(names), dim) float32 matrix with one row each
+    """
+    rows = db.get_embeddings(model, pokemon_names)
+    if not rows:
+        return [], np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+
+    names = [row[0] for row in rows]
+    dim = rows[0][1]
+
+    # One copy from the joined BLOBs instead of one array per row
+    matrix = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32)
+
+    return names, matrix.reshape(len(rows), dim)
+
+
+def top_k(
+    matrix: np.ndarray, query: np.ndarray, k: int, exclude: Optional[int] = None
+) -> List[Tuple[int, float]]:
+    """
+    Find the rows most similar to a query vector.
+
+    Args:
+        matrix: The normalized embedding matrix
+        query: The normalized query vector
+        k: Number of results
+        exclude: Optional row index to leave out (usually the query itself)
+
+    Returns:
+        (row index, cosine similarity) pairs, most similar first
+    """
+    scores = matrix @ query
+    if exclude is not None:
+        scores[exclude] = -np.inf
+
+    k = min(k, len(scores) - (exclude is not None))
+    if k <= 0:
+        return []
+
+    # Partition first so only the top k are sorted
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    ranked = candidates[np.argsort(-scores[candidates])]
+
+    return [(int(index), float(scores[index])) for index in ranked]
+
+
+def find_similar(
+    db: PokemonDatabase, pokemon_name: str, k: int = 10
+) -> List[Tuple[str, float]]:
+    """
+    Find the Pokémon whose sprites are most similar to another Pokémon's sprite.
+
+    Args:
+        db: The database instance
+        pokemon_name: The name of the Pokémon
+        k: Number of results
+
+    Returns:
+        (pokemon_name, cosine similarity) pairs, most similar first
+
+    Raises:
+        MissingEmbeddingError: If the Pokémon has no stored embedding
+    """
+    names, matrix = load_embeddings(db)
+    positions: Dict[str, int] = {name: i for i, name in enumerate(names)}
+
+    index = positions.get(pokemon_name.lower())
+    if index is None:
+        raise MissingEmbeddingError(f"No embedding found for Pokémon: {pokemon_name}")
+
+    return [
+        (names[row], score)
+        for row, score in top_k(matrix, matrix[index], k, exclude=index)
+    ]
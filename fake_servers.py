@@ -0,0 +1,349 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+import typer
+
+
+# Words the fake model picks nicknames from
+NICKNAME_WORDS = [
+    "Blaze", "Pebble", "Sprout", "Ripple", "Bolt", "Frost", "Shadow", "Comet",
+    "Ember", "Misty", "Thorn", "Gale", "Quartz", "Echo", "Nova", "Clover",
+]  # fmt: skip
+
+TYPES = ["normal", "fire", "water", "grass", "electric", "psychic", "rock", "ghost"]
+COLORS = ["red", "blue", "green", "yellow", "purple", "brown", "white", "black"]
+HABITATS = ["forest", "cave", "sea", "mountain", "grassland", None]
+
+
+class FakeServer:
+    """
+    A local HTTP server with configurable latency and error rate, run in a thread.
+
+    Each request sleeps for `latency_ms` (with +/- `jitter` relative spread),
+    then fails with `error_status` at `error_rate`. If `max_in_flight` is set,
+    requests beyond it are rejected at once with a 429 and a retry-after-ms
+    header, like a provider's concurrency limit. Use it as a context manager.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter: float = 0.2,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        max_in_flight: Optional[int] = None,
+        port: int = 0,
+        seed: int = 0,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            latency_ms: Mean response latency in milliseconds
+            jitter: Relative spread of the latency, e.g. 0.2 for +/- 20%
+            error_rate: Share of requests that fail with `error_status`
+            error_status: The HTTP status of injected errors
+            max_in_flight: Maximum concurrent requests before returning 429s
+            port: Port to listen on (0 picks a free port)
+            seed: Random seed, so runs are comparable
+        """
+        self.latency = latency_ms / 1000
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_in_flight = max_in_flight
+
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; don't let them wait on ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                server._handle(self, None)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                server._handle(self, json.loads(self.rfile.read(length) or b"{}"))
+
+        # The default backlog of 5 stalls bursts of connections for a second
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 1024
+
+        self.httpd = Server(("127.0.0.1", port), Handler)
+        self.port = self.httpd.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def respond(self, path: str, body: Optional[Dict[str, Any]]) -> Tuple[int, Any]:
+        """
+        Build the response to a request; overridden by each fake API.
+
+        Args:
+            path: The request path
+            body: The JSON body of a POST request, or None for a GET request
+
+        Returns:
+            The HTTP status and the JSON document to return
+        """
+        return 404, {"error": "not found"}
+
+    def _handle(
+        self, handler: BaseHTTPRequestHandler, body: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Apply the configured behaviour to a request and send the response.
+        """
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            rejected = (
+                self.max_in_flight is not None and self.in_flight > self.max_in_flight
+            )
+            failed = not rejected and self._random.random() < self.error_rate
+            spread = self._random.uniform(1 - self.jitter, 1 + self.jitter)
+            if rejected:
+                self.rejected += 1
+            if failed:
+                self.errors += 1
+
+        headers = {}
+        try:
+            if rejected:
+                status, document = 429, {"error": {"message": "Too many requests"}}
+                headers["retry-after-ms"] = str(int(max(self.latency, 0.05) * 1000))
+            else:
+                time.sleep(self.latency * spread)
+                if failed:
+                    status = self.error_status
+                    document = {"error": {"message": "Injected error"}}
+                else:
+                    status, document = self.respond(handler.path, body)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        payload = json.dumps(document).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the request counters.
+
+        Returns:
+            The number of requests, injected errors and rejected requests
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "rejected": self.rejected,
+            }
+
+    def start(self) -> "FakeServer":
+        """
+        Start serving in a background thread.
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+def _pick(name: str, choices: list, salt: str = "") -> Any:
+    """
+    Pick a choice deterministically from a name, so repeat runs agree.
+    """
+    digest = hashlib.sha256(f"{salt}{name}".encode()).digest()
+    return choices[int.from_bytes(digest[:4], "big") % len(choices)]
+
+
+class FakeOpenAIServer(FakeServer):
+    """
+    An OpenAI-compatible chat completions endpoint that returns made-up nicknames.
+
+    It answers the strict JSON-schema requests sent by OpenAIBackend, for both
+    single and packed sprites, and reports token usage.
+    """
+
+    def respond(self, path: str, body: Optional[Dict[str, Any]]) -> Tuple[int, Any]:
+        if body is None or not path.endswith("/chat/completions"):
+            return 404, {"error": {"message": "Not found"}}
+
+        schema = body.get("response_format", {}).get("json_schema", {}).get("name")
+        content = body["messages"][-1]["content"]
+
+        if schema == "PackedNicknames":
+            names = [
+                part["text"].split(": ", 1)[1]
+                for part in content
+                if part.get("type") == "text" and ": " in part["text"]
+            ]
+            answer = {
+                "results": [
+                    {"pokemon": name, "nicknames": self._nicknames(name)}
+                    for name in names
+                ]
+            }
+        else:
+            answer = {"nicknames": self._nicknames(json.dumps(content)[-64:])}
+
+        return 200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": json.dumps(answer)},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 300 * len(content),
+                "completion_tokens": 20 * len(answer.get("results", [answer])),
+                "total_tokens": 300 * len(content) + 20,
+            },
+        }
+
+    @staticmethod
+    def _nicknames(seed: str) -> list:
+        return [_pick(seed, NICKNAME_WORDS, str(i)) for i in range(5)]
+
+
+class FakePokeAPIServer(FakeServer):
+    """
+    A PokéAPI stand-in that serves made-up pokemon and pokemon-species documents
+    for any name, with the fields PokeAPIClient reads.
+    """
+
+    PATH = re.compile(r"/api/v2/(pokemon|pokemon-species)/([^/]+)/?$")
+
+    def respond(self, path: str, body: Optional[Dict[str, Any]]) -> Tuple[int, Any]:
+        match = self.PATH.search(path)
+        if body is not None or not match:
+            return 404, {"detail": "Not found."}
+
+        resource, name = match.groups()
+
+        if resource == "pokemon":
+            digest = int(hashlib.sha256(name.encode()).hexdigest()[:8], 16)
+            return 200, {
+                "id": digest % 100_000,
+                "name": name,
+                "height": digest % 200 + 1,
+                "weight": digest % 9999 + 1,
+                "types": [{"slot": 1, "type": {"name": _pick(name, TYPES)}}],
+                "moves": [
+                    {"move": {"name": f"move-{(digest + i * 7) % 500}"}}
+                    for i in range(20)
+                ],
+                "species": {"name": name, "url": f"/api/v2/pokemon-species/{name}/"},
+            }
+
+        return 200, {
+            "name": name,
+            "color": {"name": _pick(name, COLORS, "color")},
+            "habitat": (
+                {"name": habitat}
+                if (habitat := _pick(name, HABITATS, "habitat"))
+                else None
+            ),
+        }
+
+
+app = typer.Typer()
+
+
+def _serve(server: FakeServer, label: str) -> None:
+    """
+    Run a fake server in the foreground until interrupted.
+    """
+    with server:
+        print(f"Fake {label} listening on {server.url}", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+@app.callback()
+def main():
+    """Local stand-ins for the OpenAI and PokéAPI HTTP APIs."""
+
+
+@app.command()
+def openai(
+    port: int = typer.Option(8000, "--port", "-p", help="Port to listen on"),
+    latency_ms: float = typer.Option(
+        50, "--latency-ms", help="Mean latency per request"
+    ),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Share of 500 errors"),
+    max_in_flight: Optional[int] = typer.Option(
+        None, "--max-in-flight", help="Concurrent requests allowed before 429s"
+    ),
+):
+    """Serve a fake OpenAI chat completions API (use with --backend local)."""
+    _serve(
+        FakeOpenAIServer(
+            latency_ms, error_rate=error_rate, max_in_flight=max_in_flight, port=port
+        ),
+        "OpenAI API",
+    )
+
+
+@app.command()
+def pokeapi(
+    port: int = typer.Option(8001, "--port", "-p", help="Port to listen on"),
+    latency_ms: float = typer.Option(
+        10, "--latency-ms", help="Mean latency per request"
+    ),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Share of 500 errors"),
+):
+    """Serve a fake PokéAPI (use with --pokeapi-url http://127.0.0.1:PORT/api/v2)."""
+    _serve(FakePokeAPIServer(latency_ms, error_rate=error_rate, port=port), "PokéAPI")
+
+
+if __name__ == "__main__":
+    app()
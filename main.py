@@ -1,30 +1,49 @@
 import os
 import sys
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
 import typer
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from dotenv import load_dotenv
-
-from db import PokemonDatabase
-from nickname_generator import get_nicknames
+from rich.progress import Progress, SpinnerColumn, TaskID, TextColumn
+
+# Heavy modules (langchain, pydantic, PIL, requests) are imported inside the
+# commands that use them, so that commands like `view` start quickly
+from cache import (
+    DEFAULT_SPRITE_CACHE_PATH,
+    ResponseCache,
+    SpritePayloadCache,
+    ann_index_path,
+    response_cache_path,
+)
+from catalog import SpriteCatalog, get_catalog
+from db import EXPORT_FORMATS, SEARCH_FIELDS, GroupCommitWriter, PokemonDatabase
+from pokeapi import DEFAULT_BASE_URL
+from sharding import find_shard_dbs, parse_shard, select_shard, shard_db_path
+
+if TYPE_CHECKING:
+    from nickname_generator import NicknameGenerator
+    from throttle import AdaptiveThrottle
 
 # Initialize Typer app
 app = typer.Typer(help="Generate and store nicknames for Pokémon sprites.")
 console = Console()
 
 
-def load_environment() -> None:
+def load_environment(require_api_key: bool = True) -> None:
     """
     Load environment variables from .env file.
+
+    Args:
+        require_api_key: Whether to exit if OPENAI_API_KEY is not set
     """
+    from dotenv import load_dotenv
+
     load_dotenv()
 
     # Check if OPENAI_API_KEY is set
-    if not os.getenv("OPENAI_API_KEY"):
+    if require_api_key and not os.getenv("OPENAI_API_KEY"):
         console.print(
             "[bold red]Error:[/bold red] OPENAI_API_KEY environment variable is not set."
         )
@@ -32,27 +51,57 @@ def load_environment() -> None:
         sys.exit(1)
 
 
-def get_pokemon_list() -> List[str]:
+def get_sprite_catalog() -> SpriteCatalog:
     """
-    Get a list of all Pokémon based on the sprite files.
+    Get the catalog of sprite files.
 
     Returns:
-        A list of Pokémon names
+        The sprite catalog, refreshed if the sprites directory changed
     """
-    pokemon_names = []
-
     # Check if the sprites directory exists
-    if not os.path.isdir("sprites"):
+    try:
+        return get_catalog()
+    except FileNotFoundError:
         console.print("[bold red]Error:[/bold red] 'sprites' directory not found.")
         sys.exit(1)
 
-    # Get all sprite files
-    for filename in os.listdir("sprites"):
-        if filename.endswith("_combined.png"):
-            pokemon_name = filename.replace("_combined.png", "")
-            pokemon_names.append(pokemon_name)
 
-    return sorted(pokemon_names)
+def get_pokemon_list(shard: Optional[Tuple[int, int]] = None) -> List[str]:
+    """
+    Get a list of all Pokémon based on the sprite files.
+
+    Args:
+        shard: Only get the Pokémon of this (shard number, shard count)
+
+    Returns:
+        A list of Pokémon names
+    """
+    pokemon_list = get_sprite_catalog().names()
+
+    if shard is not None:
+        pokemon_list = select_shard(pokemon_list, *shard)
+
+    return pokemon_list
+
+
+def check_pokemon_exists(pokemon_name: str) -> bool:
+    """
+    Check that a Pokémon has a sprite, and print an error if it does not.
+
+    Args:
+        pokemon_name: The lowercase name of the Pokémon
+
+    Returns:
+        Whether the Pokémon exists
+    """
+    if pokemon_name in get_sprite_catalog():
+        return True
+
+    console.print(f"[bold red]Error:[/bold red] Pokémon '{pokemon_name}' not found.")
+    console.print(
+        "Use [bold]uv run main.py list-pokemon[/bold] to see available Pokémon."
+    )
+    return False
 
 
 def display_pokemon_image(pokemon_name: str) -> None:
@@ -121,9 +170,9 @@ def display_pokemon_image(pokemon_name: str) -> None:
 def process_pokemon(
     pokemon_name: str,
     db: PokemonDatabase,
+    generator: "NicknameGenerator",
     show_image: bool = False,
     force: bool = False,
-    temperature: float = 0.5,
 ) -> None:
     """
     Process a single Pokémon: generate nicknames and store them in the database.
@@ -131,6 +180,7 @@ def process_pokemon(
     Args:
         pokemon_name: The name of the Pokémon
         db: The database instance
+        generator: The nickname generator shared by the run
         show_image: Whether to display the Pokémon image
         force: Whether to force regeneration of nicknames
     """
@@ -173,7 +223,7 @@ def process_pokemon(
             progress.add_task(pokemon_name.capitalize(), total=None)
 
             # Generate nicknames
-            nicknames = get_nicknames(pokemon_name, temperature)
+            nicknames = generator.generate(pokemon_name)
 
         # Store in database
         db.add_pokemon_with_nicknames(pokemon_name, nicknames)
@@ -197,11 +247,187 @@ def process_pokemon(
         console.print(f"[bold red]Error processing {pokemon_name}:[/bold red] {str(e)}")
 
 
+def hydrate_pokemon(
+    pokemon_list: List[str],
+    db: PokemonDatabase,
+    workers: int = 8,
+    offline: bool = False,
+    fetcher: Optional[Callable[[str], Dict[str, Any]]] = None,
+    throttle: Optional["AdaptiveThrottle"] = None,
+) -> int:
+    """
+    Fetch details for many Pokémon and store them.
+
+    Details are resolved from the local PokéAPI snapshot first (see the
+    `import-pokeapi` command); the rest are fetched concurrently from PokéAPI
+    and stored in one transaction.
+
+    Args:
+        pokemon_list: The names of the Pokémon to hydrate
+        db: The database instance
+        workers: Number of concurrent fetches
+        offline: Whether to skip fetching Pokémon missing from the snapshot
+        fetcher: The function that fetches the details of one Pokémon
+            (defaults to fetching from PokéAPI)
+        throttle: The throttle fetches go through (defaults to `workers`
+            concurrent fetches with retries)
+
+    Returns:
+        The number of Pokémon whose details were stored
+    """
+    from pokeapi import api_name, fetch_many, fetch_pokemon_details
+    from throttle import create_throttle
+
+    if not pokemon_list:
+        return 0
+
+    # Resolve what we can from the local snapshot
+    snapshot_details = db.get_snapshot_details(
+        {name: api_name(name) for name in pokemon_list}
+    )
+    count = db.add_pokemon_details_many(snapshot_details)
+
+    pokemon_list = [name for name in pokemon_list if name not in snapshot_details]
+    if not pokemon_list:
+        return count
+
+    if offline:
+        for pokemon_name in pokemon_list:
+            console.print(
+                f"[red]Error fetching details for {pokemon_name}: not found in the local PokéAPI snapshot[/red]"
+            )
+        return count
+
+    with Progress(transient=True) as progress:
+        task = progress.add_task("[green]Fetching details...", total=len(pokemon_list))
+
+        # The throttle decides how many fetches are in flight; the pool only caps it
+        throttle = throttle or create_throttle(workers)
+
+        # No database connection is held while the fetches are in flight
+        details, errors = fetch_many(
+            pokemon_list,
+            workers=throttle.limiter.max_limit,
+            fetcher=throttle.wrap(fetcher or fetch_pokemon_details),
+            on_done=lambda name: progress.update(task, advance=1),
+        )
+
+    for pokemon_name, error in sorted(errors.items()):
+        console.print(
+            f"[red]Error fetching details for {pokemon_name}: {error}[/red]"
+        )
+
+    return count + db.add_pokemon_details_many(details)
+
+
+async def process_pokemon_batch(
+    pokemon_list: List[str],
+    db: PokemonDatabase,
+    generator: "NicknameGenerator",
+    progress: Progress,
+    task: TaskID,
+    job_id: Optional[int] = None,
+    concurrency: int = 1,
+    requests_per_minute: Optional[float] = None,
+    pack: int = 1,
+) -> None:
+    """
+    Generate nicknames for many Pokémon concurrently.
+
+    Pokémon are sent in groups of `pack` sprites per request and each group runs
+    as its own task; at most `concurrency` of them are in flight at once and new
+    nickname requests are spaced to respect `requests_per_minute`. Pokémon missing
+    from a packed response are retried with single-sprite requests. Results are
+    written by a single group-committing writer thread.
+
+    When a job is given, each item's attempts, errors and timings are journaled
+    in its job_items, and results are marked done in the same transaction that
+    stores them.
+
+    Args:
+        pokemon_list: The names of the Pokémon to process
+        db: The database instance
+        generator: The nickname generator shared by the run
+        progress: The progress bar to advance
+        task: The progress task to advance
+        job_id: The ID of the job journaling the run
+        concurrency: Maximum number of Pokémon processed at the same time
+        requests_per_minute: Maximum number of nickname requests per minute
+        pack: Number of sprites sent in each request
+    """
+    import asyncio
+
+    from throttle import RateLimiter
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(requests_per_minute)
+    writer = GroupCommitWriter(db)
+
+    groups = [pokemon_list[i : i + pack] for i in range(0, len(pokemon_list), pack)]
+
+    def fail(pokemon_names: List[str], error: Exception) -> None:
+        for pokemon_name in pokemon_names:
+            console.print(f"[red]Error processing {pokemon_name}: {str(error)}[/red]")
+        if job_id is not None:
+            db.fail_job_items(job_id, pokemon_names, str(error))
+
+    async def worker(group: List[str]) -> None:
+        async with semaphore:
+            progress.update(
+                task,
+                description=f"[green]Processing {', '.join(name.capitalize() for name in group)}...",
+            )
+
+            if job_id is not None:
+                db.start_job_items(job_id, group)
+
+            # Generate nicknames without showing images in batch mode
+            try:
+                await limiter.acquire()
+                if len(group) == 1:
+                    results = {group[0]: await generator.agenerate(group[0])}
+                else:
+                    results = await generator.agenerate_many(group, fallback=False)
+            except Exception as e:
+                fail(group, e)
+                progress.update(task, advance=len(group))
+                return
+
+            writes = {}
+            for pokemon_name in group:
+                try:
+                    nicknames = results.get(pokemon_name)
+
+                    # Fall back to a single-sprite request if the packed response missed it
+                    if nicknames is None:
+                        await limiter.acquire()
+                        nicknames = await generator.agenerate(pokemon_name)
+
+                    writes[pokemon_name] = writer.submit(
+                        {"name": pokemon_name, "nicknames": nicknames, "job_id": job_id}
+                    )
+                except Exception as e:
+                    fail([pokemon_name], e)
+                    progress.update(task, advance=1)
+
+            # Wait for the writer to commit the group's results
+            for pokemon_name, write in writes.items():
+                try:
+                    await asyncio.wrap_future(write)
+                except Exception as e:
+                    fail([pokemon_name], e)
+                finally:
+                    progress.update(task, advance=1)
+
+    try:
+        await asyncio.gather(*(worker(group) for group in groups))
+    finally:
+        writer.close()
+
+
 @app.command()
 def list_pokemon():
     """List all available Pokémon."""
-    load_environment()
-
     pokemon_list = get_pokemon_list()
 
     console.print("[bold]Available Pokémon:[/bold]")
@@ -248,65 +474,891 @@ def generate(
     temperature: float = typer.Option(
         0.5, "--temperature", "-t", help="Temperature for the nickname generator"
     ),
+    concurrency: int = typer.Option(
+        1,
+        "--concurrency",
+        "-c",
+        min=1,
+        help="Maximum number of in-flight nickname requests when processing all Pokémon",
+    ),
+    requests_per_minute: Optional[float] = typer.Option(
+        None,
+        "--rpm",
+        min=0,
+        help="Maximum number of nickname requests per minute (omit for no limit)",
+    ),
+    backend: str = typer.Option(
+        "openai",
+        "--backend",
+        "-b",
+        help="Nickname backend to use (openai or local)",
+    ),
+    base_url: Optional[str] = typer.Option(
+        None,
+        "--base-url",
+        help="Base URL of an OpenAI-compatible API (e.g. a local stub server)",
+    ),
+    pokeapi_url: str = typer.Option(
+        DEFAULT_BASE_URL,
+        "--pokeapi-url",
+        help="Base URL of the PokéAPI server details are fetched from",
+    ),
+    sprite_cache_path: str = typer.Option(
+        DEFAULT_SPRITE_CACHE_PATH,
+        "--sprite-cache",
+        help="Path to the sprite payload cache file",
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Bypass the response cache and always call the nickname backend",
+    ),
+    sample: int = typer.Option(
+        0,
+        "--sample",
+        min=0,
+        help="Response cache sample index; use a new index to draw fresh nicknames",
+    ),
+    pack: int = typer.Option(
+        1,
+        "--pack",
+        "-k",
+        min=1,
+        help="Number of sprites sent in each request when processing all Pokémon",
+    ),
+    emit_batch: Optional[str] = typer.Option(
+        None,
+        "--emit-batch",
+        help="Write batch API requests for pending Pokémon to this JSONL file instead of calling the API",
+    ),
+    resume: Optional[int] = typer.Option(
+        None,
+        "--resume",
+        "-r",
+        help="ID of an interrupted or incomplete job to continue (see the jobs command)",
+    ),
+    shard: Optional[str] = typer.Option(
+        None,
+        "--shard",
+        help="Only process shard i of N (e.g. 1/4), writing to its own shard database next to --db (see the merge command)",
+    ),
+    adaptive: bool = typer.Option(
+        False,
+        "--adaptive",
+        help="Adapt the number of requests in flight to the provider's limits, starting from --concurrency",
+    ),
+    max_retries: int = typer.Option(
+        3,
+        "--max-retries",
+        min=0,
+        help="Maximum retries per request on rate limits and transient errors",
+    ),
+    metrics_jsonl: Optional[str] = typer.Option(
+        None,
+        "--metrics-jsonl",
+        help="Also append the run's stage timings to this JSON-lines file",
+    ),
 ):
     """Generate nicknames for a Pokémon or all Pokémon."""
-    load_environment()
+    import asyncio
+    from contextlib import closing
+
+    from batch import write_batch_requests
+    from metrics import record_run
+    from nickname_generator import NicknameGenerator, ThrottledBackend, create_backend
+    from pokeapi import PokeAPIClient
+    from throttle import create_throttle
+
+    load_environment(require_api_key=backend == "openai" and not emit_batch)
+
+    # A shard writes its share of the Pokémon to its own database
+    shard_spec = None
+    if shard:
+        if pokemon_name:
+            console.print(
+                "[bold red]Error:[/bold red] --shard only applies when processing all Pokémon."
+            )
+            return
+
+        try:
+            shard_spec = parse_shard(shard)
+        except ValueError as e:
+            console.print(f"[bold red]Error:[/bold red] {str(e)}")
+            return
+
+        db_path = shard_db_path(db_path, *shard_spec)
+        console.print(f"[dim]Shard {shard}: writing to {db_path}[/dim]")
 
     # Initialize the database
     db = PokemonDatabase(db_path)
 
-    # Process a single Pokémon if specified
-    if pokemon_name:
-        pokemon_name = pokemon_name.lower()
+    # Write an offline batch file instead of calling the API
+    if emit_batch:
+        pokemon_list = get_pokemon_list(shard_spec)
+
+        if pokemon_name:
+            pokemon_name = pokemon_name.lower()
+
+            if not check_pokemon_exists(pokemon_name):
+                return
+
+            pokemon_list = [pokemon_name]
+
+        # Skip Pokémon that already have nicknames unless forced
+        if not force:
+            pokemon_list = db.get_pokemon_without_nicknames(pokemon_list)
+
+        count = write_batch_requests(
+            pokemon_list,
+            emit_batch,
+            SpritePayloadCache(sprite_cache_path),
+            temperature=temperature,
+        )
+        console.print(
+            f"[bold green]Wrote {count} batch requests to {emit_batch}[/bold green]"
+        )
+        console.print(
+            "Use [bold]uv run main.py ingest-batch <results.jsonl>[/bold] to load the results."
+        )
+        return
+
+    # Requests go through one throttle, which owns concurrency and retries
+    throttle = create_throttle(concurrency, adaptive=adaptive, max_retries=max_retries)
+
+    # Build one generator and share its client for the whole run
+    try:
+        generator = NicknameGenerator(
+            ThrottledBackend(
+                create_backend(
+                    backend, temperature=temperature, base_url=base_url, max_retries=0
+                ),
+                throttle,
+            ),
+            sprite_cache=SpritePayloadCache(sprite_cache_path),
+            response_cache=None
+            if no_cache
+            else ResponseCache(response_cache_path(db_path)),
+            sample_index=sample,
+        )
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        return
+
+    # Time each stage of the run into the metrics table (see the stats command)
+    with record_run(
+        db,
+        "generate",
+        metrics_jsonl,
+        params={
+            "backend": backend,
+            "model": generator.backend.model,
+            "concurrency": concurrency,
+            "pack": pack,
+        },
+    ) as recorder, closing(PokeAPIClient(pokeapi_url)) as pokeapi_client:
+        # Process a single Pokémon if specified
+        if pokemon_name:
+            pokemon_name = pokemon_name.lower()
+
+            if not check_pokemon_exists(pokemon_name):
+                return
+
+            process_pokemon(pokemon_name, db, generator, show_image, force)
+            recorder.items = 1
+
+            # Fetch details as a separate stage if they are missing
+            hydrate_pokemon(
+                db.get_pokemon_without_details([pokemon_name]),
+                db,
+                fetcher=pokeapi_client.fetch_details,
+            )
+        else:
+            # Process all Pokémon (or a shard of them), journaling the run as a job
+            pokemon_list = get_pokemon_list(shard_spec)
 
-        # Check if the Pokémon exists
-        pokemon_list = get_pokemon_list()
-        if pokemon_name not in pokemon_list:
+            if resume is not None:
+                if db.get_job(resume) is None:
+                    console.print(
+                        f"[bold red]Error:[/bold red] Job {resume} not found."
+                    )
+                    console.print(
+                        "Use [bold]uv run main.py jobs[/bold] to see the jobs."
+                    )
+                    return
+                job_id = resume
+            else:
+                job_id = db.create_job(
+                    pokemon_list,
+                    force=force,
+                    params={
+                        "backend": backend,
+                        "temperature": temperature,
+                        "pack": pack,
+                        "sample": sample,
+                    },
+                )
+
+            # One query finds what is left, however large the job
+            pending = db.get_pending_job_items(job_id)
             console.print(
-                f"[bold red]Error:[/bold red] Pokémon '{pokemon_name}' not found."
+                f"[bold]Processing {len(pending)} Pokémon (job {job_id})...[/bold]"
+            )
+
+            try:
+                with Progress() as progress:
+                    task = progress.add_task("[green]Processing...", total=len(pending))
+
+                    asyncio.run(
+                        process_pokemon_batch(
+                            pending,
+                            db,
+                            generator,
+                            progress,
+                            task,
+                            job_id=job_id,
+                            concurrency=throttle.limiter.max_limit,
+                            requests_per_minute=requests_per_minute,
+                            pack=pack,
+                        )
+                    )
+            except KeyboardInterrupt:
+                console.print(
+                    f"[yellow]Interrupted. Use [bold]uv run main.py generate --resume {job_id}[/bold] to continue.[/yellow]"
+                )
+                raise typer.Exit(130)
+
+            status = db.finish_job(job_id)
+            recorder.items = len(pending)
+
+            if adaptive:
+                console.print(
+                    f"[dim]Adaptive concurrency ended at {int(throttle.limiter.limit)} "
+                    f"({throttle.budget.retries} retries).[/dim]"
+                )
+
+            # Fetch details for the Pokémon that do not have them yet
+            hydrate_pokemon(
+                db.get_pokemon_without_details(pokemon_list),
+                db,
+                fetcher=pokeapi_client.fetch_details,
             )
+
+            if status == "incomplete":
+                failed = db.get_job(job_id)["counts"].get("failed", 0)
+                console.print(
+                    f"[yellow]Job {job_id} is incomplete: {failed} Pokémon failed.[/yellow]"
+                )
+                console.print(
+                    f"Use [bold]uv run main.py generate --resume {job_id}[/bold] to retry them."
+                )
+            else:
+                console.print("[bold green]Done![/bold green]")
+
+
+@app.command()
+def jobs(
+    db_path: str = typer.Option(
+        "pokemon_nicknames.db", "--db", help="Path to the SQLite database file"
+    ),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Number of jobs to show"),
+):
+    """List recent generation jobs and the progress of their items."""
+    from datetime import datetime
+
+    # Initialize the database
+    db = PokemonDatabase(db_path)
+
+    job_list = db.get_jobs(limit)
+    if not job_list:
+        console.print("[yellow]No generation jobs found.[/yellow]")
+        return
+
+    # Create a table for the jobs
+    table = Table(title="Generation jobs")
+    table.add_column("ID", justify="right")
+    table.add_column("Status")
+    table.add_column("Started")
+    for status in ("done", "skipped", "pending", "running", "failed"):
+        table.add_column(status.capitalize(), justify="right")
+
+    for job in job_list:
+        started = datetime.fromtimestamp(job["created_at"]).strftime("%Y-%m-%d %H:%M")
+        table.add_row(
+            str(job["id"]),
+            job["status"],
+            started,
+            *(
+                str(job["counts"].get(status, 0))
+                for status in ("done", "skipped", "pending", "running", "failed")
+            ),
+        )
+
+    console.print(table)
+
+
+@app.command()
+def stats(
+    db_path: str = typer.Option(
+        "pokemon_nicknames.db", "--db", help="Path to the SQLite database file"
+    ),
+    run_id: Optional[int] = typer.Option(
+        None, "--run", "-r", help="Run to break down by stage (defaults to the latest)"
+    ),
+    limit: int = typer.Option(
+        10, "--limit", "-n", min=1, help="Number of runs to list"
+    ),
+):
+    """Show per-stage latency percentiles and throughput of recorded runs."""
+    from datetime import datetime
+
+    from metrics import estimate_cost, percentile
+
+    # Initialize the database
+    db = PokemonDatabase(db_path)
+
+    runs = db.get_runs(limit)
+    if not runs:
+        console.print("[yellow]No recorded runs found.[/yellow]")
+        console.print(
+            "Runs of [bold]generate[/bold] and [bold]hydrate[/bold] are recorded."
+        )
+        return
+
+    # Create a table for the runs
+    table = Table(title="Recent runs")
+    table.add_column("Run", justify="right")
+    table.add_column("Command")
+    table.add_column("Started")
+    table.add_column("Duration (s)", justify="right")
+    table.add_column("Items", justify="right")
+    table.add_column("Items/s", justify="right")
+    table.add_column("Tokens in/out", justify="right")
+    table.add_column("Est. cost", justify="right")
+    table.add_column("Retries", justify="right")
+
+    for run in runs:
+        duration = (run["finished_at"] or run["started_at"]) - run["started_at"]
+        throughput = run["items"] / duration if run["items"] and duration else None
+
+        cost = None
+        if run["params"].get("backend") == "openai":
+            cost = estimate_cost(
+                run["params"].get("model", ""),
+                run["prompt_tokens"],
+                run["completion_tokens"],
+            )
+
+        table.add_row(
+            str(run["id"]),
+            run["command"],
+            datetime.fromtimestamp(run["started_at"]).strftime("%Y-%m-%d %H:%M"),
+            f"{duration:.1f}" if run["finished_at"] else "-",
+            str(run["items"]) if run["items"] is not None else "-",
+            f"{throughput:.2f}" if throughput else "-",
+            f"{run['prompt_tokens']}/{run['completion_tokens']}",
+            f"${cost:.4f}" if cost is not None else "-",
+            str(run["retries"]),
+        )
+
+    console.print(table)
+
+    # Break the selected run down by stage
+    run_id = run_id if run_id is not None else runs[0]["id"]
+    stages = db.get_stage_durations([run_id])
+    if not stages:
+        console.print(f"[yellow]Run {run_id} has no recorded stages.[/yellow]")
+        return
+
+    table = Table(title=f"Stage latency for run {run_id} (ms)")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Count", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("p99", justify="right")
+    table.add_column("Total (s)", justify="right")
+
+    # Slowest stages first, by total time
+    by_total = sorted(stages.items(), key=lambda item: -sum(item[1]["seconds"]))
+    for stage, entry in by_total:
+        seconds = entry["seconds"]
+        table.add_row(
+            stage,
+            str(len(seconds)),
+            str(entry["errors"]),
+            *(f"{percentile(seconds, q) * 1000:.1f}" for q in (50, 95, 99)),
+            f"{sum(seconds):.2f}",
+        )
+
+    console.print(table)
+
+
+@app.command()
+def ingest_batch(
+    results_path: str = typer.Argument(..., help="Path to the batch results JSONL file"),
+    db_path: str = typer.Option(
+        "pokemon_nicknames.db", "--db", help="Path to the SQLite database file"
+    ),
+):
+    """Load nicknames from a batch results file into the database."""
+    from batch import ingest_batch_results
+
+    if not os.path.exists(results_path):
+        console.print(
+            f"[bold red]Error:[/bold red] Results file '{results_path}' not found."
+        )
+        return
+
+    # Initialize the database
+    db = PokemonDatabase(db_path)
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[bold green]Ingesting {task.description}...[/bold green]"),
+        transient=True,
+    ) as progress:
+        progress.add_task(results_path, total=None)
+
+        try:
+            loaded, errors = ingest_batch_results(results_path, db)
+        except Exception as e:
+            console.print(f"[bold red]Error ingesting results:[/bold red] {str(e)}")
+            return
+
+    for pokemon_name, error in errors:
+        console.print(f"[red]Error processing {pokemon_name}: {error}[/red]")
+
+    console.print(
+        f"[bold green]Loaded nicknames for {loaded} Pokémon from {results_path}[/bold green]"
+    )
+
+
+@app.command()
+def merge(
+    shard_paths: Optional[List[str]] = typer.Argument(
+        None, help="Shard database files (omit to merge every shard next to --db)"
+    ),
+    db_path: str = typer.Option(
+        "pokemon_nicknames.db",
+        "--db",
+        help="Path to the SQLite database file to merge into",
+    ),
+):
+    """Merge shard databases written by generate --shard into one database."""
+    if not shard_paths:
+        shard_paths = find_shard_dbs(db_path)
+        if not shard_paths:
             console.print(
-                "Use [bold]uv run main.py list-pokemon[/bold] to see available Pokémon."
+                f"[bold red]Error:[/bold red] No shard databases found next to '{db_path}'."
+            )
+            console.print(
+                "Use [bold]uv run main.py generate --shard i/N[/bold] to write them."
             )
             return
 
-        process_pokemon(pokemon_name, db, show_image, force, temperature)
+    for shard_path in shard_paths:
+        if not os.path.exists(shard_path):
+            console.print(
+                f"[bold red]Error:[/bold red] Shard database '{shard_path}' not found."
+            )
+            return
+        if os.path.abspath(shard_path) == os.path.abspath(db_path):
+            console.print(
+                f"[bold red]Error:[/bold red] Cannot merge '{db_path}' into itself."
+            )
+            return
+
+    # Initialize the database
+    db = PokemonDatabase(db_path)
+
+    table = Table(title=f"Merged into {db_path}")
+    table.add_column("Shard")
+    table.add_column("New Pokémon", justify="right")
+    table.add_column("Nicknames", justify="right")
+    table.add_column("Details", justify="right")
+
+    for shard_path in shard_paths:
+        # Opening the shard brings its schema up to date before it is attached
+        PokemonDatabase(shard_path).close()
+
+        try:
+            counts = db.merge_shard(shard_path)
+        except Exception as e:
+            console.print(f"[bold red]Error merging {shard_path}:[/bold red] {str(e)}")
+            return
+
+        table.add_row(
+            shard_path,
+            str(counts["pokemon"]),
+            str(counts["nicknames"]),
+            str(counts["details"]),
+        )
+
+    console.print(table)
+    console.print(
+        f"[bold green]Merged {len(shard_paths)} shard databases.[/bold green]"
+    )
+
+
+@app.command()
+def warm_cache(
+    cache_path: str = typer.Option(
+        DEFAULT_SPRITE_CACHE_PATH,
+        "--sprite-cache",
+        help="Path to the sprite payload cache file",
+    ),
+):
+    """Encode every sprite into the sprite payload cache."""
+    sprite_cache = SpritePayloadCache(cache_path)
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[bold green]Warming sprite cache...[/bold green]"),
+        transient=True,
+    ) as progress:
+        progress.add_task("warm", total=None)
+
+        try:
+            count = sprite_cache.warm()
+        except FileNotFoundError:
+            console.print("[bold red]Error:[/bold red] 'sprites' directory not found.")
+            return
+        finally:
+            sprite_cache.close()
+
+    console.print(
+        f"[bold green]Cached {count} sprite payloads in {cache_path}[/bold green]"
+    )
+
+
+@app.command()
+def import_pokeapi(
+    dump_path: str = typer.Argument(
+        ..., help="Path to a local PokéAPI JSON dump (api-data layout or JSONL files)"
+    ),
+    db_path: str = typer.Option(
+        "pokemon_nicknames.db", "--db", help="Path to the SQLite database file"
+    ),
+):
+    """Import a local PokéAPI dump so details resolve without network requests."""
+    from pokeapi import load_dump
+
+    if not os.path.isdir(dump_path):
+        console.print(
+            f"[bold red]Error:[/bold red] Dump directory '{dump_path}' not found."
+        )
+        return
+
+    # Initialize the database
+    db = PokemonDatabase(db_path)
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[bold green]Importing {task.description}...[/bold green]"),
+        transient=True,
+    ) as progress:
+        progress.add_task(dump_path, total=None)
+
+        try:
+            pokemon, species = load_dump(dump_path)
+            pokemon_count, species_count = db.import_pokeapi_snapshot(pokemon, species)
+        except Exception as e:
+            console.print(f"[bold red]Error importing dump:[/bold red] {str(e)}")
+            return
+
+    console.print(
+        f"[bold green]Imported {pokemon_count} Pokémon and {species_count} species from {dump_path}[/bold green]"
+    )
+    console.print(
+        "Use [bold]uv run main.py hydrate --offline[/bold] to fill in details from the snapshot."
+    )
+
+
+@app.command()
+def hydrate(
+    pokemon_name: Optional[str] = typer.Argument(
+        None, help="Name of the Pokémon to fetch details for (omit to fetch all)"
+    ),
+    db_path: str = typer.Option(
+        "pokemon_nicknames.db", "--db", help="Path to the SQLite database file"
+    ),
+    workers: int = typer.Option(
+        8, "--workers", "-w", min=1, help="Number of concurrent detail fetches"
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        "-f",
+        help="Fetch details again even if they already exist",
+    ),
+    offline: bool = typer.Option(
+        False,
+        "--offline",
+        help="Only use the local PokéAPI snapshot, without network requests",
+    ),
+    pokeapi_url: str = typer.Option(
+        DEFAULT_BASE_URL,
+        "--pokeapi-url",
+        help="Base URL of the PokéAPI server (e.g. a local mirror or stub)",
+    ),
+    adaptive: bool = typer.Option(
+        False,
+        "--adaptive",
+        help="Adapt the number of fetches in flight to the server's limits, starting from --workers",
+    ),
+    max_retries: int = typer.Option(
+        3,
+        "--max-retries",
+        min=0,
+        help="Maximum retries per fetch on rate limits and transient errors",
+    ),
+    metrics_jsonl: Optional[str] = typer.Option(
+        None,
+        "--metrics-jsonl",
+        help="Also append the run's stage timings to this JSON-lines file",
+    ),
+):
+    """Fetch Pokémon details from PokéAPI and store them in the database."""
+    from metrics import record_run
+    from pokeapi import PokeAPIClient
+    from throttle import create_throttle
+
+    # Initialize the database
+    db = PokemonDatabase(db_path)
+
+    pokemon_list = get_pokemon_list()
+
+    if pokemon_name:
+        pokemon_name = pokemon_name.lower()
+
+        if not check_pokemon_exists(pokemon_name):
+            return
+
+        pokemon_list = [pokemon_name]
+
+    # Skip Pokémon that already have details unless forced
+    if not force:
+        pokemon_list = db.get_pokemon_without_details(pokemon_list)
+
+    throttle = create_throttle(workers, adaptive=adaptive, max_retries=max_retries)
+
+    client = PokeAPIClient(pokeapi_url, pool_size=throttle.limiter.max_limit)
+    try:
+        with record_run(
+            db, "hydrate", metrics_jsonl, params={"workers": workers}
+        ) as recorder:
+            count = hydrate_pokemon(
+                pokemon_list,
+                db,
+                workers,
+                offline,
+                fetcher=client.fetch_details,
+                throttle=throttle,
+            )
+            recorder.items = count
+    finally:
+        client.close()
+
+    console.print(f"[bold green]Stored details for {count} Pokémon.[/bold green]")
+
+
+@app.command()
+def embed(
+    db_path: str = typer.Option(
+        "pokemon_nicknames.db", "--db", help="Path to the SQLite database file"
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        "-f",
+        help="Embed every sprite again even if its embedding is up to date",
+    ),
+):
+    """Compute sprite embeddings for every Pokémon and store them in the database."""
+    from embeddings import embed_catalog
+
+    catalog = get_sprite_catalog()
+
+    # Initialize the database
+    db = PokemonDatabase(db_path)
+
+    with Progress(transient=True) as progress:
+        task = progress.add_task("[green]Embedding sprites...", total=len(catalog))
+
+        count = embed_catalog(
+            db,
+            catalog,
+            force=force,
+            on_done=lambda name: progress.update(task, advance=1),
+        )
+
+    console.print(
+        f"[bold green]Embedded {count} sprites ({len(catalog) - count} already up to date).[/bold green]"
+    )
+
+    # Keep an existing nearest-neighbour index in step with the embeddings
+    index_dir = ann_index_path(db_path)
+    if os.path.exists(index_dir):
+        from ann_index import update_index
+
+        rebuilt, indexed = update_index(db, index_dir)
+        if indexed:
+            action = "Rebuilt" if rebuilt else "Updated"
+            console.print(
+                f"[green]{action} the similarity index ({indexed} vectors).[/green]"
+            )
+
+
+@app.command()
+def build_index(
+    db_path: str = typer.Option(
+        "pokemon_nicknames.db", "--db", help="Path to the SQLite database file"
+    ),
+    n_lists: Optional[int] = typer.Option(
+        None, "--lists", min=1, help="Number of IVF lists (defaults to 2 * sqrt(n))"
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        "-i",
+        help="Only add new or changed embeddings instead of rebuilding",
+    ),
+):
+    """Build the on-disk nearest-neighbour index used by similar --ann."""
+    from ann_index import update_index
+
+    # Initialize the database
+    db = PokemonDatabase(db_path)
+
+    index_dir = ann_index_path(db_path)
+    with console.status("[bold green]Building the similarity index..."):
+        rebuilt, count = update_index(
+            db, index_dir, n_lists=n_lists, rebuild=not incremental
+        )
+
+    if not rebuilt:
+        console.print(
+            f"[bold green]Added {count} vectors to the index in {index_dir}.[/bold green]"
+        )
+    elif count:
+        console.print(
+            f"[bold green]Indexed {count} vectors in {index_dir}.[/bold green]"
+        )
     else:
-        # Process all Pokémon
-        pokemon_list = get_pokemon_list()
-        console.print(f"[bold]Processing {len(pokemon_list)} Pokémon...[/bold]")
+        console.print("[yellow]No embeddings to index.[/yellow]")
+        console.print("Use [bold]uv run main.py embed[/bold] to embed the sprites.")
 
-        with Progress() as progress:
-            task = progress.add_task("[green]Processing...", total=len(pokemon_list))
 
-            for pokemon_name in pokemon_list:
-                progress.update(
-                    task,
-                    description=f"[green]Processing {pokemon_name.capitalize()}...",
-                )
+@app.command()
+def similar(
+    pokemon_name: str = typer.Argument(
+        ..., help="Name of the Pokémon to find similar sprites for"
+    ),
+    k: int = typer.Option(10, "--k", "-k", min=1, help="Number of results"),
+    db_path: str = typer.Option(
+        "pokemon_nicknames.db", "--db", help="Path to the SQLite database file"
+    ),
+    ann: bool = typer.Option(
+        False, "--ann", help="Search the on-disk index instead of every vector"
+    ),
+    nprobe: int = typer.Option(
+        8, "--nprobe", min=1, help="Index lists to scan with --ann"
+    ),
+):
+    """Find the Pokémon whose sprites look most similar to a Pokémon's sprite."""
+    # Initialize the database
+    db = PokemonDatabase(db_path)
 
-                # If force is True, process all Pokémon
-                # Otherwise, skip Pokémon that already have nicknames
-                if not force and db.get_nicknames(pokemon_name):
-                    progress.update(task, advance=1)
-                    continue
+    pokemon_name = pokemon_name.lower()
 
-                try:
-                    # If force is True and there are existing nicknames, remove them
-                    if force and db.get_nicknames(pokemon_name):
-                        db.remove_nicknames(pokemon_name)
+    if not check_pokemon_exists(pokemon_name):
+        return
 
-                    # Generate nicknames without showing images in batch mode
-                    nicknames = get_nicknames(pokemon_name)
-                    db.add_pokemon_with_nicknames(pokemon_name, nicknames)
-                    progress.update(task, advance=1)
-                except Exception as e:
-                    console.print(
-                        f"[red]Error processing {pokemon_name}: {str(e)}[/red]"
-                    )
-                    progress.update(task, advance=1)
+    from embeddings import MissingEmbeddingError
+
+    try:
+        if ann:
+            from ann_index import find_similar_ann
+
+            results = find_similar_ann(
+                db, ann_index_path(db_path), pokemon_name, k, nprobe=nprobe
+            )
+        else:
+            from embeddings import find_similar
+
+            results = find_similar(db, pokemon_name, k)
+    except FileNotFoundError:
+        console.print("[yellow]No similarity index found.[/yellow]")
+        console.print(
+            "Use [bold]uv run main.py build-index[/bold] to build the index."
+        )
+        return
+    except MissingEmbeddingError:
+        console.print(
+            f"[yellow]No embedding found for {pokemon_name.capitalize()}.[/yellow]"
+        )
+        console.print("Use [bold]uv run main.py embed[/bold] to embed the sprites.")
+        return
+    except ValueError as e:
+        # The index is from an older version or does not match its meta.json
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        console.print(
+            "Use [bold]uv run main.py build-index[/bold] to rebuild the index."
+        )
+        return
+
+    # Create a table for the results
+    table = Table(title=f"Sprites similar to {pokemon_name.capitalize()}")
+    table.add_column("#", justify="right")
+    table.add_column("Pokémon", style="cyan")
+    table.add_column("Similarity", justify="right")
+
+    for rank, (name, score) in enumerate(results, start=1):
+        table.add_row(str(rank), name.capitalize(), f"{score:.3f}")
+
+    console.print(table)
+
+
+@app.command()
+def search(
+    query: str = typer.Argument(..., help="Words to search for, e.g. 'spark'"),
+    fields: List[str] = typer.Option(
+        ["nicknames"],
+        "--field",
+        "-f",
+        help=f"Field to search; repeat for several ({', '.join(SEARCH_FIELDS)})",
+    ),
+    exact: bool = typer.Option(
+        False, "--exact", "-e", help="Match whole words only, not prefixes"
+    ),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Maximum number of results"),
+    db_path: str = typer.Option(
+        "pokemon_nicknames.db", "--db", help="Path to the SQLite database file"
+    ),
+):
+    """Find Pokémon by nickname, or by type, colour or habitat."""
+    # Initialize the database
+    db = PokemonDatabase(db_path)
+
+    try:
+        results = db.search_nicknames(query, fields, prefix=not exact, limit=limit)
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        return
+
+    if not results:
+        console.print(f"[yellow]No Pokémon found for '{query}'.[/yellow]")
+        return
 
-        console.print("[bold green]Done![/bold green]")
+    # Create a table for the results
+    table = Table(title=f"Search results for '{query}'")
+    table.add_column("Pokémon", style="cyan")
+    table.add_column("Nicknames")
+
+    for result in results:
+        table.add_row(result["pokemon"].capitalize(), ", ".join(result["nicknames"]))
+
+    console.print(table)
 
 
 @app.command()
@@ -320,22 +1372,12 @@ def view(
     ),
 ):
     """View nicknames for a specific Pokémon."""
-    load_environment()
-
     # Initialize the database
     db = PokemonDatabase(db_path)
 
     pokemon_name = pokemon_name.lower()
 
-    # Check if the Pokémon exists
-    pokemon_list = get_pokemon_list()
-    if pokemon_name not in pokemon_list:
-        console.print(
-            f"[bold red]Error:[/bold red] Pokémon '{pokemon_name}' not found."
-        )
-        console.print(
-            "Use [bold]uv run main.py list-pokemon[/bold] to see available Pokémon."
-        )
+    if not check_pokemon_exists(pokemon_name):
         return
 
     # Get nicknames
@@ -379,22 +1421,12 @@ def details(
     ),
 ):
     """View detailed information about a specific Pokémon."""
-    load_environment()
-
     # Initialize the database
     db = PokemonDatabase(db_path)
 
     pokemon_name = pokemon_name.lower()
 
-    # Check if the Pokémon exists
-    pokemon_list = get_pokemon_list()
-    if pokemon_name not in pokemon_list:
-        console.print(
-            f"[bold red]Error:[/bold red] Pokémon '{pokemon_name}' not found."
-        )
-        console.print(
-            "Use [bold]uv run main.py list-pokemon[/bold] to see available Pokémon."
-        )
+    if not check_pokemon_exists(pokemon_name):
         return
 
     # Get Pokémon details
@@ -405,7 +1437,7 @@ def details(
             f"[yellow]No details found for {pokemon_name.capitalize()}.[/yellow]"
         )
         console.print(
-            f"Use [bold]uv run main.py generate {pokemon_name}[/bold] to fetch Pokémon details."
+            f"Use [bold]uv run main.py hydrate {pokemon_name}[/bold] to fetch Pokémon details."
         )
         return
 
@@ -417,12 +1449,14 @@ def details(
 
     # Add basic information
     details_text.append(f"[bold]Pokédex ID:[/bold] {details['pokedex_id']}")
-    details_text.append(
-        f"[bold]Height:[/bold] {details['height'] / 10} m"
-    )  # Convert to meters
-    details_text.append(
-        f"[bold]Weight:[/bold] {details['weight'] / 10} kg"
-    )  # Convert to kg
+    if details["height"] is not None:
+        details_text.append(
+            f"[bold]Height:[/bold] {details['height'] / 10} m"
+        )  # Convert to meters
+    if details["weight"] is not None:
+        details_text.append(
+            f"[bold]Weight:[/bold] {details['weight'] / 10} kg"
+        )  # Convert to kg
 
     # Add types
     types_str = ", ".join([t.capitalize() for t in details["types"]])
@@ -484,10 +1518,67 @@ def details(
         display_pokemon_image(pokemon_name)
 
 
+def read_export_preview(path: str, fmt: str, rows: int = 5):
+    """
+    Read the first rows of an exported columnar file without loading all of it.
+
+    Args:
+        path: Path to the exported file
+        fmt: One of "parquet", "feather" or "arrow"
+        rows: Number of rows to read
+
+    Returns:
+        A DataFrame with at most `rows` rows
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if fmt == "parquet":
+        parquet_file = pq.ParquetFile(path)
+        batches = parquet_file.iter_batches(batch_size=rows)
+        schema = parquet_file.schema_arrow
+    elif fmt == "feather":
+        reader = pa.ipc.open_file(path)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        schema = reader.schema
+    else:
+        reader = pa.ipc.open_stream(path)
+        batches = iter(reader)
+        schema = reader.schema
+
+    batch = next(batches, None)
+    if batch is None:
+        return schema.empty_table().to_pandas()
+
+    return batch.slice(0, rows).to_pandas()
+
+
+def format_preview_cell(value: Any) -> str:
+    """
+    Format an exported value for the preview table.
+
+    Args:
+        value: A scalar or list value from an exported row
+
+    Returns:
+        The value as a string, with lists joined by commas
+    """
+    if isinstance(value, str):
+        return value
+    if hasattr(value, "__iter__"):
+        return ", ".join(str(item) for item in value)
+    if value is None or value != value:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
 @app.command()
 def export(
-    output_path: str = typer.Argument(
-        "pokemon_nicknames.csv", help="Path to the output CSV file"
+    output_path: Optional[str] = typer.Argument(
+        None,
+        help="Path to the output file (defaults to pokemon_nicknames.<format>)",
     ),
     db_path: str = typer.Option(
         "pokemon_nicknames.db", "--db", help="Path to the SQLite database file"
@@ -495,10 +1586,30 @@ def export(
     detailed: bool = typer.Option(
         False, "--detailed", "-d", help="Export detailed Pokémon information"
     ),
+    fmt: str = typer.Option(
+        "csv",
+        "--format",
+        "-f",
+        help=f"Output format ({', '.join(EXPORT_FORMATS)})",
+    ),
+    compression: Optional[str] = typer.Option(
+        None,
+        "--compression",
+        help="Compression codec for columnar formats, e.g. snappy, zstd, lz4 or none",
+    ),
+    chunk_size: int = typer.Option(
+        50_000, "--chunk-size", help="Rows read and written per chunk"
+    ),
 ):
-    """Export the database to a CSV file."""
-    # Initialize the database
-    db = PokemonDatabase(db_path)
+    """Export the database to a CSV, Parquet, Feather or Arrow file."""
+    if fmt not in EXPORT_FORMATS:
+        console.print(
+            f"[bold red]Error:[/bold red] Unknown format '{fmt}'. Choose from: {', '.join(EXPORT_FORMATS)}"
+        )
+        return
+
+    if output_path is None:
+        output_path = f"pokemon_nicknames.{fmt}"
 
     # Check if the database exists
     if not os.path.exists(db_path):
@@ -507,6 +1618,9 @@ def export(
         )
         return
 
+    # Initialize the database
+    db = PokemonDatabase(db_path)
+
     # Export the database
     with Progress(
         SpinnerColumn(),
@@ -518,7 +1632,11 @@ def export(
         progress.add_task(output_path, total=None)
 
         try:
-            if detailed:
+            if fmt != "csv":
+                rows_exported = db.export_columnar(
+                    output_path, fmt, detailed, compression, chunk_size
+                )
+            elif detailed:
                 rows_exported = db.export_detailed_csv(output_path)
             else:
                 rows_exported = db.export_to_csv(output_path)
@@ -536,28 +1654,33 @@ def export(
             f"[bold green]Successfully exported {rows_exported} Pokémon to {output_path}[/bold green]"
         )
 
-    # Show a preview of the CSV file
+    # Show a preview of the exported file
     try:
-        import csv
+        if fmt == "csv":
+            import csv
+
+            with open(output_path, "r", newline="") as csvfile:
+                reader = csv.reader(csvfile)
+                headers = next(reader)
+                preview = [row for _, row in zip(range(5), reader)]
+        else:
+            frame = read_export_preview(output_path, fmt)
+            headers = list(frame.columns)
+            preview = [
+                [format_preview_cell(value) for value in row]
+                for row in frame.itertuples(index=False)
+            ]
+
+        # Create a table for the preview
+        table = Table(title=f"{fmt.upper()} Preview (First 5 rows)")
+
+        for header in headers:
+            table.add_column(header.capitalize())
+
+        for row in preview:
+            table.add_row(*row)
 
-        with open(output_path, "r", newline="") as csvfile:
-            reader = csv.reader(csvfile)
-            headers = next(reader)
-
-            # Create a table for the preview
-            table = Table(title="CSV Preview (First 5 rows)")
-
-            for header in headers:
-                table.add_column(header.capitalize())
-
-            # Add the first 5 rows
-            for i, row in enumerate(reader):
-                if i >= 5:
-                    break
-
-                table.add_row(*row)
-
-            console.print(table)
+        console.print(table)
     except Exception as e:
         console.print(f"[yellow]Could not show preview: {str(e)}[/yellow]")
 
@@ -0,0 +1,273 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    from db import PokemonDatabase
+
+
+# Estimated USD prices per million prompt and completion tokens
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+# Columns of a metric event, in the order stored in the metrics table
+METRIC_FIELDS = [
+    "stage",
+    "started_at",
+    "seconds",
+    "pokemon",
+    "items",
+    "ok",
+    "prompt_tokens",
+    "completion_tokens",
+    "attempt",
+    "error",
+]
+
+
+def estimate_cost(
+    model: str, prompt_tokens: int, completion_tokens: int
+) -> Optional[float]:
+    """
+    Estimate the cost of a number of tokens.
+
+    Args:
+        model: The name of the chat model
+        prompt_tokens: Number of prompt tokens
+        completion_tokens: Number of completion tokens
+
+    Returns:
+        The estimated cost in USD, or None if the model's price is unknown
+    """
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Get a percentile of sorted values, using the nearest-rank method.
+
+    Args:
+        values: The values, sorted in ascending order
+        q: The percentile, between 0 and 100
+
+    Returns:
+        The value at the percentile
+    """
+    if not values:
+        return float("nan")
+
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(min(rank, len(values))) - 1]
+
+
+class MetricsRecorder:
+    """
+    Records per-stage timings of a run into the metrics table and/or a JSONL file.
+
+    Events are buffered in memory and written in batches, so recording costs a
+    list append on the hot path. A recorder without a database or JSONL path
+    records nothing; that is the default until a command installs one with
+    set_recorder().
+    """
+
+    def __init__(
+        self,
+        db: Optional["PokemonDatabase"] = None,
+        jsonl_path: Optional[str] = None,
+        command: str = "",
+        params: Optional[Dict[str, Any]] = None,
+        flush_every: int = 500,
+    ):
+        """
+        Initialize the recorder, starting a run if a database is given.
+
+        Args:
+            db: The database to write the metrics table of (None to skip it)
+            jsonl_path: Path of a JSONL file to append events to (None to skip it)
+            command: The name of the command being run
+            params: Options of the run, stored as JSON for reference
+            flush_every: Number of buffered events that triggers a write
+        """
+        self.db = db
+        self.jsonl_path = jsonl_path
+        self.command = command
+        self.flush_every = flush_every
+        self.enabled = db is not None or jsonl_path is not None
+
+        self._lock = threading.Lock()
+        self._buffer: List[tuple] = []
+
+        # Number of items the run processed, for throughput; set by the command
+        self.items: Optional[int] = None
+
+        self.run_id = db.start_run(command, params) if db is not None else None
+
+    def record(
+        self,
+        stage: str,
+        seconds: float,
+        started_at: Optional[float] = None,
+        pokemon: Optional[str] = None,
+        items: Optional[int] = None,
+        ok: bool = True,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        attempt: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Record one event.
+
+        Args:
+            stage: The stage, e.g. "request" or "write"
+            seconds: How long the stage took
+            started_at: When the stage started, as a Unix time (defaults to now - seconds)
+            pokemon: The Pokémon (or comma-separated Pokémon) the stage worked on
+            items: Number of items the stage handled, e.g. rows in a write
+            ok: Whether the stage succeeded
+            prompt_tokens: Prompt tokens used by a model call
+            completion_tokens: Completion tokens used by a model call
+            attempt: The attempt number of a retried call, starting at 0
+            error: The error type, if the stage failed
+        """
+        if not self.enabled:
+            return
+
+        if started_at is None:
+            started_at = time.time() - seconds
+
+        event = (
+            stage,
+            started_at,
+            seconds,
+            pokemon,
+            items,
+            int(ok),
+            prompt_tokens,
+            completion_tokens,
+            attempt,
+            error,
+        )
+
+        with self._lock:
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.flush_every
+
+        if full:
+            self.flush()
+
+    @contextmanager
+    def stage(self, name: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block of code as a stage.
+
+        The block can add fields (such as token counts) to the yielded
+        dictionary. If the block raises, the event is recorded as failed with
+        the error type.
+
+        Args:
+            name: The stage
+            **fields: Fields passed to record()
+
+        Yields:
+            The fields to record with the event
+        """
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as e:
+            fields.update(ok=False, error=type(e).__name__)
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, started_at, **fields)
+
+    def flush(self) -> None:
+        """
+        Write the buffered events to the sinks.
+        """
+        with self._lock:
+            events, self._buffer = self._buffer, []
+
+        if not events:
+            return
+
+        if self.db is not None:
+            self.db.add_metrics_many(self.run_id, events)
+
+        if self.jsonl_path:
+            with open(self.jsonl_path, "a") as f:
+                for event in events:
+                    record = {"run_id": self.run_id, "command": self.command}
+                    record.update(zip(METRIC_FIELDS, event))
+                    f.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        """
+        Flush the remaining events and finish the run.
+        """
+        self.flush()
+
+        if self.db is not None:
+            self.db.finish_run(self.run_id, self.items)
+
+
+_recorder = MetricsRecorder()
+
+
+def get_recorder() -> MetricsRecorder:
+    """
+    Get the process-wide recorder used by the instrumented stages.
+
+    Returns:
+        The current recorder (one that records nothing unless a command set one)
+    """
+    return _recorder
+
+
+def set_recorder(recorder: Optional[MetricsRecorder]) -> None:
+    """
+    Install the process-wide recorder.
+
+    Args:
+        recorder: The recorder (None to stop recording)
+    """
+    global _recorder
+    _recorder = recorder or MetricsRecorder()
+
+
+@contextmanager
+def record_run(
+    db: Optional["PokemonDatabase"],
+    command: str,
+    jsonl_path: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> Iterator[MetricsRecorder]:
+    """
+    Record the metrics of a command run with a process-wide recorder.
+
+    Args:
+        db: The database to write the metrics table of (None to skip it)
+        command: The name of the command
+        jsonl_path: Path of a JSONL file to append events to (None to skip it)
+        params: Options of the run, stored as JSON for reference
+
+    Yields:
+        The recorder; set its `items` to the number of items processed
+    """
+    recorder = MetricsRecorder(db, jsonl_path, command, params)
+    set_recorder(recorder)
+
+    try:
+        yield recorder
+    finally:
+        set_recorder(None)
+        recorder.close()
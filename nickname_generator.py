@@ -1,11 +1,39 @@
 import base64
 import io
-from typing import List
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
 from PIL import Image
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
 
+from cache import (
+    ResponseCache,
+    SpritePayload,
+    SpritePayloadCache,
+    get_default_sprite_cache,
+    sprite_path,
+)
+from metrics import get_recorder
+
+if TYPE_CHECKING:
+    from throttle import AdaptiveThrottle
+
+
+SYSTEM_PROMPT = """
+            Please provide a list of 5 words from the English dictionary for this sprite that reflect possible nicknames. 
+            Each word should be a single word and be appropriate for a nickname.
+            """
+
+
+PACKED_SYSTEM_PROMPT = """
+            Each image below is the sprite of the Pokémon named in the text just before it.
+            For every sprite, please provide a list of 5 words from the English dictionary that reflect possible nicknames.
+            Each word should be a single word and be appropriate for a nickname.
+            Return one entry per Pokémon, using the Pokémon name exactly as given.
+            """
+
 
 class Nicknames(BaseModel):
     """
@@ -17,6 +45,284 @@ class Nicknames(BaseModel):
     )
 
 
+class PokemonNicknames(BaseModel):
+    """
+    Pydantic model for the nicknames of one Pokémon in a packed request.
+    """
+
+    pokemon: str = Field(description="The name of the Pokémon exactly as given")
+    nicknames: List[str] = Field(
+        description="A list of words that reflect possible nicknames for the sprite",
+    )
+
+
+class PackedNicknames(BaseModel):
+    """
+    Pydantic model for structured output from a request carrying several sprites.
+    """
+
+    results: List[PokemonNicknames] = Field(
+        description="The nicknames for each Pokémon sprite in the request",
+    )
+
+
+def response_format(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Build a strict JSON-schema response format for a Pydantic model.
+
+    Args:
+        schema: The Pydantic model describing the expected output
+
+    Returns:
+        The `response_format` value for a chat completion request
+    """
+    json_schema = schema.model_json_schema()
+
+    # Strict mode requires every object, including nested ones, to be closed
+    for definition in [json_schema, *json_schema.get("$defs", {}).values()]:
+        definition["additionalProperties"] = False
+
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.__name__, "strict": True, "schema": json_schema},
+    }
+
+
+def build_chat_request(
+    data_url: str, model: str = "gpt-4o", temperature: float = 0.5
+) -> Dict[str, Any]:
+    """
+    Build a raw chat completion request body for an encoded sprite.
+
+    This mirrors the messages sent by NicknameGenerator, for use with offline
+    batch endpoints.
+
+    Args:
+        data_url: The encoded sprite
+        model: The name of the chat model
+        temperature: Sampling temperature
+
+    Returns:
+        The request body for the chat completions endpoint
+    """
+    return {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": [{"type": "image_url", "image_url": {"url": data_url}}],
+            },
+        ],
+        "response_format": response_format(Nicknames),
+    }
+
+
+class NicknameBackend(ABC):
+    """
+    Interface for the chat models that turn sprite messages into nicknames.
+    """
+
+    model: str
+    temperature: float
+
+    @abstractmethod
+    def invoke(
+        self, messages: List[BaseMessage], schema: Type[BaseModel] = Nicknames
+    ) -> BaseModel:
+        """
+        Send the messages to the model and return the structured output.
+
+        Args:
+            messages: The chat messages to send
+            schema: The Pydantic model describing the expected output
+
+        Returns:
+            The parsed response
+        """
+
+    @abstractmethod
+    async def ainvoke(
+        self, messages: List[BaseMessage], schema: Type[BaseModel] = Nicknames
+    ) -> BaseModel:
+        """
+        Asynchronously send the messages to the model and return the structured output.
+
+        Args:
+            messages: The chat messages to send
+            schema: The Pydantic model describing the expected output
+
+        Returns:
+            The parsed response
+        """
+
+
+class OpenAIBackend(NicknameBackend):
+    """
+    Backend that calls the OpenAI chat completions API through LangChain.
+
+    The client and the bound chains are built once, so HTTP connections are kept
+    alive and reused across calls. Each chain requests a strict JSON-schema
+    response and the reply is validated here, so the request and the parsing
+    are timed as separate stages along with the token usage.
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4o",
+        temperature: float = 0.5,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_retries: int = 2,
+    ):
+        """
+        Initialize the OpenAI backend.
+
+        Args:
+            model: The name of the chat model
+            temperature: Sampling temperature
+            base_url: Optional base URL of an OpenAI-compatible API
+            api_key: Optional API key (defaults to the OPENAI_API_KEY environment variable)
+            max_retries: Retries made by the OpenAI client itself (0 when a
+                ThrottledBackend handles retries)
+        """
+        self.model = model
+        self.temperature = temperature
+        self.client = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            base_url=base_url,
+            api_key=api_key,
+            max_retries=max_retries,
+        )
+        self.chains = {
+            schema: self.client.bind(response_format=response_format(schema))
+            for schema in (Nicknames, PackedNicknames)
+        }
+
+    @staticmethod
+    def _record_usage(message: BaseMessage, fields: Dict[str, Any]) -> None:
+        """
+        Add the token usage of a reply to the fields of its request stage.
+        """
+        usage = getattr(message, "usage_metadata", None) or {}
+        fields["prompt_tokens"] = usage.get("input_tokens")
+        fields["completion_tokens"] = usage.get("output_tokens")
+
+    def invoke(
+        self, messages: List[BaseMessage], schema: Type[BaseModel] = Nicknames
+    ) -> BaseModel:
+        with get_recorder().stage("request") as fields:
+            message = self.chains[schema].invoke(messages)
+            self._record_usage(message, fields)
+
+        with get_recorder().stage("parse"):
+            return schema.model_validate_json(message.content)
+
+    async def ainvoke(
+        self, messages: List[BaseMessage], schema: Type[BaseModel] = Nicknames
+    ) -> BaseModel:
+        with get_recorder().stage("request") as fields:
+            message = await self.chains[schema].ainvoke(messages)
+            self._record_usage(message, fields)
+
+        with get_recorder().stage("parse"):
+            return schema.model_validate_json(message.content)
+
+
+class LocalBackend(OpenAIBackend):
+    """
+    Backend for a local OpenAI-compatible server, such as a stub used for testing.
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4o",
+        temperature: float = 0.5,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_retries: int = 2,
+    ):
+        """
+        Initialize the local backend.
+
+        Args:
+            model: The name of the chat model
+            temperature: Sampling temperature
+            base_url: Base URL of the local server (defaults to http://localhost:8000/v1)
+            api_key: API key sent to the local server (defaults to a placeholder)
+            max_retries: Retries made by the OpenAI client itself
+        """
+        super().__init__(
+            model=model,
+            temperature=temperature,
+            base_url=base_url or "http://localhost:8000/v1",
+            api_key=api_key or "local",
+            max_retries=max_retries,
+        )
+
+
+class ThrottledBackend(NicknameBackend):
+    """
+    Wraps another backend so its calls go through an AdaptiveThrottle.
+
+    The throttle adapts the number of requests in flight to the provider's
+    limits and retries rate-limit and transient errors with backoff.
+    """
+
+    def __init__(self, backend: NicknameBackend, throttle: "AdaptiveThrottle"):
+        """
+        Initialize the throttled backend.
+
+        Args:
+            backend: The backend to wrap
+            throttle: The throttle shared by the run
+        """
+        self.backend = backend
+        self.throttle = throttle
+        self.model = backend.model
+        self.temperature = backend.temperature
+
+    def invoke(
+        self, messages: List[BaseMessage], schema: Type[BaseModel] = Nicknames
+    ) -> BaseModel:
+        return self.throttle.call(self.backend.invoke, messages, schema)
+
+    async def ainvoke(
+        self, messages: List[BaseMessage], schema: Type[BaseModel] = Nicknames
+    ) -> BaseModel:
+        return await self.throttle.acall(self.backend.ainvoke, messages, schema)
+
+
+# Registry of available backends, keyed by the name used on the command line
+BACKENDS: Dict[str, Type[NicknameBackend]] = {
+    "openai": OpenAIBackend,
+    "local": LocalBackend,
+}
+
+
+def create_backend(name: str = "openai", **kwargs) -> NicknameBackend:
+    """
+    Create a nickname backend by name.
+
+    Args:
+        name: The name of a registered backend
+        **kwargs: Keyword arguments passed to the backend constructor
+
+    Returns:
+        The backend instance
+    """
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown backend '{name}'. Available backends: {', '.join(BACKENDS)}"
+        )
+
+    return backend_class(**kwargs)
+
+
 def convert_image_to_base64(image: Image.Image) -> str:
     """
     Convert a PIL Image to a base64 encoded string.
@@ -35,6 +341,287 @@ def convert_image_to_base64(image: Image.Image) -> str:
     return base64.b64encode(img_bytes).decode("utf-8")
 
 
+class NicknameGenerator:
+    """
+    A long-lived engine for generating nicknames for Pokémon sprites.
+
+    Create one instance per run and reuse it for every Pokémon, so the backend's
+    client and connections are shared. Sprites are read through a payload cache,
+    so repeat runs skip image decoding and encoding entirely, and responses are
+    looked up in the response cache before calling the backend.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[NicknameBackend] = None,
+        sprite_cache: Optional[SpritePayloadCache] = None,
+        response_cache: Optional[ResponseCache] = None,
+        sample_index: int = 0,
+    ):
+        """
+        Initialize the generator.
+
+        Args:
+            backend: The backend used to call the model (defaults to OpenAIBackend)
+            sprite_cache: The sprite payload cache (defaults to the shared on-disk cache)
+            response_cache: The response cache (None to always call the backend)
+            sample_index: Index of the cached sample to use; change it to draw fresh nicknames
+        """
+        self.backend = backend or OpenAIBackend()
+        self.sprite_cache = sprite_cache or get_default_sprite_cache()
+        self.response_cache = response_cache
+        self.sample_index = sample_index
+
+    def load_sprite(self, pokemon_name: str) -> SpritePayload:
+        """
+        Load the encoded sprite for a Pokémon.
+
+        Args:
+            pokemon_name: The name of the Pokémon
+
+        Returns:
+            The sprite payload
+        """
+        try:
+            with get_recorder().stage("sprite", pokemon=pokemon_name):
+                return self.sprite_cache.get(sprite_path(pokemon_name))
+        except FileNotFoundError:
+            raise ValueError(f"No sprite found for Pokémon: {pokemon_name}")
+
+    def build_messages(self, pokemon_name: str) -> List[BaseMessage]:
+        """
+        Build the chat messages for a Pokémon sprite.
+
+        Args:
+            pokemon_name: The name of the Pokémon
+
+        Returns:
+            The messages to send to the backend
+        """
+        return self._messages_for(self.load_sprite(pokemon_name))
+
+    def _messages_for(self, payload: SpritePayload) -> List[BaseMessage]:
+        """
+        Build the chat messages for an encoded sprite.
+        """
+        return [
+            SystemMessage(SYSTEM_PROMPT),
+            HumanMessage(
+                [
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": payload.data_url},
+                    }
+                ]
+            ),
+        ]
+
+    def _packed_messages_for(
+        self, payloads: Dict[str, SpritePayload]
+    ) -> List[BaseMessage]:
+        """
+        Build the chat messages for several encoded sprites, each labelled with its name.
+        """
+        content = []
+        for pokemon_name, payload in payloads.items():
+            content.append({"type": "text", "text": f"Pokémon: {pokemon_name}"})
+            content.append({"type": "image_url", "image_url": {"url": payload.data_url}})
+
+        return [SystemMessage(PACKED_SYSTEM_PROMPT), HumanMessage(content)]
+
+    def _response_key(self, payload: SpritePayload) -> Optional[str]:
+        """
+        Build the response cache key for an encoded sprite, if caching is enabled.
+
+        Packed and single-sprite responses share the key of the single-sprite
+        prompt, so a sprite answered either way is not requested again when
+        the pack size changes.
+        """
+        if self.response_cache is None:
+            return None
+
+        return ResponseCache.make_key(
+            payload.sha256,
+            SYSTEM_PROMPT,
+            self.backend.model,
+            self.backend.temperature,
+            self.sample_index,
+        )
+
+    def generate(self, pokemon_name: str) -> List[str]:
+        """
+        Generate nicknames for a Pokémon.
+
+        Args:
+            pokemon_name: The name of the Pokémon
+
+        Returns:
+            A list of nicknames for the Pokémon
+        """
+        payload = self.load_sprite(pokemon_name)
+
+        key = self._response_key(payload)
+        if key:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self.backend.invoke(self._messages_for(payload))
+
+        if key:
+            self.response_cache.put(key, response.nicknames)
+
+        return response.nicknames
+
+    async def agenerate(self, pokemon_name: str) -> List[str]:
+        """
+        Asynchronously generate nicknames for a Pokémon.
+
+        Args:
+            pokemon_name: The name of the Pokémon
+
+        Returns:
+            A list of nicknames for the Pokémon
+        """
+        payload = self.load_sprite(pokemon_name)
+
+        key = self._response_key(payload)
+        if key:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = await self.backend.ainvoke(self._messages_for(payload))
+
+        if key:
+            self.response_cache.put(key, response.nicknames)
+
+        return response.nicknames
+
+    def _prepare_packed(
+        self, pokemon_names: List[str]
+    ) -> Tuple[Dict[str, List[str]], Dict[str, SpritePayload]]:
+        """
+        Load the sprites for a packed request and split them into cache hits and misses.
+        """
+        results = {}
+        misses = {}
+
+        for pokemon_name in pokemon_names:
+            payload = self.load_sprite(pokemon_name)
+
+            key = self._response_key(payload)
+            cached = self.response_cache.get(key) if key else None
+            if cached is not None:
+                results[pokemon_name] = cached
+            else:
+                misses[pokemon_name] = payload
+
+        return results, misses
+
+    def _collect_packed(
+        self, response: PackedNicknames, payloads: Dict[str, SpritePayload]
+    ) -> Dict[str, List[str]]:
+        """
+        Validate a packed response against the requested sprites and cache the results.
+
+        Entries for Pokémon that were not requested, duplicates and empty nickname
+        lists are ignored, so they are treated as missing.
+        """
+        requested = {name.lower(): name for name in payloads}
+        results = {}
+
+        for entry in response.results:
+            pokemon_name = requested.get(entry.pokemon.strip().lower())
+            if pokemon_name is None or pokemon_name in results or not entry.nicknames:
+                continue
+
+            results[pokemon_name] = entry.nicknames
+
+            key = self._response_key(payloads[pokemon_name])
+            if key:
+                self.response_cache.put(key, entry.nicknames)
+
+        return results
+
+    def generate_many(
+        self, pokemon_names: List[str], fallback: bool = True
+    ) -> Dict[str, List[str]]:
+        """
+        Generate nicknames for several Pokémon with a single request.
+
+        All sprites are sent as separate image parts of one message. Pokémon that
+        are missing from the response are retried with single-sprite requests.
+
+        Args:
+            pokemon_names: The names of the Pokémon
+            fallback: Whether to retry missing Pokémon with single-sprite requests
+
+        Returns:
+            A dictionary mapping each Pokémon name to its nicknames; without
+            fallback, missing Pokémon are left out
+        """
+        results, misses = self._prepare_packed(pokemon_names)
+
+        if len(misses) == 1:
+            pokemon_name = next(iter(misses))
+            results[pokemon_name] = self.generate(pokemon_name)
+        elif misses:
+            response = self.backend.invoke(
+                self._packed_messages_for(misses), PackedNicknames
+            )
+            results.update(self._collect_packed(response, misses))
+
+        if fallback:
+            for pokemon_name in pokemon_names:
+                if pokemon_name not in results:
+                    results[pokemon_name] = self.generate(pokemon_name)
+
+        return results
+
+    async def agenerate_many(
+        self, pokemon_names: List[str], fallback: bool = True
+    ) -> Dict[str, List[str]]:
+        """
+        Asynchronously generate nicknames for several Pokémon with a single request.
+
+        Args:
+            pokemon_names: The names of the Pokémon
+            fallback: Whether to retry missing Pokémon with single-sprite requests
+
+        Returns:
+            A dictionary mapping each Pokémon name to its nicknames; without
+            fallback, missing Pokémon are left out
+        """
+        results, misses = self._prepare_packed(pokemon_names)
+
+        if len(misses) == 1:
+            pokemon_name = next(iter(misses))
+            results[pokemon_name] = await self.agenerate(pokemon_name)
+        elif misses:
+            response = await self.backend.ainvoke(
+                self._packed_messages_for(misses), PackedNicknames
+            )
+            results.update(self._collect_packed(response, misses))
+
+        if fallback:
+            for pokemon_name in pokemon_names:
+                if pokemon_name not in results:
+                    results[pokemon_name] = await self.agenerate(pokemon_name)
+
+        return results
+
+
+@lru_cache(maxsize=None)
+def _default_generator(temperature: float) -> NicknameGenerator:
+    """
+    Get a shared OpenAI-backed generator for the given temperature.
+    """
+    return NicknameGenerator(
+        OpenAIBackend(temperature=temperature), response_cache=ResponseCache()
+    )
+
+
 def get_nicknames(
     pokemon_name: str, display_image: bool = False, temperature: float = 0.5
 ) -> List[str]:
@@ -44,41 +631,9 @@ def get_nicknames(
     Args:
         pokemon_name: The name of the Pokémon
         display_image: Whether to display the image (useful in notebooks)
+        temperature: Temperature for the nickname generator
 
     Returns:
         A list of nicknames for the Pokémon
     """
-    # Load the Pokémon image
-    try:
-        pokemon_image = Image.open(f"sprites/{pokemon_name}_combined.png")
-    except FileNotFoundError:
-        raise ValueError(f"No sprite found for Pokémon: {pokemon_name}")
-
-    # Convert the image to base64
-    pokemon_image_b64 = convert_image_to_base64(pokemon_image)
-
-    # Initialize the OpenAI model
-    model = ChatOpenAI(model="gpt-4o", temperature=temperature)
-
-    # Create the messages for the API call
-    messages = [
-        SystemMessage(
-            """
-            Please provide a list of 5 words from the English dictionary for this sprite that reflect possible nicknames. 
-            Each word should be a single word and be appropriate for a nickname.
-            """
-        ),
-        HumanMessage(
-            [
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{pokemon_image_b64}"},
-                }
-            ]
-        ),
-    ]
-
-    # Get the response from the API
-    response = model.with_structured_output(Nicknames).invoke(messages)
-
-    return response.nicknames
+    return _default_generator(temperature).generate(pokemon_name)
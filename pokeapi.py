@@ -0,0 +1,284 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from metrics import get_recorder
+
+
+DEFAULT_BASE_URL = "https://pokeapi.co/api/v2"
+
+
+# Sprite names that differ from the PokéAPI resource names
+API_NAME_ALIASES = {
+    "mr.mime": "mr-mime",
+    "nidoranf": "nidoran-f",
+    "nidoranm": "nidoran-m",
+}
+
+# Maximum number of moves stored per Pokémon
+MAX_MOVES = 20
+
+
+def api_name(pokemon_name: str) -> str:
+    """
+    Get the PokéAPI resource name for a Pokémon sprite name.
+
+    Args:
+        pokemon_name: The name of the Pokémon
+
+    Returns:
+        The name used by PokéAPI
+    """
+    pokemon_name = pokemon_name.lower()
+    return API_NAME_ALIASES.get(pokemon_name, pokemon_name)
+
+
+def extract_pokemon(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the stored fields from a PokéAPI pokemon resource.
+
+    Args:
+        document: The pokemon JSON document
+
+    Returns:
+        A dictionary with the Pokémon's name, ID, size, types, moves and species name
+    """
+    types = sorted(document.get("types", []), key=lambda t: t.get("slot", 0))
+
+    return {
+        "name": document["name"],
+        "pokedex_id": document.get("id"),
+        "height": document.get("height"),
+        "weight": document.get("weight"),
+        "types": ",".join(t["type"]["name"] for t in types),
+        "moves": [m["move"]["name"] for m in document.get("moves", [])[:MAX_MOVES]],
+        "species": (document.get("species") or {}).get("name", document["name"]),
+    }
+
+
+def extract_species(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the stored fields from a PokéAPI pokemon-species resource.
+
+    Args:
+        document: The pokemon-species JSON document
+
+    Returns:
+        A dictionary with the species name, color and habitat
+    """
+    return {
+        "name": document["name"],
+        "color": (document.get("color") or {}).get("name"),
+        "habitat": (document.get("habitat") or {}).get("name"),
+    }
+
+
+def iter_dump_resources(dump_path: str, resource: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the documents of one resource type from a local PokéAPI dump.
+
+    Two layouts are supported: the PokeAPI/api-data directory tree
+    (`<resource>/<id>/index.json`, optionally under `api/v2` or `data/api/v2`),
+    and a `<resource>.jsonl` file with one document per line.
+
+    Args:
+        dump_path: Path to the root of the dump
+        resource: The resource type, e.g. "pokemon" or "pokemon-species"
+
+    Yields:
+        The JSON documents of the resource
+    """
+    jsonl_path = os.path.join(dump_path, f"{resource}.jsonl")
+    if os.path.isfile(jsonl_path):
+        with open(jsonl_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    for prefix in ("", os.path.join("api", "v2"), os.path.join("data", "api", "v2")):
+        resource_dir = os.path.join(dump_path, prefix, resource)
+        if not os.path.isdir(resource_dir):
+            continue
+
+        for entry in os.scandir(resource_dir):
+            index_path = os.path.join(entry.path, "index.json")
+            if entry.is_dir() and os.path.isfile(index_path):
+                with open(index_path, "r", encoding="utf-8") as f:
+                    yield json.load(f)
+        return
+
+
+def load_dump(
+    dump_path: str,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Load and extract the pokemon and species resources of a local PokéAPI dump.
+
+    Args:
+        dump_path: Path to the root of the dump
+
+    Returns:
+        The extracted pokemon records and species records
+    """
+    pokemon = [extract_pokemon(doc) for doc in iter_dump_resources(dump_path, "pokemon")]
+    species = [
+        extract_species(doc)
+        for doc in iter_dump_resources(dump_path, "pokemon-species")
+    ]
+    return pokemon, species
+
+
+def combine_details(
+    pokemon: Dict[str, Any], species: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Combine extracted pokemon and species records into the stored details format.
+
+    Args:
+        pokemon: A record from extract_pokemon
+        species: A record from extract_species, if available
+
+    Returns:
+        A dictionary containing Pokémon details
+    """
+    return {
+        "pokedex_id": pokemon["pokedex_id"],
+        "height": pokemon["height"],
+        "weight": pokemon["weight"],
+        "types": pokemon["types"],
+        "moves": pokemon["moves"],
+        "color": species["color"] if species else None,
+        "habitat": species["habitat"] if species else None,
+    }
+
+
+class PokeAPIClient:
+    """
+    A thin PokéAPI client that fetches exactly the documents we store.
+
+    Each Pokémon costs two GET requests (pokemon and pokemon-species) over a
+    pooled, keep-alive HTTP session.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        pool_size: int = 16,
+        timeout: float = 10.0,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Base URL of the API, e.g. a local stub server for tests
+            pool_size: Maximum number of pooled connections
+            timeout: Timeout for each request in seconds
+        """
+        # Imported here so that reading snapshots and constants stays cheap
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, resource: str, name: str) -> Dict[str, Any]:
+        """
+        Fetch one resource document.
+
+        Args:
+            resource: The resource type, e.g. "pokemon"
+            name: The resource name or ID
+
+        Returns:
+            The JSON document
+        """
+        response = self.session.get(
+            f"{self.base_url}/{resource}/{name}/", timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_details(self, pokemon_name: str) -> Dict[str, Any]:
+        """
+        Fetch the details of a Pokémon.
+
+        Args:
+            pokemon_name: The name of the Pokémon
+
+        Returns:
+            A dictionary containing Pokémon details
+        """
+        with get_recorder().stage("fetch", pokemon=pokemon_name):
+            pokemon = extract_pokemon(self.get("pokemon", api_name(pokemon_name)))
+            species = extract_species(self.get("pokemon-species", pokemon["species"]))
+            return combine_details(pokemon, species)
+
+    def close(self) -> None:
+        """
+        Close the HTTP session.
+        """
+        self.session.close()
+
+
+_default_client: Optional[PokeAPIClient] = None
+
+
+def fetch_pokemon_details(pokemon_name: str) -> Dict[str, Any]:
+    """
+    Fetch Pokémon details from PokéAPI with the shared default client.
+
+    Args:
+        pokemon_name: The name of the Pokémon
+
+    Returns:
+        A dictionary containing Pokémon details
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = PokeAPIClient()
+    return _default_client.fetch_details(pokemon_name)
+
+
+def fetch_many(
+    pokemon_names: Iterable[str],
+    workers: int = 8,
+    fetcher: Callable[[str], Dict[str, Any]] = fetch_pokemon_details,
+    on_done: Optional[Callable[[str], None]] = None,
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """
+    Fetch details for many Pokémon concurrently with a pool of worker threads.
+
+    Args:
+        pokemon_names: The names of the Pokémon
+        workers: Number of concurrent fetches
+        fetcher: The function that fetches the details of one Pokémon
+        on_done: Optional callback called with each name once its fetch finishes
+
+    Returns:
+        A dictionary of details keyed by Pokémon name, and a dictionary of error
+        messages for the Pokémon that could not be fetched
+    """
+    details = {}
+    errors = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetcher, name): name for name in pokemon_names}
+
+        for future in as_completed(futures):
+            pokemon_name = futures[future]
+            try:
+                details[pokemon_name] = future.result()
+            except Exception as e:
+                errors[pokemon_name] = str(e) or type(e).__name__
+
+            if on_done:
+                on_done(pokemon_name)
+
+    return details, errors
@@ -0,0 +1,109 @@
+import glob
+import hashlib
+import os
+import re
+from typing import List, Tuple
+
+from cache import DEFAULT_DB_PATH
+
+
+SHARD_PATTERN = re.compile(r"^(\d+)/(\d+)$")
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parse a shard specification such as "2/4".
+
+    Args:
+        spec: The shard number and shard count, separated by a slash; shards
+            are numbered from 1
+
+    Returns:
+        The shard number and the shard count
+
+    Raises:
+        ValueError: If the specification is malformed or out of range
+    """
+    match = SHARD_PATTERN.match(spec.strip())
+    if not match:
+        raise ValueError(f"Invalid shard '{spec}': expected i/N, e.g. 1/4")
+
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}': i must be between 1 and {count}")
+
+    return index, count
+
+
+def shard_of(pokemon_name: str, count: int) -> int:
+    """
+    Get the shard a Pokémon belongs to.
+
+    The shard is derived from a hash of the name, so every worker and host
+    computes the same partition without coordinating, and shards stay balanced
+    as the catalog grows.
+
+    Args:
+        pokemon_name: The name of the Pokémon
+        count: The number of shards
+
+    Returns:
+        The shard number, from 1 to count
+    """
+    digest = hashlib.blake2b(pokemon_name.lower().encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def select_shard(pokemon_names: List[str], index: int, count: int) -> List[str]:
+    """
+    Get the Pokémon of one shard.
+
+    Args:
+        pokemon_names: The names of all Pokémon
+        index: The shard number, from 1
+        count: The number of shards
+
+    Returns:
+        The names in the shard, in their original order
+    """
+    return [name for name in pokemon_names if shard_of(name, count) == index]
+
+
+def shard_db_path(db_path: str, index: int, count: int) -> str:
+    """
+    Get the path of a shard database that sits next to a database file.
+
+    Args:
+        db_path: Path to the SQLite database file the shards are merged into
+        index: The shard number, from 1
+        count: The number of shards
+
+    Returns:
+        The path of the shard database, e.g. pokemon_nicknames.shard-1-of-4.db
+    """
+    stem, ext = os.path.splitext(db_path)
+    return f"{stem}.shard-{index}-of-{count}{ext or '.db'}"
+
+
+def find_shard_dbs(db_path: str = DEFAULT_DB_PATH) -> List[str]:
+    """
+    Find the shard databases that sit next to a database file.
+
+    Args:
+        db_path: Path to the SQLite database file the shards are merged into
+
+    Returns:
+        The paths of the shard databases, ordered by shard count and number
+    """
+    stem, ext = os.path.splitext(db_path)
+    suffix = ext or ".db"
+    prefix = re.escape(stem)
+    pattern = re.compile(rf"{prefix}\.shard-(\d+)-of-(\d+){re.escape(suffix)}$")
+
+    paths = []
+    for path in glob.glob(f"{glob.escape(stem)}.shard-*-of-*{suffix}"):
+        match = pattern.match(path)
+        if match:
+            paths.append((int(match.group(2)), int(match.group(1)), path))
+
+    return [path for _, _, path in sorted(paths)]
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from ann_index import IVFIndex, find_similar_ann
+from db import PokemonDatabase
+from embeddings import EMBEDDING_MODEL, MissingEmbeddingError
+
+
+def unit_vectors(count: int, dim: int = 8, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(
+        np.float32
+    )
+
+
+class IVFIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index_dir = self.tmp.name
+
+        self.names = [f"pokemon-{i}" for i in range(50)]
+        self.vectors = unit_vectors(50)
+        self.index = IVFIndex.build(
+            self.index_dir, self.names, ["a" * 64] * 50, self.vectors, n_lists=4
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_add_replaces_and_removes(self):
+        self.index.add(
+            ["pokemon-1"], ["b" * 64], unit_vectors(1, seed=1), removed=["pokemon-2"]
+        )
+        index = IVFIndex(self.index_dir)
+
+        self.assertEqual(len(index), 49)
+        hashes = index.entry_hashes()
+        self.assertEqual(hashes["pokemon-1"], "b" * 64)
+        self.assertNotIn("pokemon-2", hashes)
+        self.assertEqual(index.pending(), 2)
+
+        names = [name for name, _ in index.search(self.vectors[2], k=50, nprobe=4)]
+        self.assertNotIn("pokemon-2", names)
+
+        # A later add keeps the removal
+        index.add(["pokemon-3"], ["c" * 64], unit_vectors(1, seed=3))
+        self.assertNotIn("pokemon-2", IVFIndex(self.index_dir).entry_hashes())
+
+    def test_add_replaces_generation_files(self):
+        before = set(os.listdir(self.index_dir))
+        self.index.add(["pokemon-1"], ["b" * 64], unit_vectors(1, seed=1))
+        after = set(os.listdir(self.index_dir))
+
+        # The main segment is kept and only the delta files are new
+        main = {f for f in before if f.split(".")[0] in ("vectors", "ids", "hashes")}
+        self.assertTrue(main <= after)
+        self.assertEqual(len(after), len(before))
+        self.assertEqual(len(after - before), 4)
+
+    def test_arrays_not_matching_meta_are_rejected(self):
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        with open(meta_path) as f:
+            meta = json.load(f)
+        meta["delta_size"] = 3
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+
+        with self.assertRaises(ValueError):
+            IVFIndex(self.index_dir)
+
+    def test_find_similar_errors(self):
+        with PokemonDatabase(":memory:") as db:
+            db.add_embeddings_many(
+                EMBEDDING_MODEL,
+                [("pokemon-0", "a" * 64, 8, self.vectors[0].tobytes())],
+            )
+
+            results = find_similar_ann(db, self.index_dir, "pokemon-0", k=3, nprobe=4)
+            self.assertEqual(len(results), 3)
+
+            with self.assertRaises(MissingEmbeddingError):
+                find_similar_ann(db, self.index_dir, "missingno")
+
+            # A stale index is an index error, not a missing embedding
+            meta_path = os.path.join(self.index_dir, "meta.json")
+            with open(meta_path) as f:
+                meta = json.load(f)
+            meta["version"] = 1
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+
+            with self.assertRaises(ValueError) as raised:
+                find_similar_ann(db, self.index_dir, "pokemon-0")
+            self.assertNotIsInstance(raised.exception, MissingEmbeddingError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import unittest
+
+from batch import ingest_batch_results, parse_batch_result
+from db import PokemonDatabase
+
+
+def result_line(custom_id, content=None, status_code=200, refusal=None, error=None):
+    """
+    Build one line of a batch results file in the Batch API output format.
+    """
+    message = {"role": "assistant", "content": content, "refusal": refusal}
+    result = {
+        "id": "batch_req_1",
+        "custom_id": custom_id,
+        "response": {
+            "status_code": status_code,
+            "body": {"choices": [{"index": 0, "message": message}]},
+        },
+        "error": error,
+    }
+    return json.dumps(result)
+
+
+NICKNAMES = json.dumps({"nicknames": ["Sparky", "Volt", "Zappy", "Bolt", "Pika"]})
+
+
+class ParseBatchResultTest(unittest.TestCase):
+    def test_success(self):
+        self.assertEqual(
+            parse_batch_result(result_line("pikachu", NICKNAMES)),
+            ("pikachu", ["Sparky", "Volt", "Zappy", "Bolt", "Pika"], None),
+        )
+
+    def test_refusal(self):
+        name, nicknames, error = parse_batch_result(
+            result_line("pikachu", refusal="I can't help with that")
+        )
+        self.assertEqual((name, nicknames), ("pikachu", None))
+        self.assertIn("Refused", error)
+
+    def test_http_error(self):
+        self.assertEqual(
+            parse_batch_result(result_line("pikachu", status_code=500)),
+            ("pikachu", None, "HTTP status 500"),
+        )
+
+    def test_error_object_and_string(self):
+        error = {"code": "server_error", "message": "Upstream failed"}
+        self.assertEqual(
+            parse_batch_result(result_line("pikachu", error=error)),
+            ("pikachu", None, "Upstream failed"),
+        )
+        self.assertEqual(
+            parse_batch_result(json.dumps({"custom_id": "pikachu", "error": "boom"})),
+            ("pikachu", None, "boom"),
+        )
+
+    def test_missing_custom_id(self):
+        for custom_id in (None, "", "  "):
+            self.assertEqual(
+                parse_batch_result(result_line(custom_id, NICKNAMES)),
+                ("", None, "Missing custom_id"),
+            )
+
+
+class IngestBatchResultsTest(unittest.TestCase):
+    def test_ingest_fabricated_results(self):
+        lines = [
+            result_line("pikachu", NICKNAMES),
+            result_line("bulbasaur", refusal="No"),
+            result_line("charmander", status_code=429),
+            json.dumps({"custom_id": "squirtle", "error": "boom"}),
+            result_line("", NICKNAMES),
+            "{not json",
+            "",
+            result_line("eevee", NICKNAMES),
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+            with PokemonDatabase(":memory:") as db:
+                loaded, errors = ingest_batch_results(path, db, chunk_size=1)
+
+                self.assertEqual(loaded, 2)
+                self.assertEqual(db.get_all_pokemon(), ["eevee", "pikachu"])
+                self.assertEqual(db.get_nicknames("eevee")[0], "Sparky")
+
+        self.assertEqual(
+            errors,
+            [
+                ("bulbasaur", "Refused: No"),
+                ("charmander", "HTTP status 429"),
+                ("squirtle", "boom"),
+                ("", "Line 5: Missing custom_id"),
+                ("", "Line 6: invalid JSON"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
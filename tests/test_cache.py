@@ -0,0 +1,163 @@
+import hashlib
+import io
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+import cache
+from cache import ResponseCache, SpritePayloadCache
+
+
+def png_bytes(color: str = "red") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class SpritePayloadCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, "cache", "sprites.db")
+        self.sprite = os.path.join(self.tmp.name, "pikachu_combined.png")
+        self.write_sprite(png_bytes(), 1)
+        self.cache = SpritePayloadCache(self.cache_path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def write_sprite(self, image_bytes: bytes, seconds: int) -> None:
+        with open(self.sprite, "wb") as f:
+            f.write(image_bytes)
+        # Set the mtime explicitly; the clock may be too coarse to tick
+        os.utime(self.sprite, ns=(seconds * 10**9, seconds * 10**9))
+
+    def test_encodes_png(self):
+        payload = self.cache.get(self.sprite)
+
+        self.assertEqual(payload.sha256, hashlib.sha256(png_bytes()).hexdigest())
+        self.assertTrue(payload.data_url.startswith("data:image/png;base64,"))
+
+    def test_hits_memo_and_disk(self):
+        payload = self.cache.get(self.sprite)
+
+        with mock.patch("builtins.open", side_effect=AssertionError):
+            self.assertEqual(self.cache.get(self.sprite), payload)
+
+            # A new instance reads the entry back from the cache file
+            other = SpritePayloadCache(self.cache_path)
+            try:
+                self.assertEqual(other.get(self.sprite), payload)
+            finally:
+                other.close()
+
+    def test_touched_file_with_same_content_is_not_reencoded(self):
+        payload = self.cache.get(self.sprite)
+        self.write_sprite(png_bytes(), 2)
+
+        with mock.patch.object(cache, "encode_sprite", side_effect=AssertionError):
+            self.assertEqual(self.cache.get(self.sprite), payload)
+
+    def test_changed_file_is_reencoded(self):
+        payload = self.cache.get(self.sprite)
+        self.write_sprite(png_bytes("blue"), 2)
+
+        changed = self.cache.get(self.sprite)
+
+        self.assertNotEqual(changed.sha256, payload.sha256)
+        self.assertNotEqual(changed.data_url, payload.data_url)
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get(os.path.join(self.tmp.name, "missing_combined.png"))
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, "responses.db")
+        self.now = time.time()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def response_cache(self, **kwargs) -> ResponseCache:
+        response_cache = ResponseCache(self.cache_path, **kwargs)
+        self.addCleanup(response_cache.close)
+        return response_cache
+
+    def clock(self):
+        return mock.patch.object(cache.time, "time", side_effect=lambda: self.now)
+
+    def test_make_key_covers_every_input(self):
+        args = ["sha", "prompt", "model", 0.7, 0]
+        key = ResponseCache.make_key(*args)
+
+        self.assertEqual(ResponseCache.make_key(*args), key)
+        for i, changed in enumerate(["sha2", "prompt2", "model2", 0.8, 1]):
+            with self.subTest(position=i):
+                other = args[:i] + [changed] + args[i + 1 :]
+                self.assertNotEqual(ResponseCache.make_key(*other), key)
+
+    def test_round_trip(self):
+        response_cache = self.response_cache()
+
+        self.assertIsNone(response_cache.get("key"))
+        response_cache.put("key", ["Sparky", "Zappy"])
+        self.assertEqual(response_cache.get("key"), ["Sparky", "Zappy"])
+
+        # Entries survive reopening the cache file
+        self.assertEqual(self.response_cache().get("key"), ["Sparky", "Zappy"])
+
+    def test_expired_entries_are_dropped(self):
+        response_cache = self.response_cache(max_age=60)
+
+        with self.clock():
+            response_cache.put("old", ["Old"])
+            self.now += 30
+            response_cache.put("new", ["New"])
+
+            self.now += 31
+            self.assertIsNone(response_cache.get("old"))
+            self.assertEqual(response_cache.get("new"), ["New"])
+
+            # Using an entry does not extend its lifetime
+            self.now += 30
+            self.assertEqual(response_cache.evict(), 1)
+            self.assertIsNone(response_cache.get("new"))
+
+    def test_least_recently_used_are_evicted(self):
+        response_cache = self.response_cache(max_entries=2)
+
+        with self.clock():
+            for key in ("a", "b", "c"):
+                response_cache.put(key, [key])
+                self.now += 1
+            response_cache.get("a")
+
+            self.assertEqual(response_cache.evict(), 1)
+
+        self.assertIsNone(response_cache.get("b"))
+        self.assertEqual(response_cache.get("a"), ["a"])
+        self.assertEqual(response_cache.get("c"), ["c"])
+
+    def test_eviction_runs_every_few_writes(self):
+        response_cache = self.response_cache(max_entries=10)
+
+        with self.clock():
+            for i in range(ResponseCache.EVICT_EVERY):
+                response_cache.put(f"key-{i}", [])
+                self.now += 1
+
+        conn = response_cache._conn
+        count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        self.assertEqual(count, 10)
+        self.assertEqual(response_cache.get(f"key-{ResponseCache.EVICT_EVERY - 1}"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
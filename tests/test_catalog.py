@@ -0,0 +1,104 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from catalog import SpriteCatalog
+
+
+def png_bytes(width: int, height: int, color: str = "red") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class SpriteCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sprites_dir = os.path.join(self.tmp.name, "sprites")
+        self.index_path = os.path.join(self.tmp.name, "catalog.json")
+        os.makedirs(self.sprites_dir)
+
+        self.write_sprite("pikachu", png_bytes(8, 4))
+        self.write_sprite("bulbasaur", png_bytes(6, 3))
+        with open(os.path.join(self.sprites_dir, "notes.txt"), "w") as f:
+            f.write("not a sprite")
+        self.touch_dir(1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_sprite(self, name: str, image_bytes: bytes) -> None:
+        with open(os.path.join(self.sprites_dir, f"{name}_combined.png"), "wb") as f:
+            f.write(image_bytes)
+
+    def touch_dir(self, seconds: int) -> None:
+        # Set the directory mtime explicitly; the clock may be too coarse to tick
+        os.utime(self.sprites_dir, ns=(seconds * 10**9, seconds * 10**9))
+
+    def catalog(self) -> SpriteCatalog:
+        return SpriteCatalog(self.sprites_dir, self.index_path)
+
+    def test_scan(self):
+        catalog = self.catalog()
+
+        self.assertEqual(catalog.names(), ["bulbasaur", "pikachu"])
+        self.assertIn("pikachu", catalog)
+        self.assertNotIn("notes", catalog)
+        entry = catalog.get("pikachu")
+        self.assertEqual((entry.width, entry.height), (8, 4))
+        self.assertEqual(len(entry.sha256), 64)
+
+    def test_unchanged_directory_reuses_index(self):
+        self.catalog()
+
+        with mock.patch.object(SpriteCatalog, "_scan", side_effect=AssertionError):
+            catalog = self.catalog()
+            self.assertFalse(catalog.refresh())
+
+        self.assertEqual(catalog.names(), ["bulbasaur", "pikachu"])
+
+    def test_changed_directory_is_rescanned(self):
+        catalog = self.catalog()
+        pikachu = catalog.get("pikachu")
+
+        self.write_sprite("charmander", png_bytes(4, 4))
+        os.remove(os.path.join(self.sprites_dir, "bulbasaur_combined.png"))
+        self.touch_dir(2)
+
+        self.assertTrue(catalog.refresh())
+        self.assertEqual(catalog.names(), ["charmander", "pikachu"])
+        self.assertIs(catalog.get("pikachu"), pikachu)
+
+        # A new instance picks the changes up from the saved index
+        self.assertEqual(self.catalog().names(), ["charmander", "pikachu"])
+
+    def test_force_refresh_sees_edits_in_place(self):
+        catalog = self.catalog()
+        before = catalog.get("pikachu").sha256
+
+        path = os.path.join(self.sprites_dir, "pikachu_combined.png")
+        self.write_sprite("pikachu", png_bytes(8, 4, "blue"))
+        os.utime(path, ns=(5 * 10**9, 5 * 10**9))
+        self.touch_dir(1)
+
+        self.assertFalse(catalog.refresh())
+        self.assertEqual(catalog.get("pikachu").sha256, before)
+
+        self.assertTrue(catalog.refresh(force=True))
+        self.assertNotEqual(catalog.get("pikachu").sha256, before)
+
+    def test_index_for_another_directory_is_ignored(self):
+        self.catalog()
+
+        other_dir = os.path.join(self.tmp.name, "other")
+        os.makedirs(other_dir)
+
+        self.assertEqual(len(SpriteCatalog(other_dir, self.index_path)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
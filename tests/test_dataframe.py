@@ -0,0 +1,50 @@
+import unittest
+
+import pandas as pd
+
+from db import PokemonDatabase
+
+
+class ToDataFrameTest(unittest.TestCase):
+    def setUp(self):
+        self.db = PokemonDatabase(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_empty_database(self):
+        frame = self.db.to_dataframe()
+
+        self.assertEqual(len(frame), 0)
+        for column in ("types", "moves", "nicknames"):
+            self.assertEqual(frame[column].dtype, object)
+        self.assertEqual(str(frame["height"].dtype), "Int64")
+
+    def test_pokemon_without_details(self):
+        self.db.add_pokemon_with_nicknames("pikachu", ["Sparky", "Bolt"])
+
+        frame = self.db.to_dataframe()
+
+        self.assertEqual(frame["pokemon"].tolist(), ["pikachu"])
+        self.assertEqual(frame["nicknames"].tolist(), [["Sparky", "Bolt"]])
+        self.assertEqual(frame["types"].tolist(), [[]])
+        self.assertEqual(frame["moves"].tolist(), [[]])
+        self.assertTrue(pd.isna(frame["height"].iloc[0]))
+
+    def test_columns_and_batches(self):
+        for i in range(5):
+            self.db.add_pokemon_with_nicknames(f"pokemon-{i}", [f"Nick{i}"])
+
+        frame = self.db.to_dataframe(columns=["pokemon", "nicknames"])
+        self.assertEqual(frame.columns.tolist(), ["pokemon", "nicknames"])
+
+        batches = list(self.db.iter_batches(2, columns=["pokemon", "nicknames"]))
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(
+            pd.concat(batches, ignore_index=True)["pokemon"].tolist(),
+            frame["pokemon"].tolist(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
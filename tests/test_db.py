@@ -0,0 +1,221 @@
+import csv
+import os
+import tempfile
+import threading
+import unittest
+
+from db import MIGRATIONS, GroupCommitWriter, PokemonDatabase
+
+
+class MemoryDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.db = PokemonDatabase(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def write_concurrently(self, writers: int = 4, per_writer: int = 200) -> list:
+        errors = []
+
+        def write(writer: int) -> None:
+            try:
+                for i in range(per_writer):
+                    self.db.add_pokemon_with_nicknames(
+                        f"pokemon-{writer}-{i}", [f"Spark{writer}x{i}", "Bolt"]
+                    )
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return errors
+
+    def test_concurrent_writers(self):
+        errors = self.write_concurrently()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.db.get_all_pokemon()), 800)
+        self.assertEqual(self.db.get_nicknames("pokemon-3-199"), ["Spark3x199", "Bolt"])
+
+    def test_concurrent_writers_keep_search_index(self):
+        errors = self.write_concurrently()
+
+        self.assertEqual(errors, [])
+        results = self.db.search_nicknames("Spark2x17", prefix=False)
+        self.assertEqual([r["pokemon"] for r in results], ["pokemon-2-17"])
+        self.assertEqual(len(self.db.search_nicknames("Bolt", limit=None)), 800)
+
+    def test_exited_threads_connections_are_closed(self):
+        # Start the second thread first, so the two never share a thread ident
+        release = threading.Event()
+        other = threading.Thread(
+            target=lambda: (release.wait(), self.db.get_all_pokemon())
+        )
+        other.start()
+
+        thread = threading.Thread(target=self.db.get_all_pokemon)
+        thread.start()
+        thread.join()
+        self.assertIn(thread.ident, self.db._connections)
+
+        # The next new connection closes the exited thread's one
+        release.set()
+        other.join()
+
+        self.assertNotIn(thread.ident, self.db._connections)
+        self.assertEqual(self.db.get_all_pokemon(), [])
+
+
+class GroupCommitWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.db = PokemonDatabase(":memory:")
+
+        # Record the size of every transaction
+        self.batches = []
+        add_many = self.db.add_many
+
+        def counting_add_many(records):
+            records = list(records)
+            self.batches.append(len(records))
+            return add_many(records)
+
+        self.db.add_many = counting_add_many
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_concurrent_producers_are_batched(self):
+        with GroupCommitWriter(self.db, max_batch=50, max_delay_ms=200) as writer:
+
+            def produce(producer: int) -> None:
+                futures = [
+                    writer.submit(
+                        {"name": f"pokemon-{producer}-{i}", "nicknames": ["Bolt"]}
+                    )
+                    for i in range(25)
+                ]
+                for future in futures:
+                    future.result(timeout=5)
+
+            threads = [threading.Thread(target=produce, args=(p,)) for p in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(self.db.get_all_pokemon()), 100)
+        self.assertEqual(sum(self.batches), 100)
+        self.assertLess(len(self.batches), 100)
+        self.assertLessEqual(max(self.batches), 50)
+
+    def test_close_commits_queued_records(self):
+        writer = GroupCommitWriter(self.db, max_batch=100, max_delay_ms=10_000)
+        future = writer.submit({"name": "pikachu", "nicknames": ["Sparky"]})
+        writer.close()
+
+        self.assertIsNone(future.result(timeout=0))
+        self.assertEqual(self.db.get_nicknames("pikachu"), ["Sparky"])
+
+    def test_failed_batch_fails_its_futures(self):
+        with GroupCommitWriter(self.db, max_batch=2, max_delay_ms=10_000) as writer:
+            futures = [writer.submit({"name": "pikachu"}), writer.submit({})]
+
+        for future in futures:
+            self.assertIsInstance(future.exception(timeout=5), KeyError)
+
+
+class JobTest(unittest.TestCase):
+    def setUp(self):
+        self.db = PokemonDatabase(":memory:")
+        self.db.add_pokemon_with_nicknames("pikachu", ["Sparky"])
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_jobs_do_not_add_pokemon(self):
+        job_id = self.db.create_job(["pikachu", "bulbasaur", "charmander"])
+
+        counts = self.db.get_job(job_id)["counts"]
+        self.assertEqual(counts, {"pending": 2, "skipped": 1})
+        self.assertEqual(self.db.get_all_pokemon(), ["pikachu"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "export.csv")
+            self.assertEqual(self.db.export_to_csv(path), 1)
+            with open(path, newline="") as f:
+                names = [row[0] for row in csv.reader(f)]
+        self.assertEqual(names, ["pokemon", "pikachu"])
+
+    def test_pending_items_follow_nicknames(self):
+        job_id = self.db.create_job(["pikachu", "bulbasaur", "charmander"])
+        self.db.start_job_items(job_id, ["bulbasaur", "charmander"])
+        self.db.fail_job_items(job_id, ["charmander"], "boom")
+        self.db.add_many(
+            [{"name": "bulbasaur", "nicknames": ["Bulby"], "job_id": job_id}]
+        )
+
+        self.assertEqual(self.db.get_pending_job_items(job_id), ["charmander"])
+        self.assertEqual(self.db.finish_job(job_id), "incomplete")
+        self.assertEqual(
+            self.db.get_job(job_id)["counts"], {"done": 1, "failed": 1, "skipped": 1}
+        )
+
+
+class DetailsTest(unittest.TestCase):
+    def test_details_without_hydration(self):
+        with PokemonDatabase(":memory:") as db:
+            db.add_pokemon_with_nicknames("pikachu", ["Sparky"])
+
+            details = db.get_pokemon_details("Pikachu")
+
+            self.assertEqual(details["name"], "pikachu")
+            self.assertIsNone(details["height"])
+            self.assertIsNone(details["color"])
+            self.assertEqual(details["types"], [])
+            self.assertEqual(details["moves"], [])
+            self.assertIsNone(db.get_pokemon_details("bulbasaur"))
+
+
+class SchemaTest(unittest.TestCase):
+    def test_reopening_keeps_pokemon_without_nicknames(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pokemon.db")
+            with PokemonDatabase(path) as db:
+                db.add_pokemon_with_nicknames("pikachu", ["Sparky"])
+                db.create_job(["pikachu", "bulbasaur"])
+                db.remove_nicknames("pikachu")
+
+            with PokemonDatabase(path) as db:
+                self.assertEqual(db.get_all_pokemon(), ["pikachu"])
+                self.assertEqual(db.get_job(1)["counts"], {"pending": 1, "skipped": 1})
+
+    def test_schema_version(self):
+        with PokemonDatabase(":memory:") as db:
+            self.assertEqual(db.get_schema_version(), MIGRATIONS[-1][0])
+
+
+class EmbeddingTest(unittest.TestCase):
+    def test_embeddings_do_not_add_pokemon(self):
+        with PokemonDatabase(":memory:") as db:
+            db.add_pokemon_with_nicknames("pikachu", ["Sparky"])
+            db.add_embeddings_many(
+                "test",
+                [("pikachu", "aa", 2, b"\0" * 8), ("bulbasaur", "bb", 2, b"\1" * 8)],
+            )
+
+            self.assertEqual(db.get_all_pokemon(), ["pikachu"])
+            self.assertEqual(
+                db.get_embedding_hashes("test"), {"pikachu": "aa", "bulbasaur": "bb"}
+            )
+            self.assertEqual(
+                [row[0] for row in db.get_embeddings("test", ["Bulbasaur"])],
+                ["bulbasaur"],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from db import PokemonDatabase
+
+
+def read_table(path: str, fmt: str) -> pa.Table:
+    if fmt == "parquet":
+        return pq.read_table(path)
+    if fmt == "feather":
+        with pa.ipc.open_file(path) as reader:
+            return reader.read_all()
+    with pa.ipc.open_stream(path) as reader:
+        return reader.read_all()
+
+
+class ExportColumnarTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = PokemonDatabase(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def round_trip(self, fmt: str, detailed: bool) -> pa.Table:
+        path = os.path.join(self.tmp.name, f"export.{fmt}")
+        count = self.db.export_columnar(path, fmt, detailed=detailed, chunk_size=2)
+
+        table = read_table(path, fmt)
+        self.assertEqual(table.num_rows, count)
+        self.assertEqual(table.schema.field("nicknames").type, pa.list_(pa.string()))
+        return table
+
+    def test_empty_database(self):
+        for fmt in ("parquet", "feather", "arrow"):
+            for detailed in (False, True):
+                with self.subTest(fmt=fmt, detailed=detailed):
+                    table = self.round_trip(fmt, detailed)
+
+                    self.assertEqual(table.num_rows, 0)
+                    if detailed:
+                        self.assertEqual(
+                            table.schema.field("types").type, pa.list_(pa.string())
+                        )
+                        self.assertEqual(table.schema.field("height").type, pa.int64())
+
+    def test_rows(self):
+        self.db.add_pokemon_with_nicknames("pikachu", ["Sparky", "Bolt"])
+        self.db.add_pokemon_with_nicknames("bulbasaur", ["Bulby"])
+        self.db.add_pokemon_with_nicknames("charmander", ["Ember"])
+
+        for fmt in ("parquet", "feather", "arrow"):
+            for detailed in (False, True):
+                with self.subTest(fmt=fmt, detailed=detailed):
+                    rows = self.round_trip(fmt, detailed).to_pylist()
+
+                    self.assertEqual(
+                        [row["pokemon"] for row in rows],
+                        ["bulbasaur", "charmander", "pikachu"],
+                    )
+                    self.assertEqual(rows[2]["nicknames"], ["Sparky", "Bolt"])
+                    if detailed:
+                        self.assertEqual(rows[2]["types"], [])
+                        self.assertIsNone(rows[2]["height"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+from db import PokemonDatabase
+from main import hydrate_pokemon
+
+
+def fake_details(pokemon_name: str) -> dict:
+    return {
+        "pokedex_id": len(pokemon_name),
+        "height": 4,
+        "weight": 60,
+        "types": "electric,normal",
+        "moves": ["thunder-shock", "growl"],
+        "color": "yellow",
+        "habitat": "forest",
+    }
+
+
+class HydrateTest(unittest.TestCase):
+    def setUp(self):
+        self.db = PokemonDatabase(":memory:")
+        self.db.add_pokemon_with_nicknames("pikachu", ["Sparky"])
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_without_details_and_nicknames(self):
+        names = ["Raichu", "pikachu", "bulbasaur"]
+
+        self.assertEqual(self.db.get_pokemon_without_details(names), names)
+        self.assertEqual(
+            self.db.get_pokemon_without_nicknames(names), ["Raichu", "bulbasaur"]
+        )
+        self.assertEqual(self.db.get_pokemon_without_details([]), [])
+
+    def test_hydrate_stores_fetched_details(self):
+        fetched = []
+
+        def fetcher(pokemon_name: str) -> dict:
+            fetched.append(pokemon_name)
+            return fake_details(pokemon_name)
+
+        count = hydrate_pokemon(["pikachu", "raichu"], self.db, fetcher=fetcher)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(sorted(fetched), ["pikachu", "raichu"])
+        self.assertEqual(self.db.get_pokemon_without_details(["pikachu", "raichu"]), [])
+
+        details = self.db.get_pokemon_details("pikachu")
+        self.assertEqual(details["types"], ["electric", "normal"])
+        self.assertEqual(details["moves"], ["growl", "thunder-shock"])
+        self.assertEqual(details["habitat"], "forest")
+
+        # Hydrating only adds details, not nicknames
+        self.assertEqual(self.db.get_nicknames("raichu"), [])
+
+    def test_snapshot_is_used_before_fetching(self):
+        self.db.import_pokeapi_snapshot(
+            [
+                {
+                    "name": "mr-mime",
+                    "pokedex_id": 122,
+                    "height": 13,
+                    "weight": 545,
+                    "types": "psychic,fairy",
+                    "moves": ["confusion"],
+                    "species": "mr-mime",
+                }
+            ],
+            [{"name": "mr-mime", "color": "pink", "habitat": "urban"}],
+        )
+        fetched = []
+
+        def fetcher(pokemon_name: str) -> dict:
+            fetched.append(pokemon_name)
+            return fake_details(pokemon_name)
+
+        names = ["mr.mime", "pikachu"]
+
+        # Offline, only the snapshot is used
+        self.assertEqual(
+            hydrate_pokemon(names, self.db, offline=True, fetcher=fetcher), 1
+        )
+        self.assertEqual(fetched, [])
+        self.assertEqual(self.db.get_pokemon_without_details(names), ["pikachu"])
+        self.assertEqual(self.db.get_pokemon_details("mr.mime")["habitat"], "urban")
+
+        # Online, only the Pokémon missing from the snapshot are fetched
+        self.assertEqual(hydrate_pokemon(names, self.db, fetcher=fetcher), 2)
+        self.assertEqual(fetched, ["pikachu"])
+        self.assertEqual(self.db.get_pokemon_without_details(names), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from typing import List, Type
+
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel
+
+from cache import ResponseCache, SpritePayloadCache
+from nickname_generator import (
+    NicknameBackend,
+    NicknameGenerator,
+    Nicknames,
+    PackedNicknames,
+    PokemonNicknames,
+)
+
+
+class ScriptedBackend(NicknameBackend):
+    """
+    A backend that answers packed requests from a fixed script and records calls.
+    """
+
+    model = "scripted"
+    temperature = 0.0
+
+    def __init__(self, packed_results: List[PokemonNicknames]):
+        self.packed_results = packed_results
+        self.calls: List[str] = []
+
+    def invoke(
+        self, messages: List[BaseMessage], schema: Type[BaseModel] = Nicknames
+    ) -> BaseModel:
+        if schema is PackedNicknames:
+            self.calls.append("packed")
+            return PackedNicknames(results=self.packed_results)
+
+        self.calls.append("single")
+        return Nicknames(nicknames=["Single"])
+
+    async def ainvoke(
+        self, messages: List[BaseMessage], schema: Type[BaseModel] = Nicknames
+    ) -> BaseModel:
+        return self.invoke(messages, schema)
+
+
+class PackedGenerationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sprite_cache = SpritePayloadCache(os.path.join(self.tmp.name, "s.db"))
+        self.response_cache = ResponseCache(os.path.join(self.tmp.name, "r.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def generator(self, backend: NicknameBackend) -> NicknameGenerator:
+        return NicknameGenerator(backend, self.sprite_cache, self.response_cache)
+
+    def test_packed_response_is_validated(self):
+        backend = ScriptedBackend(
+            [
+                PokemonNicknames(pokemon=" Pikachu ", nicknames=["Sparky"]),
+                PokemonNicknames(pokemon="pikachu", nicknames=["Duplicate"]),
+                PokemonNicknames(pokemon="mewtwo", nicknames=["Unasked"]),
+                PokemonNicknames(pokemon="bulbasaur", nicknames=[]),
+            ]
+        )
+
+        results = self.generator(backend).generate_many(
+            ["pikachu", "bulbasaur", "charmander"]
+        )
+
+        # Empty and missing entries fall back to single-sprite requests
+        self.assertEqual(
+            results,
+            {"pikachu": ["Sparky"], "bulbasaur": ["Single"], "charmander": ["Single"]},
+        )
+        self.assertEqual(backend.calls, ["packed", "single", "single"])
+
+    def test_without_fallback_missing_are_left_out(self):
+        backend = ScriptedBackend(
+            [PokemonNicknames(pokemon="pikachu", nicknames=["A"])]
+        )
+
+        results = asyncio.run(
+            self.generator(backend).agenerate_many(
+                ["pikachu", "bulbasaur"], fallback=False
+            )
+        )
+
+        self.assertEqual(results, {"pikachu": ["A"]})
+
+    def test_cache_is_shared_with_single_requests(self):
+        backend = ScriptedBackend(
+            [
+                PokemonNicknames(pokemon="pikachu", nicknames=["Sparky"]),
+                PokemonNicknames(pokemon="bulbasaur", nicknames=["Bulby"]),
+            ]
+        )
+        generator = self.generator(backend)
+
+        generator.generate_many(["pikachu", "bulbasaur"])
+        self.assertEqual(generator.generate("pikachu"), ["Sparky"])
+
+        generator.generate("charmander")
+        results = generator.generate_many(["charmander", "bulbasaur"])
+
+        self.assertEqual(results, {"charmander": ["Single"], "bulbasaur": ["Bulby"]})
+        self.assertEqual(backend.calls, ["packed", "single"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+from typing import Optional
+
+from db import PokemonDatabase
+from sharding import (
+    find_shard_dbs,
+    parse_shard,
+    select_shard,
+    shard_db_path,
+    shard_of,
+)
+
+
+def details(types: str, moves: list, height: int) -> dict:
+    return {
+        "pokedex_id": 25,
+        "height": height,
+        "weight": 60,
+        "types": types,
+        "moves": moves,
+        "color": "yellow",
+        "habitat": "forest",
+    }
+
+
+def stamp(
+    db: PokemonDatabase, table: str, pokemon_name: str, updated_at: Optional[float]
+) -> None:
+    conn = db._connect()
+    conn.execute(
+        f"""
+        UPDATE {table} SET updated_at = ?
+        WHERE pokemon_id = (SELECT id FROM pokemon WHERE name = ?)
+        """,
+        (updated_at, pokemon_name),
+    )
+    conn.commit()
+
+
+class ShardTest(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard(" 2/4 "), (2, 4))
+        for spec in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_shards_partition_names(self):
+        names = [f"pokemon-{i}" for i in range(200)]
+        shards = [select_shard(names, i, 4) for i in range(1, 5)]
+
+        self.assertEqual(sorted(sum(shards, [])), sorted(names))
+        self.assertTrue(all(shards))
+        self.assertEqual(shard_of("Pikachu", 4), shard_of("pikachu", 4))
+
+    def test_find_shard_dbs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "pokemon.db")
+            shards = ((10, 2), (2, 1), (10, 1))
+            paths = [shard_db_path(db_path, i, n) for n, i in shards]
+            for path in paths + [os.path.join(tmp, "other.shard-1-of-2.db")]:
+                open(path, "w").close()
+
+            self.assertEqual(
+                find_shard_dbs(db_path),
+                [
+                    os.path.join(tmp, "pokemon.shard-1-of-2.db"),
+                    os.path.join(tmp, "pokemon.shard-1-of-10.db"),
+                    os.path.join(tmp, "pokemon.shard-2-of-10.db"),
+                ],
+            )
+
+
+class MergeShardTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = PokemonDatabase(os.path.join(self.tmp.name, "pokemon.db"))
+        self.shard_path = os.path.join(self.tmp.name, "pokemon.shard-1-of-2.db")
+        self.shard = PokemonDatabase(self.shard_path)
+
+    def tearDown(self):
+        self.db.close()
+        self.shard.close()
+        self.tmp.cleanup()
+
+    def test_newer_copy_wins(self):
+        self.db.add_many(
+            [
+                {"name": "pikachu", "nicknames": ["Old"]},
+                {"name": "raichu", "nicknames": ["Newer"]},
+                {"name": "pikachu", "details": details("normal", ["tackle"], 3)},
+            ]
+        )
+        self.shard.add_many(
+            [
+                {"name": "pikachu", "nicknames": ["New"]},
+                {"name": "raichu", "nicknames": ["Older"]},
+                {"name": "bulbasaur", "nicknames": ["Bulby"]},
+                {
+                    "name": "pikachu",
+                    "details": details("electric", ["thunder-shock", "growl"], 4),
+                },
+            ]
+        )
+        stamp(self.db, "nicknames", "pikachu", 1.0)
+        stamp(self.db, "nicknames", "raichu", 3.0)
+        stamp(self.db, "pokemon_details", "pikachu", 1.0)
+        stamp(self.shard, "nicknames", "pikachu", 2.0)
+        stamp(self.shard, "nicknames", "raichu", 2.0)
+        stamp(self.shard, "pokemon_details", "pikachu", 2.0)
+
+        counts = self.db.merge_shard(self.shard_path)
+
+        self.assertEqual(counts, {"pokemon": 1, "nicknames": 2, "details": 1})
+        self.assertEqual(self.db.get_nicknames("pikachu"), ["New"])
+        self.assertEqual(self.db.get_nicknames("raichu"), ["Newer"])
+        self.assertEqual(self.db.get_nicknames("bulbasaur"), ["Bulby"])
+
+        merged = self.db.get_pokemon_details("pikachu")
+        self.assertEqual(merged["height"], 4)
+        self.assertEqual(merged["types"], ["electric"])
+        self.assertEqual(merged["moves"], ["growl", "thunder-shock"])
+
+        # Merging the same shard again changes nothing
+        self.assertEqual(
+            self.db.merge_shard(self.shard_path),
+            {"pokemon": 0, "nicknames": 0, "details": 0},
+        )
+
+    def test_unstamped_rows_lose(self):
+        self.db.add_pokemon_with_nicknames("pikachu", ["Unstamped"])
+        stamp(self.db, "nicknames", "pikachu", None)
+        self.shard.add_pokemon_with_nicknames("pikachu", ["Stamped"])
+
+        self.db.merge_shard(self.shard_path)
+
+        self.assertEqual(self.db.get_nicknames("pikachu"), ["Stamped"])
+
+
+if __name__ == "__main__":
+    unittest.main()
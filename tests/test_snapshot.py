@@ -0,0 +1,149 @@
+import json
+import os
+import tempfile
+import unittest
+from typing import Optional
+
+from db import PokemonDatabase
+from pokeapi import MAX_MOVES, api_name, iter_dump_resources, load_dump
+
+
+def pokemon_document(name: str, pokedex_id: int, species: str) -> dict:
+    return {
+        "name": name,
+        "id": pokedex_id,
+        "height": 4,
+        "weight": 60,
+        "types": [
+            {"slot": 2, "type": {"name": "psychic"}},
+            {"slot": 1, "type": {"name": "electric"}},
+        ],
+        "moves": [{"move": {"name": f"move-{i}"}} for i in range(MAX_MOVES + 5)],
+        "species": {"name": species},
+    }
+
+
+def species_document(name: str, habitat: Optional[str] = None) -> dict:
+    return {
+        "name": name,
+        "color": {"name": "yellow"},
+        "habitat": {"name": habitat} if habitat else None,
+    }
+
+
+POKEMON = [
+    pokemon_document("pikachu", 25, "pikachu"),
+    pokemon_document("mr-mime", 122, "mr-mime"),
+    pokemon_document("pikachu-rock-star", 10080, "pikachu"),
+]
+SPECIES = [species_document("pikachu", "forest"), species_document("mr-mime")]
+
+
+class DumpTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_jsonl(self, resource: str, documents: list) -> None:
+        with open(os.path.join(self.tmp.name, f"{resource}.jsonl"), "w") as f:
+            for document in documents:
+                f.write(json.dumps(document) + "\n")
+            f.write("\n")
+
+    def write_tree(self, prefix: str, resource: str, documents: list) -> None:
+        for i, document in enumerate(documents, start=1):
+            resource_dir = os.path.join(self.tmp.name, prefix, resource, str(i))
+            os.makedirs(resource_dir)
+            with open(os.path.join(resource_dir, "index.json"), "w") as f:
+                json.dump(document, f)
+
+    def assert_loaded(self) -> None:
+        pokemon, species = load_dump(self.tmp.name)
+        pokemon = {p["name"]: p for p in pokemon}
+        species = {s["name"]: s for s in species}
+
+        self.assertEqual(sorted(pokemon), ["mr-mime", "pikachu", "pikachu-rock-star"])
+        self.assertEqual(pokemon["pikachu"]["pokedex_id"], 25)
+        self.assertEqual(pokemon["pikachu"]["types"], "electric,psychic")
+        self.assertEqual(len(pokemon["pikachu"]["moves"]), MAX_MOVES)
+        self.assertEqual(pokemon["pikachu-rock-star"]["species"], "pikachu")
+
+        self.assertEqual(
+            species,
+            {
+                "pikachu": {"name": "pikachu", "color": "yellow", "habitat": "forest"},
+                "mr-mime": {"name": "mr-mime", "color": "yellow", "habitat": None},
+            },
+        )
+
+    def test_jsonl_dump(self):
+        self.write_jsonl("pokemon", POKEMON)
+        self.write_jsonl("pokemon-species", SPECIES)
+
+        self.assert_loaded()
+
+    def test_directory_tree_dump(self):
+        prefix = os.path.join("data", "api", "v2")
+        self.write_tree(prefix, "pokemon", POKEMON)
+        self.write_tree(prefix, "pokemon-species", SPECIES)
+
+        self.assert_loaded()
+
+    def test_missing_resource(self):
+        self.assertEqual(list(iter_dump_resources(self.tmp.name, "pokemon")), [])
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = PokemonDatabase(":memory:")
+
+        with open(os.path.join(self.tmp.name, "pokemon.jsonl"), "w") as f:
+            f.writelines(json.dumps(document) + "\n" for document in POKEMON)
+        with open(os.path.join(self.tmp.name, "pokemon-species.jsonl"), "w") as f:
+            f.writelines(json.dumps(document) + "\n" for document in SPECIES)
+
+        pokemon, species = load_dump(self.tmp.name)
+        self.counts = self.db.import_pokeapi_snapshot(pokemon, species)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_import(self):
+        self.assertEqual(self.counts, (3, 2))
+
+        # Importing again replaces the records instead of duplicating them
+        pokemon, species = load_dump(self.tmp.name)
+        self.assertEqual(self.db.import_pokeapi_snapshot(pokemon, species), (3, 2))
+        conn = self.db._connect()
+        count = conn.execute("SELECT COUNT(*) FROM pokeapi_pokemon").fetchone()[0]
+        self.assertEqual(count, 3)
+
+    def test_get_snapshot_details(self):
+        names = ["pikachu", "mr.mime", "missingno"]
+
+        details = self.db.get_snapshot_details({name: api_name(name) for name in names})
+
+        self.assertEqual(sorted(details), ["mr.mime", "pikachu"])
+        self.assertEqual(
+            details["pikachu"],
+            {
+                "pokedex_id": 25,
+                "height": 4,
+                "weight": 60,
+                "types": "electric,psychic",
+                "moves": [f"move-{i}" for i in range(MAX_MOVES)],
+                "color": "yellow",
+                "habitat": "forest",
+            },
+        )
+        self.assertEqual(details["mr.mime"]["pokedex_id"], 122)
+        self.assertIsNone(details["mr.mime"]["habitat"])
+        self.assertEqual(self.db.get_snapshot_details({}), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
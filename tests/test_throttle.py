@@ -0,0 +1,38 @@
+import asyncio
+import unittest
+
+from throttle import AdaptiveLimiter, AdaptiveThrottle
+
+
+class AdaptiveThrottleTest(unittest.TestCase):
+    def setUp(self):
+        self.limiter = AdaptiveLimiter(initial=2, adaptive=False)
+        self.throttle = AdaptiveThrottle(self.limiter)
+
+    def test_interrupted_call_releases_slot(self):
+        def interrupt():
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.throttle.call(interrupt)
+
+        self.assertEqual(self.limiter.in_flight, 0)
+        self.assertEqual(self.limiter.limit, 2)
+
+    def test_cancelled_acall_releases_slot(self):
+        async def run():
+            task = asyncio.create_task(self.throttle.acall(asyncio.sleep, 10))
+            await asyncio.sleep(0.01)
+            self.assertEqual(self.limiter.in_flight, 1)
+
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+        self.assertEqual(self.limiter.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
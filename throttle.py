@@ -0,0 +1,521 @@
+import asyncio
+import email.utils
+import functools
+import itertools
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from metrics import get_recorder
+
+
+T = TypeVar("T")
+
+
+class RateLimiter:
+    """
+    An asyncio rate limiter that spaces calls to stay under a requests-per-minute budget.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_minute: Maximum number of requests per minute (None or 0 disables limiting)
+        """
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Wait until the next request slot is available.
+        """
+        if not self.interval:
+            return
+
+        loop = asyncio.get_running_loop()
+
+        # Reserve the next slot under the lock, then sleep outside of it
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# Ceiling for the adaptive concurrency limit when none is given
+DEFAULT_MAX_CONCURRENCY = 64
+
+# HTTP statuses that mean the server is overloaded and we should slow down
+THROTTLE_STATUSES = {429, 503}
+
+# HTTP statuses worth retrying without slowing down
+TRANSIENT_STATUSES = {408, 409, 500, 502, 504}
+
+# Exception class names (anywhere in the MRO) for network errors worth retrying,
+# matched by name so the HTTP libraries are not imported here
+TRANSIENT_ERROR_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "ConnectionError",
+    "Timeout",
+    "TimeoutError",
+}
+
+
+def error_status(error: BaseException) -> Optional[int]:
+    """
+    Get the HTTP status code of an error raised by openai, httpx or requests.
+
+    Args:
+        error: The exception
+
+    Returns:
+        The status code, or None if the error has no HTTP response
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+
+    return status if isinstance(status, int) else None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """
+    Get the delay requested by the server's Retry-After header, if any.
+
+    Both the standard header (seconds or an HTTP date) and OpenAI's
+    retry-after-ms header are understood.
+
+    Args:
+        error: The exception
+
+    Returns:
+        The delay in seconds, or None if the server did not ask for one
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return max(0.0, float(value) / 1000)
+
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            when = email.utils.parsedate_to_datetime(value)
+            return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Decide how to react to an error.
+
+    Args:
+        error: The exception
+
+    Returns:
+        "throttled" for rate limits and overload, "transient" for errors worth
+        retrying, or "fatal" for errors that would fail again
+    """
+    status = error_status(error)
+    if status in THROTTLE_STATUSES:
+        return "throttled"
+    if status in TRANSIENT_STATUSES:
+        return "transient"
+    if status is not None:
+        return "fatal"
+
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if names & TRANSIENT_ERROR_NAMES:
+        return "transient"
+
+    return "fatal"
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    Get the delay before a retry, using exponential backoff with full jitter.
+
+    Args:
+        attempt: The number of the retry, starting at 0
+        base: The delay ceiling of the first retry in seconds
+        cap: The maximum delay in seconds
+
+    Returns:
+        A random delay between 0 and min(cap, base * 2 ** attempt) seconds
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class RetryBudget:
+    """
+    A per-run cap on retries, so a failing provider is not hammered.
+
+    Every first attempt earns `ratio` retries on top of a floor of `min_retries`;
+    once the retries spent reach that allowance, errors are no longer retried.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Retries allowed per first attempt
+            min_retries: Retries always allowed, however few requests were made
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """
+        Count a first attempt.
+        """
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        """
+        Take one retry from the budget.
+
+        Returns:
+            Whether the retry is allowed
+        """
+        with self._lock:
+            if self.retries >= self.min_retries + self.ratio * self.requests:
+                return False
+            self.retries += 1
+            return True
+
+
+class AdaptiveLimiter:
+    """
+    A concurrency limit that adapts with additive-increase/multiplicative-decrease.
+
+    Each successful call raises the limit by about one per limit's worth of
+    calls; a throttled call or a latency spike (latency above
+    `latency_tolerance` times the running average) cuts it by
+    `decrease_factor`, at most once per average latency so one burst of errors
+    counts as one congestion signal. A Retry-After from the server pauses all
+    new calls until it passes. With `adaptive=False` the limit stays fixed and
+    only Retry-After pauses apply.
+
+    The limiter can be shared by threads (acquire) and asyncio tasks (aacquire).
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_MAX_CONCURRENCY,
+        adaptive: bool = True,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        warmup: int = 5,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial: The starting concurrency limit
+            min_limit: The lowest the limit can go
+            max_limit: The highest the limit can go
+            adaptive: Whether to adapt the limit (False keeps it at `initial`)
+            decrease_factor: Factor applied to the limit on congestion
+            latency_tolerance: Latency, relative to the average, treated as a spike
+            warmup: Number of calls before latency spikes are acted on
+        """
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, initial)
+        self.limit = float(max(initial, min_limit))
+        self.adaptive = adaptive
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.warmup = warmup
+
+        self.in_flight = 0
+        self.average_latency: Optional[float] = None
+        self.samples = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._slow_start = adaptive
+        self._condition = threading.Condition()
+
+    def _wait_time(self) -> Optional[float]:
+        """
+        Take a slot if one is free; must be called with the condition held.
+
+        Returns:
+            0 if a slot was taken, the seconds left in a pause, or None to wait
+            for a release
+        """
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return 0.0
+
+        return None
+
+    def acquire(self) -> None:
+        """
+        Block the calling thread until a slot is free.
+        """
+        with self._condition:
+            while True:
+                wait = self._wait_time()
+                if wait == 0:
+                    return
+                self._condition.wait(wait)
+
+    async def aacquire(self, poll_interval: float = 0.02) -> None:
+        """
+        Wait in the event loop until a slot is free.
+
+        Args:
+            poll_interval: Seconds between checks while every slot is taken
+        """
+        while True:
+            with self._condition:
+                wait = self._wait_time()
+            if wait == 0:
+                return
+            await asyncio.sleep(wait or poll_interval)
+
+    def release(
+        self,
+        latency: Optional[float] = None,
+        throttled: bool = False,
+        pause: Optional[float] = None,
+    ) -> None:
+        """
+        Free a slot and adapt the limit to how the call went.
+
+        Args:
+            latency: The call's duration in seconds, if it succeeded
+            throttled: Whether the server rejected the call as overloaded
+            pause: Seconds the server asked us to wait before the next call
+        """
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            if pause:
+                self.paused_until = max(self.paused_until, now + pause)
+
+            if self.adaptive:
+                spike = (
+                    latency is not None
+                    and self.average_latency is not None
+                    and self.samples >= self.warmup
+                    and latency > self.latency_tolerance * self.average_latency
+                )
+
+                if throttled or spike:
+                    # Only one decrease per round trip, however many calls saw it
+                    window = self.average_latency or 0.0
+                    if now - self._last_decrease >= window:
+                        self.limit = max(
+                            float(self.min_limit), self.limit * self.decrease_factor
+                        )
+                        self._last_decrease = now
+                        self._slow_start = False
+                elif latency is not None:
+                    # Slow start: grow by one per success until the first congestion signal
+                    step = 1.0 if self._slow_start else 1 / self.limit
+                    self.limit = min(float(self.max_limit), self.limit + step)
+
+            if latency is not None:
+                self.samples += 1
+                self.average_latency = (
+                    latency
+                    if self.average_latency is None
+                    else 0.9 * self.average_latency + 0.1 * latency
+                )
+
+            self._condition.notify_all()
+
+
+class AdaptiveThrottle:
+    """
+    Runs calls through an AdaptiveLimiter, retrying transient errors.
+
+    Throttled and transient errors are retried with exponential backoff and
+    jitter (or after the server's Retry-After, if longer) while the retry budget
+    lasts, up to `max_retries` times per call. Other errors are raised at once.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveLimiter] = None,
+        budget: Optional[RetryBudget] = None,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+    ):
+        """
+        Initialize the throttle.
+
+        Args:
+            limiter: The concurrency limiter (defaults to an adaptive one)
+            budget: The retry budget for the run (defaults to a new one)
+            max_retries: Maximum number of retries per call
+            base_delay: The backoff ceiling of the first retry in seconds
+            max_delay: The maximum backoff in seconds
+        """
+        self.limiter = limiter or AdaptiveLimiter()
+        self.budget = budget or RetryBudget()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _on_error(self, error: BaseException, attempt: int) -> float:
+        """
+        Release the slot after a failed attempt and decide whether to retry.
+
+        Returns:
+            The seconds to wait before retrying
+
+        Raises:
+            The error, if it should not be retried
+        """
+        kind = classify_error(error)
+        pause = retry_after(error) if kind == "throttled" else None
+
+        self.limiter.release(throttled=kind == "throttled", pause=pause)
+
+        if (
+            kind == "fatal"
+            or attempt >= self.max_retries
+            or not self.budget.try_spend()
+        ):
+            raise error
+
+        delay = max(pause or 0.0, backoff_delay(attempt, self.base_delay, self.max_delay))
+        get_recorder().record(
+            "retry", delay, attempt=attempt, ok=False, error=type(error).__name__
+        )
+
+        return delay
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Call a function in the calling thread.
+
+        Args:
+            func: The function to call
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The function's result
+        """
+        self.budget.record_request()
+
+        for attempt in itertools.count():
+            self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled or interrupted: free the slot without adapting the limit
+                self.limiter.release()
+                raise
+
+            self.limiter.release(latency=time.monotonic() - started)
+            return result
+
+    async def acall(
+        self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        """
+        Await a coroutine function in the event loop.
+
+        Args:
+            func: The coroutine function to call
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The function's result
+        """
+        self.budget.record_request()
+
+        for attempt in itertools.count():
+            await self.limiter.aacquire()
+            started = time.monotonic()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled or interrupted: free the slot without adapting the limit
+                self.limiter.release()
+                raise
+
+            self.limiter.release(latency=time.monotonic() - started)
+            return result
+
+    def wrap(self, func: Callable[..., T]) -> Callable[..., T]:
+        """
+        Wrap a function so every call goes through the throttle.
+
+        Args:
+            func: The function to wrap
+
+        Returns:
+            The wrapped function
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            return self.call(func, *args, **kwargs)
+
+        return wrapper
+
+
+def create_throttle(
+    concurrency: int, adaptive: bool = False, max_retries: int = 3
+) -> AdaptiveThrottle:
+    """
+    Create the throttle for a run from the command-line options.
+
+    Args:
+        concurrency: The fixed concurrency, or the starting one if adaptive
+        adaptive: Whether to adapt concurrency up to DEFAULT_MAX_CONCURRENCY
+        max_retries: Maximum number of retries per call
+
+    Returns:
+        The throttle
+    """
+    max_limit = max(concurrency, DEFAULT_MAX_CONCURRENCY) if adaptive else concurrency
+
+    return AdaptiveThrottle(
+        AdaptiveLimiter(concurrency, max_limit=max_limit, adaptive=adaptive),
+        max_retries=max_retries,
+    )